@@ -0,0 +1,111 @@
+"""
+Bounded worker pool for password hashing.
+
+bcrypt is deliberately slow (hundreds of milliseconds of CPU per call).
+Running it inside an async route blocks the event loop, so a burst of
+logins would stall every other request and WebSocket update. Hashing and
+verification run in a small thread pool instead (bcrypt releases the GIL
+while hashing), and requests beyond the queue limit are rejected with
+PasswordHasherBusy, which the API turns into a 503.
+
+Configuration (per worker process):
+    PASSWORD_HASH_WORKERS: threads hashing in parallel; 0 hashes inline
+        on the event loop (the old behaviour)
+    PASSWORD_HASH_QUEUE: hashes allowed to be running or waiting
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import asyncio
+import os
+
+from api.auth.auth_utils import verify_password, get_password_hash
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "64"))
+
+# Seconds clients are asked to wait after a 503
+RETRY_AFTER_SECONDS = 1
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHasherPool:
+    """
+    Runs password hashing in a bounded thread pool.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_QUEUE):
+        self.workers = workers
+        self.max_pending = max(max_pending, 1)
+        # Only touched from the event loop thread, so no lock is needed
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hash",
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a hashing function in the pool.
+
+        Args:
+            func: Function to run
+            *args: Arguments for func
+
+        Returns:
+            The function's result
+
+        Raises:
+            PasswordHasherBusy: If PASSWORD_HASH_QUEUE calls are already pending
+        """
+        if self.workers <= 0:
+            return func(*args)
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop the worker threads once running hashes finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def status(self) -> dict:
+        """Get pool configuration and counters."""
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+
+# Global password hashing pool
+password_hasher = PasswordHasherPool()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop."""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await password_hasher.run(get_password_hash, password)
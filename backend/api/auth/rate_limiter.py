@@ -1,76 +1,259 @@
 """
 Rate limiting utilities for API endpoints.
+
+Limits use token buckets: each key (client IP, IP + username, ...) holds a
+bucket of `limit` tokens that refills at `limit / window_seconds` tokens
+per second, and every request takes one token. The state per key is fixed
+(token count and two timestamps) and a key is dropped once its bucket is
+full again, so memory stays bounded no matter how many clients are seen.
+
+Backends (RATE_LIMIT_BACKEND):
+- memory: per-worker buckets, capped at RATE_LIMIT_MAX_KEYS (default)
+- postgres: buckets in the rate_limit_buckets table, shared by all workers
 """
 
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import logging
+import math
+import os
 import time
-from typing import Dict
-from collections import defaultdict
-from datetime import datetime, timedelta
 
-# Simple in-memory rate limiter
-# For production, consider using Redis or a dedicated rate limiting service
-class RateLimiter:
+from sqlalchemy import Float, String, bindparam, text
+from starlette.requests import HTTPConnection
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of keys tracked by the in-memory backend
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Seconds between deletions of full buckets in the shared backend
+RATE_LIMIT_CLEANUP_SECONDS = 60
+
+
+class RateLimitBackend(ABC):
     """
-    Simple in-memory rate limiter using sliding window algorithm.
+    Base class for token bucket storage.
     """
 
-    def __init__(self):
-        # Store request timestamps per key
-        self.requests: Dict[str, list] = defaultdict(list)
-
-    def is_allowed(self, key: str, max_requests: int = 5, window_seconds: int = 60) -> bool:
+    @abstractmethod
+    async def take(self, key: str, capacity: float, refill_rate: float) -> Tuple[bool, int]:
         """
-        Check if a request is allowed based on rate limit.
+        Take one token from a bucket.
 
         Args:
-            key: Unique identifier (IP address, username, etc.)
-            max_requests: Maximum number of requests allowed
-            window_seconds: Time window in seconds
+            key: Bucket key
+            capacity: Maximum (and initial) number of tokens
+            refill_rate: Tokens added per second
 
         Returns:
-            True if request is allowed, False otherwise
+            (is_allowed, retry_after_seconds); retry_after is 0 when allowed
         """
+        pass
+
+    def clear(self) -> None:
+        """Drop all buckets (if supported)."""
+
+
+def _retry_after(tokens: float, refill_rate: float) -> int:
+    """Seconds until a bucket holding `tokens` has a whole token again."""
+    return max(1, math.ceil((1 - tokens) / refill_rate))
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in a dict ordered by last use.
+
+    Each check is O(1): idle keys are evicted from the least recently used
+    end once their bucket has refilled, and the oldest keys are dropped
+    when more than max_keys are tracked. Only valid per worker process.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max(max_keys, 1)
+        # key -> [tokens, updated_at, expires_at]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, capacity: float, refill_rate: float) -> Tuple[bool, int]:
+        now = time.monotonic()
+        self._evict(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [capacity, now, now]
+            self._buckets[key] = bucket
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+            bucket[1] = now
+
+        if bucket[0] < 1:
+            allowed = False
+        else:
+            bucket[0] -= 1
+            allowed = True
+        bucket[2] = now + (capacity - bucket[0]) / refill_rate
+
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        if allowed:
+            return True, 0
+        return False, _retry_after(bucket[0], refill_rate)
+
+    def _evict(self, now: float) -> None:
+        """Drop least recently used keys whose bucket is full again."""
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if bucket[2] > now:
+                return
+            del self._buckets[key]
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class PostgresRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in the rate_limit_buckets table, shared by all workers.
+
+    Each check is a single upsert on the async engine: the conditional
+    ON CONFLICT update only takes a token when one is available, so
+    concurrent workers never over-admit. Full buckets are deleted
+    periodically. Assumes worker clocks are reasonably in sync.
+    """
+
+    TAKE_STATEMENT = text("""
+        INSERT INTO rate_limit_buckets (key, tokens, updated_at, expires_at)
+        VALUES (:key, :capacity - 1, :now, :now + 1 / :rate)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = LEAST(:capacity, rate_limit_buckets.tokens
+                + (:now - rate_limit_buckets.updated_at) * :rate) - 1,
+            updated_at = :now,
+            expires_at = :now + (:capacity - LEAST(:capacity, rate_limit_buckets.tokens
+                + (:now - rate_limit_buckets.updated_at) * :rate) + 1) / :rate
+        WHERE LEAST(:capacity, rate_limit_buckets.tokens
+            + (:now - rate_limit_buckets.updated_at) * :rate) >= 1
+        RETURNING tokens
+    """).bindparams(
+        bindparam("key", type_=String),
+        bindparam("capacity", type_=Float),
+        bindparam("rate", type_=Float),
+        bindparam("now", type_=Float),
+    )
+
+    BUCKET_STATEMENT = text(
+        "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = :key"
+    ).bindparams(bindparam("key", type_=String))
+
+    CLEANUP_STATEMENT = text(
+        "DELETE FROM rate_limit_buckets WHERE expires_at < :now"
+    ).bindparams(bindparam("now", type_=Float))
+
+    def __init__(self):
+        self._last_cleanup = 0.0
+
+    async def take(self, key: str, capacity: float, refill_rate: float) -> Tuple[bool, int]:
+        from api.database.session import async_engine
+
         now = time.time()
-        window_start = now - window_seconds
+        params = {"key": key, "capacity": float(capacity), "rate": float(refill_rate), "now": now}
+
+        async with async_engine.begin() as conn:
+            if await conn.scalar(self.TAKE_STATEMENT, params) is not None:
+                allowed, retry_after = True, 0
+            else:
+                # Update skipped: the bucket is empty
+                row = (await conn.execute(self.BUCKET_STATEMENT, {"key": key})).first()
+                tokens = min(capacity, row.tokens + (now - row.updated_at) * refill_rate) if row else 0
+                allowed, retry_after = False, _retry_after(tokens, refill_rate)
+
+            if now - self._last_cleanup > RATE_LIMIT_CLEANUP_SECONDS:
+                self._last_cleanup = now
+                await conn.execute(self.CLEANUP_STATEMENT, {"now": now})
+
+        return allowed, retry_after
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    """
+    Create the backend selected by the RATE_LIMIT_BACKEND environment variable.
+
+    Returns:
+        Configured backend (in-memory by default)
+    """
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+
+    if backend == "postgres":
+        from api.database.session import get_database_url
+
+        if not get_database_url().startswith("postgresql"):
+            raise RuntimeError("RATE_LIMIT_BACKEND=postgres requires a PostgreSQL DATABASE_URL")
+        return PostgresRateLimitBackend()
+
+    if backend != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{backend}', using in-memory buckets")
+    return InMemoryRateLimitBackend()
 
-        # Clean old requests from the key's history
-        self.requests[key] = [
-            timestamp for timestamp in self.requests[key]
-            if timestamp > window_start
-        ]
 
-        # Check if under limit
-        if len(self.requests[key]) < max_requests:
-            self.requests[key].append(now)
-            return True
+# Global rate limit backend
+rate_limit_backend = create_rate_limit_backend()
+
+
+class RateLimiter:
+    """
+    Allows `limit` requests per `window_seconds` per key, with bursts of up
+    to `limit` requests.
+    """
 
-        return False
+    def __init__(self, name: str, limit: int, window_seconds: float, backend: Optional[RateLimitBackend] = None):
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.backend = backend
 
-    def get_retry_after(self, key: str, window_seconds: int = 60) -> int:
+    async def check(self, key: str) -> Tuple[bool, int]:
         """
-        Get seconds until next request is allowed.
+        Check whether a request is allowed, consuming a token if it is.
 
         Args:
-            key: Unique identifier
-            window_seconds: Time window in seconds
+            key: Unique identifier (IP address, username, etc.)
 
         Returns:
-            Seconds until retry is allowed
+            (is_allowed, retry_after_seconds)
         """
-        if not self.requests[key]:
-            return 0
+        backend = self.backend if self.backend is not None else rate_limit_backend
+        return await backend.take(f"{self.name}:{key}", self.limit, self.limit / self.window_seconds)
+
+
+def get_client_ip(conn: HTTPConnection) -> str:
+    """Get client IP address from a request, handling proxy headers."""
+    # Check for forwarded IP (behind proxy/load balancer)
+    forwarded = conn.headers.get("X-Forwarded-For")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
 
-        oldest_request = self.requests[key][0]
-        retry_after = int(oldest_request + window_seconds - time.time())
-        return max(0, retry_after)
+    # Check for real IP header
+    real_ip = conn.headers.get("X-Real-IP")
+    if real_ip:
+        return real_ip
 
+    # Fall back to direct connection IP
+    if conn.client:
+        return conn.client.host
 
-# Global rate limiter instances
-login_rate_limiter = RateLimiter()
-general_rate_limiter = RateLimiter()
+    return "unknown"
 
 
-def check_login_rate_limit(identifier: str) -> tuple[bool, int | None]:
+# Login attempts: 5 per 5 minutes
+login_rate_limiter = RateLimiter("login", limit=5, window_seconds=300)
+
+
+async def check_login_rate_limit(identifier: str) -> Tuple[bool, Optional[int]]:
     """
     Check login rate limit for an identifier.
 
@@ -80,11 +263,7 @@ def check_login_rate_limit(identifier: str) -> tuple[bool, int | None]:
     Returns:
         (is_allowed, retry_after_seconds)
     """
-    max_attempts = 5
-    window_seconds = 300  # 5 minutes
-
-    if login_rate_limiter.is_allowed(identifier, max_attempts, window_seconds):
+    allowed, retry_after = await login_rate_limiter.check(identifier)
+    if allowed:
         return True, None
-
-    retry_after = login_rate_limiter.get_retry_after(identifier, window_seconds)
     return False, retry_after
@@ -0,0 +1,99 @@
+"""
+Short-lived cache of authenticated users.
+
+Every authenticated request resolves its JWT to a User. The admin panel
+polls several endpoints, so the same user is looked up over and over;
+this cache keeps recently seen users in memory for a few seconds.
+
+Entries are keyed by the token's subject (username) and token version.
+Bumping a user's token_version (password change, role change, password
+reset) revokes their existing tokens, and the routes making those changes
+drop the user from the cache. Other workers see such changes once their
+entry expires (USER_CACHE_TTL).
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+import os
+import threading
+import time
+
+from api.database.models import User
+from api.services.metrics import CACHE_REQUESTS
+
+# Seconds a user is served from the cache
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+# Maximum number of cached users (least recently used are evicted)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+
+
+class UserCache:
+    """
+    TTL + LRU cache of detached User objects.
+    """
+
+    def __init__(self, ttl: float = USER_CACHE_TTL, max_size: int = USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str, token_version: int) -> Optional[User]:
+        """
+        Get a cached user.
+
+        Args:
+            username: Token subject
+            token_version: Token version claim
+
+        Returns:
+            The user, or None if not cached or expired
+        """
+        key = (username, token_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                CACHE_REQUESTS.inc(cache="user", result="miss")
+                return None
+            self._entries.move_to_end(key)
+        CACHE_REQUESTS.inc(cache="user", result="hit")
+        return entry[1]
+
+    def set(self, user: User) -> None:
+        """
+        Cache a user under its current token version.
+
+        Args:
+            user: User detached from its session
+        """
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        key = (user.username, user.token_version or 0)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str) -> None:
+        """
+        Drop every cached entry of a user.
+
+        Args:
+            username: Username of the changed user
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == username]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all cached users."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global user cache instance
+user_cache = UserCache()
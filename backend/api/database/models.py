@@ -3,7 +3,7 @@ SQLAlchemy database models for ISO Toolkit web application.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Float, BigInteger, Text, Enum as SQLEnum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Date, Float, BigInteger, Text, Enum as SQLEnum, Boolean, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 
 # Import enums from core to avoid duplication
@@ -85,6 +85,8 @@ class User(Base):
     is_admin = Column(Boolean, default=False, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     password_changed = Column(Boolean, default=False, nullable=False)
+    # Embedded in tokens; incrementing it revokes all issued tokens
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     last_login = Column(DateTime, nullable=True)
 
@@ -108,6 +110,14 @@ class DownloadRecord(Base):
     Persists download state across server restarts.
     """
     __tablename__ = "downloads"
+    __table_args__ = (
+        # Listing by state, newest first, and analytics date ranges per state
+        Index("ix_downloads_state_created_at", "state", "created_at"),
+        # Category breakdowns filtered by state
+        Index("ix_downloads_category_state", "os_category", "state"),
+        # Unfiltered listing (keyset pagination on created_at, id)
+        Index("ix_downloads_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     # OS Information
@@ -174,6 +184,105 @@ class DownloadRecord(Base):
         }
 
 
+class DownloadDailyStats(Base):
+    """
+    Daily rollup of completed downloads per OS.
+    Updated incrementally when a download completes; analytics read from
+    here instead of scanning the downloads table.
+    """
+    __tablename__ = "download_daily_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "day", "os_category", "os_architecture", "os_name", "os_version",
+            name="uq_download_daily_stats_bucket",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    os_category = Column(String, nullable=False)
+    os_architecture = Column(String, nullable=False)
+    os_name = Column(String, nullable=False)
+    os_version = Column(String, nullable=False)
+    download_count = Column(Integer, default=0, nullable=False)
+    total_bytes = Column(BigInteger, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "day": self.day.isoformat() if self.day else None,
+            "os_category": self.os_category,
+            "os_architecture": self.os_architecture,
+            "os_name": self.os_name,
+            "os_version": self.os_version,
+            "download_count": self.download_count,
+            "total_bytes": self.total_bytes,
+        }
+
+
+class LinkCheck(Base):
+    """
+    Result of one link-health check of a catalog URL.
+    Written by the background link crawler; the history shows how a
+    mirror behaved over time.
+    """
+    __tablename__ = "link_checks"
+    __table_args__ = (
+        Index("ix_link_checks_iso_id_checked_at", "iso_id", "checked_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    iso_id = Column(String(255), nullable=False)
+    url = Column(String(2048), nullable=False)
+    checked_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    # Outcome
+    is_alive = Column(Boolean, nullable=False)
+    status_code = Column(Integer, nullable=True)
+    content_length = Column(BigInteger, nullable=True)
+    content_type = Column(String(255), nullable=True)
+    supports_resume = Column(Boolean, default=False, nullable=False)
+    latency_ms = Column(Integer, nullable=True)
+    final_url = Column(String(2048), nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    # Failed checks in a row for this ISO and URL, including this one
+    consecutive_failures = Column(Integer, default=0, nullable=False)
+
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "iso_id": self.iso_id,
+            "url": self.url,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "is_alive": self.is_alive,
+            "status_code": self.status_code,
+            "content_length": self.content_length,
+            "content_type": self.content_type,
+            "supports_resume": self.supports_resume,
+            "latency_ms": self.latency_ms,
+            "final_url": self.final_url,
+            "error_message": self.error_message,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class RateLimitBucket(Base):
+    """
+    Token bucket of one rate-limited client, shared by all workers.
+    Only used with RATE_LIMIT_BACKEND=postgres.
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(255), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # Unix timestamps; the bucket is full again (and can be dropped) at expires_at
+    updated_at = Column(Float, nullable=False)
+    expires_at = Column(Float, nullable=False, index=True)
+
+
 class Settings(Base):
     """
     User settings stored in database.
@@ -1,15 +1,35 @@
 """
 Database session management for ISO Toolkit web application.
 Supports PostgreSQL for production (Render) and SQLite for local development.
+
+Two engines share the same database:
+- a sync engine (SessionLocal, get_db) for startup tasks, scripts and
+  admin routes
+- an async engine (AsyncSessionLocal, get_async_db) for request-path
+  routes, so queries never block the event loop
+
+Pool sizing for PostgreSQL is configurable with DB_POOL_SIZE,
+DB_MAX_OVERFLOW, DB_POOL_TIMEOUT and DB_POOL_RECYCLE.
+
+init_database() creates and migrates the schema and the default admin on
+startup. With DB_SKIP_MIGRATIONS=true the API skips it, and it is run once
+per release instead (python -m scripts.migrate).
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from pathlib import Path
-from typing import Generator
+from typing import AsyncGenerator, Generator
 import os
+import time
 
 from api.database.models import Base
+from api.services.metrics import DB_POOL_CHECKOUT
+
+# Skip init_database() on startup; the schema is migrated by a release step
+DB_SKIP_MIGRATIONS = os.getenv("DB_SKIP_MIGRATIONS", "false").lower() == "true"
 
 
 def get_database_url() -> str:
@@ -37,17 +57,97 @@ def get_database_url() -> str:
     return f"sqlite:///{db_path}"
 
 
+def get_async_database_url() -> str:
+    """
+    Get database URL for the async engine.
+
+    Returns:
+        Database URL using the asyncpg (PostgreSQL) or aiosqlite (SQLite) driver
+    """
+    database_url = get_database_url()
+    scheme, rest = database_url.split("://", 1)
+    if scheme.startswith("postgresql"):
+        # asyncpg takes "ssl" rather than libpq's "sslmode" query parameter
+        return f"postgresql+asyncpg://{rest.replace('sslmode=', 'ssl=')}"
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    return database_url
+
+
+class _TimedPoolMixin:
+    """Records how long each checkout waits for a connection (db_pool_checkout_seconds)."""
+
+    metrics_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT.observe(time.perf_counter() - started, pool=self.metrics_label)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    metrics_label = "sync"
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+def get_pool_options(for_async: bool = False) -> dict:
+    """
+    Get connection pool options from the environment.
+
+    SQLite uses SQLAlchemy's default pool for file databases, so the
+    options only apply to server databases.
+
+    Args:
+        for_async: Options for the async engine's pool
+
+    Returns:
+        Keyword arguments for create_engine/create_async_engine
+    """
+    if "sqlite" in get_database_url():
+        return {}
+    return {
+        "poolclass": TimedAsyncQueuePool if for_async else TimedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+
+
 # Create engine
 engine = create_engine(
     get_database_url(),
     connect_args={"check_same_thread": False} if "sqlite" in get_database_url() else {},
     echo=False,  # Set to True for SQL query logging
     pool_pre_ping=True,  # Verify connections before using
+    **get_pool_options(),
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async engine for request-path database access
+async_engine = create_async_engine(
+    get_async_database_url(),
+    echo=False,
+    pool_pre_ping=True,
+    **get_pool_options(for_async=True),
+)
+
+# Create async session factory
+# Objects stay usable after commit since routes return them after committing
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 def init_database():
     """Initialize database tables and create default admin user if needed."""
@@ -83,6 +183,22 @@ def init_database():
     finally:
         db.close()
 
+    migrate_columns()
+    migrate_indexes()
+
+    # Populate the analytics rollup for databases that predate it
+    from api.services.daily_stats import backfill_daily_stats_if_empty
+    db = SessionLocal()
+    try:
+        buckets = backfill_daily_stats_if_empty(db)
+        if buckets is not None:
+            print(f"Backfilled download_daily_stats ({buckets} buckets)")
+    except Exception as e:
+        db.rollback()
+        print(f"Error backfilling download_daily_stats: {e}")
+    finally:
+        db.close()
+
     # Create default admin user if it doesn't exist
     db = SessionLocal()
     try:
@@ -115,6 +231,48 @@ def init_database():
         db.close()
 
 
+# Columns added to models after their tables existed: (table, column, DDL)
+ADDED_COLUMNS = [
+    ("users", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+def migrate_columns():
+    """
+    Add columns that were added to models after their tables existed.
+
+    create_all() never alters existing tables, so missing columns are
+    added here. Safe to run on every startup.
+    """
+    from sqlalchemy import inspect, text
+
+    inspector = inspect(engine)
+    for table, column, ddl in ADDED_COLUMNS:
+        try:
+            existing = {col["name"] for col in inspector.get_columns(table)}
+            if column not in existing:
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                print(f"Added column {table}.{column}")
+        except Exception as e:
+            print(f"Error adding column {table}.{column}: {e}")
+
+
+def migrate_indexes():
+    """
+    Create indexes that were added to models after their tables existed.
+
+    create_all() only creates indexes together with new tables, so existing
+    databases are brought up to date here. Safe to run on every startup.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                print(f"Error creating index {index.name}: {e}")
+
+
 def get_session() -> Generator[Session, None, None]:
     """
     Get database session.
@@ -157,3 +315,24 @@ def get_db() -> Generator[Session, None, None]:
         raise
     finally:
         session.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get async database session for dependency injection.
+
+    Yields:
+        Async database session
+
+    Usage:
+        @app.get("/downloads")
+        async def get_downloads(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(DownloadRecord))
+            return result.scalars().all()
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
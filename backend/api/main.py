@@ -6,14 +6,25 @@ Serves both API endpoints and the frontend React app.
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import logging
 import os as os_module
-from pathlib import Path
 
-from api.database.session import init_database
-from api.routes import os, downloads, ws, auth, analytics, admin_iso, admin_settings, proxy_download
+from api.database.session import init_database, DB_SKIP_MIGRATIONS
+from api.services.events import event_broker
+from api.services.download import download_service
+from api.services.link_health import link_crawler, close_http_client
+from api.services.proxy_streaming import close_proxy_client
+from api.services.fast_json import JSON_RESPONSE_CLASS
+from api.services.static_assets import static_assets
+from api.middleware.compression import CompressionMiddleware
+from api.middleware.rate_limit import RateLimitMiddleware
+from api.middleware.metrics import MetricsMiddleware
+from api.services.metrics import loop_lag_probe
+from api.services.loop_watchdog import loop_watchdog, LOOP_WATCHDOG_ENABLED
+from api.auth.password_hasher import password_hasher, PasswordHasherBusy, RETRY_AFTER_SECONDS
+from api.routes import os, downloads, ws, auth, analytics, admin_iso, admin_links, admin_settings, admin_diagnostics, proxy_download, metrics
 
 # Configure logging
 logging.basicConfig(
@@ -30,18 +41,35 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info("Starting ISO Toolkit API...")
-    init_database()
-    frontend_dist = Path(__file__).parent.parent.parent / "frontend" / "dist"
-    if frontend_dist.exists():
-        logger.info(f"Frontend dist found at {frontend_dist}")
+    if DB_SKIP_MIGRATIONS:
+        # The schema is migrated by a release step (python -m scripts.migrate)
+        logger.info("Skipping database migrations (DB_SKIP_MIGRATIONS=true)")
     else:
-        logger.warning(f"Frontend dist folder not found at {frontend_dist}")
+        init_database()
+    if static_assets.dist_dir.exists():
+        logger.info(f"Frontend dist found at {static_assets.dist_dir}")
+        static_assets.load()
+    else:
+        logger.warning(f"Frontend dist folder not found at {static_assets.dist_dir}")
     logger.info("Database initialized")
+    await event_broker.start(download_service.handle_event)
+    # Providers are registered on first use (catalog request or link crawl)
+    await link_crawler.start()
+    await loop_lag_probe.start()
+    if LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
 
     yield
 
     # Shutdown
     logger.info("Shutting down ISO Toolkit API...")
+    loop_watchdog.stop()
+    await loop_lag_probe.stop()
+    await link_crawler.stop()
+    await close_http_client()
+    await close_proxy_client()
+    await event_broker.stop()
+    password_hasher.shutdown()
 
 
 # Create FastAPI app
@@ -50,6 +78,7 @@ app = FastAPI(
     description="Multi-OS ISO Downloader Toolkit - Web API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=JSON_RESPONSE_CLASS,
 )
 
 # Configure CORS
@@ -62,14 +91,34 @@ allowed_origins.extend([
     "http://127.0.0.1:3000",
 ])
 
+# Compress large JSON responses (innermost, so it sees the route's response)
+app.add_middleware(CompressionMiddleware)
+
+# Rate limiting runs inside CORS so 429 responses still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Request latency (outermost, so the time includes the other middleware)
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Shed load when too many logins are waiting for password hashing."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please try again shortly"},
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
 # Include routers
 app.include_router(os.router)
 app.include_router(downloads.router)
@@ -77,7 +126,10 @@ app.include_router(ws.router)
 app.include_router(auth.router)
 app.include_router(analytics.router)
 app.include_router(admin_iso.router)
+app.include_router(admin_links.router)
 app.include_router(admin_settings.router)
+app.include_router(admin_diagnostics.router)
+app.include_router(metrics.router)
 app.include_router(proxy_download.router)  # Must be last to avoid conflicts
 
 
@@ -106,13 +158,19 @@ async def api_info():
     }
 
 
+def serve_static(request: Request, asset):
+    """Answer a request from an in-memory frontend file."""
+    return asset.response(
+        request.headers.get("accept-encoding"),
+        request.headers.get("if-none-match"),
+    )
+
+
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Root endpoint - serve frontend or return API info."""
-    frontend_dist = Path(__file__).parent.parent.parent / "frontend" / "dist"
-    index_path = frontend_dist / "index.html"
-    if index_path.exists():
-        return FileResponse(str(index_path))
+    if static_assets.index is not None:
+        return serve_static(request, static_assets.index)
     return {
         "name": "ISO Toolkit API",
         "version": "1.0.0",
@@ -132,15 +190,13 @@ async def catch_all(request: Request, full_path: str):
     Catch-all route for SPA support.
     Serves static assets and index.html for non-API routes.
     """
-    frontend_dist = Path(__file__).parent.parent.parent / "frontend" / "dist"
-
-    # Serve static assets (CSS, JS, images)
+    # Serve built files (JS, CSS, logos) from the in-memory manifest
     # Handle both "assets/" and "/assets/" formats (index.html uses leading slashes)
     asset_path_relative = full_path.lstrip("/")
+    asset = static_assets.get(asset_path_relative)
+    if asset is not None and asset is not static_assets.index:
+        return serve_static(request, asset)
     if asset_path_relative.startswith("assets/"):
-        asset_path = frontend_dist / asset_path_relative
-        if asset_path.exists() and asset_path.is_file():
-            return FileResponse(str(asset_path))
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Asset not found")
 
@@ -155,9 +211,8 @@ async def catch_all(request: Request, full_path: str):
         raise HTTPException(status_code=404, detail="API endpoint not found")
 
     # For all other routes, serve index.html for SPA routing
-    index_path = frontend_dist / "index.html"
-    if index_path.exists():
-        return FileResponse(str(index_path))
+    if static_assets.index is not None:
+        return serve_static(request, static_assets.index)
 
     return {"error": "Frontend not built. Run: cd frontend && npm run build"}
 
@@ -0,0 +1,174 @@
+"""
+ASGI middleware compressing API responses with brotli or gzip.
+
+Catalog endpoints return large JSON arrays that are identical for every
+client until the catalog changes, so compressed bodies are cached by
+content digest: a repeated payload costs one hash instead of a fresh
+compression. Large bodies are compressed in a worker thread.
+
+Not compressed:
+- /download/* proxy streams and WebSockets
+- streaming responses (NDJSON export, SSE), which must not be buffered
+- responses that are already encoded (precompressed frontend files)
+- bodies below COMPRESSION_MIN_SIZE and non-text media types
+
+Configuration: COMPRESSION_ENABLED (true), COMPRESSION_MIN_SIZE (bytes,
+default 1024), COMPRESSION_CACHE_MB (default 32).
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+import hashlib
+import os
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.services.compression import choose_encoding, compress, is_compressible
+from api.services.metrics import CACHE_REQUESTS
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_CACHE_MB = int(os.getenv("COMPRESSION_CACHE_MB", "32"))
+
+# Paths never compressed (binary streams and WebSockets)
+EXCLUDED_PREFIXES = ("/download/", "/api/ws")
+
+# Bodies larger than this are compressed off the event loop
+THREADPOOL_MIN_SIZE = 64 * 1024
+
+
+class CompressedBodyCache:
+    """
+    LRU cache of compressed bodies keyed by encoding and content digest,
+    bounded by the total size of the cached compressed bodies.
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+
+    @staticmethod
+    def key(encoding: str, body: bytes) -> Tuple[str, bytes]:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[bytes]:
+        compressed = self._entries.get(key)
+        if compressed is None:
+            CACHE_REQUESTS.inc(cache="compression", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="compression", result="hit")
+        self._entries.move_to_end(key)
+        return compressed
+
+    def set(self, key: Tuple[str, bytes], compressed: bytes) -> None:
+        if len(compressed) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = compressed
+        self.size += len(compressed)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+# Global compressed body cache
+compressed_body_cache = CompressedBodyCache()
+
+
+async def compress_cached(body: bytes, encoding: str, cache: CompressedBodyCache = compressed_body_cache) -> bytes:
+    """
+    Compress a body, reusing the cached result for identical payloads.
+
+    Args:
+        body: Uncompressed bytes
+        encoding: "br" or "gzip"
+        cache: Cache of compressed bodies
+
+    Returns:
+        Compressed bytes
+    """
+    key = cache.key(encoding, body)
+    compressed = cache.get(key)
+    if compressed is None:
+        if len(body) >= THREADPOOL_MIN_SIZE:
+            compressed = await run_in_threadpool(compress, body, encoding)
+        else:
+            compressed = compress(body, encoding)
+        cache.set(key, compressed)
+    return compressed
+
+
+class CompressionMiddleware:
+    """
+    Compresses complete (non-streaming) responses the client accepts encoded.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        enabled: bool = COMPRESSION_ENABLED,
+        cache: CompressedBodyCache = compressed_body_cache,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.enabled = enabled
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http" or scope["path"].startswith(EXCLUDED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not is_compressible(headers.get("content-type")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Hold the headers until the body shows whether to compress
+                    start_message = message
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streaming or small: send as is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = await compress_cached(body, encoding, self.cache)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            start_message["headers"] = headers.raw
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
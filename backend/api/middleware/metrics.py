@@ -0,0 +1,52 @@
+"""
+ASGI middleware recording HTTP request latency per route.
+
+Requests are labelled with the matched route template (e.g.
+/api/os/{category}) rather than the raw path, so the number of series stays
+bounded. Proxy downloads (/download/*) are long-lived streams whose
+duration says nothing about the server; they are measured in bytes by
+iso_toolkit_proxy_bytes_streamed_total instead.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.services.metrics import HTTP_REQUEST_DURATION
+
+EXCLUDED_PREFIXES = ("/download/", "/metrics")
+
+
+class MetricsMiddleware:
+    """
+    Observes the duration of each HTTP request until its last body chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(EXCLUDED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            )
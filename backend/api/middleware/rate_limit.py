@@ -0,0 +1,99 @@
+"""
+ASGI middleware applying per-client rate limits.
+
+Requests are matched by path prefix to a limiter and keyed by client IP:
+- /download/ (proxy downloads): RATE_LIMIT_PROXY_PER_MINUTE (default 60),
+  keyed by client IP and path. Requests with a Range header are not
+  counted: a resumed or segmented (IDM-style) download sends many of them
+  for one file, and clients behind NAT share an IP, so only starting a
+  download counts against the limit.
+- /api/: RATE_LIMIT_API_PER_MINUTE (default 300)
+
+WebSockets, CORS preflights, /health and the frontend are not limited.
+Set RATE_LIMIT_ENABLED=false to turn the middleware off.
+"""
+
+from typing import List, Optional, Tuple
+import hashlib
+import json
+import os
+
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.auth.rate_limiter import RateLimiter, get_client_ip
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_API_PER_MINUTE = int(os.getenv("RATE_LIMIT_API_PER_MINUTE", "300"))
+RATE_LIMIT_PROXY_PER_MINUTE = int(os.getenv("RATE_LIMIT_PROXY_PER_MINUTE", "60"))
+
+# (path prefix, limiter, per_path); per_path rules key buckets by client IP
+# and path, and don't count Range requests
+Rule = Tuple[str, RateLimiter, bool]
+
+
+def default_rules() -> List[Rule]:
+    """Path prefixes and their limiters, most specific first."""
+    return [
+        ("/download/", RateLimiter("proxy", limit=RATE_LIMIT_PROXY_PER_MINUTE, window_seconds=60), True),
+        ("/api/", RateLimiter("api", limit=RATE_LIMIT_API_PER_MINUTE, window_seconds=60), False),
+    ]
+
+
+class RateLimitMiddleware:
+    """
+    Rejects requests over their path's limit with 429 and Retry-After.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rules: Optional[List[Rule]] = None,
+        enabled: bool = RATE_LIMIT_ENABLED,
+    ):
+        self.app = app
+        self.rules = default_rules() if rules is None else rules
+        self.enabled = enabled
+
+    def _rule_for(self, path: str) -> Optional[Rule]:
+        for rule in self.rules:
+            if path.startswith(rule[0]):
+                return rule
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self._rule_for(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        _, limiter, per_path = rule
+        connection = HTTPConnection(scope)
+        key = get_client_ip(connection)
+        if per_path:
+            if "range" in connection.headers:
+                await self.app(scope, receive, send)
+                return
+            # Hashed so keys stay short enough for the postgres backend
+            key = f"{key} {hashlib.sha1(scope['path'].encode()).hexdigest()}"
+
+        allowed, retry_after = await limiter.check(key)
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": f"Too many requests. Please try again in {retry_after} seconds."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
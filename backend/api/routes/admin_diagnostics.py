@@ -0,0 +1,73 @@
+"""
+Runtime diagnostics routes for admin panel.
+Reports event-loop stalls caught by the loop watchdog and runs the
+sampling profiler on demand.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Literal
+
+from api.database.models import User
+from api.routes.auth import get_current_admin_user
+from api.services.loop_watchdog import loop_watchdog
+from api.services.profiler import sampling_profiler, ProfilerBusy, MAX_DURATION_SECONDS
+
+router = APIRouter(prefix="/api/admin/diagnostics", tags=["Admin Diagnostics"])
+
+
+@router.get("/loop-stalls")
+async def get_loop_stalls(
+    current_admin: User = Depends(get_current_admin_user),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """
+    Get the callbacks that blocked the event loop, grouped by route and function (admin only).
+    Requires LOOP_WATCHDOG_ENABLED=true.
+    """
+    return loop_watchdog.report(limit)
+
+
+@router.delete("/loop-stalls", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_loop_stalls(
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    Clear the recorded event-loop stalls (admin only).
+    """
+    loop_watchdog.clear()
+
+
+@router.get("/profile")
+async def profile_process(
+    current_admin: User = Depends(get_current_admin_user),
+    seconds: float = Query(10, gt=0, le=MAX_DURATION_SECONDS),
+    interval_ms: int = Query(10, ge=1, le=1000),
+    format: Literal["collapsed", "speedscope"] = "collapsed",
+):
+    """
+    Sample the stacks of every thread for a number of seconds (admin only).
+    Returns collapsed stacks (text) or a speedscope JSON file.
+    Only one profiling session can run at a time.
+    """
+    if sampling_profiler.running:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profiling session is already running"
+        )
+    try:
+        # The sampler sleeps between samples, so it runs off the event loop
+        result = await run_in_threadpool(sampling_profiler.profile, seconds, interval_ms / 1000)
+    except ProfilerBusy:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profiling session is already running"
+        )
+
+    if format == "speedscope":
+        return JSONResponse(
+            result.speedscope(),
+            headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'},
+        )
+    return PlainTextResponse(result.collapsed())
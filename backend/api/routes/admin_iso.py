@@ -4,46 +4,42 @@ Allows CRUD operations on ISO entries, including overriding built-in ISOs.
 Uses database storage for persistence across server restarts.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, EmailStr, HttpUrl
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, EmailStr, HttpUrl, field_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-import httpx
 import json
 
-from api.database.session import get_db
+from api.database.session import get_db, get_async_db, AsyncSessionLocal
 from api.database.models import User, ISOOverride
 from api.routes.auth import get_current_admin_user
+from api.services.iso_overrides import (
+    BATCH_SIZE,
+    OVERRIDE_FIELDS,
+    builtin_iso_fields,
+    builtin_iso_id,
+    find_builtin_isos,
+    import_overrides,
+    load_overrides,
+    override_fields_from,
+    upsert_overrides,
+)
+from api.services.ndjson import NDJSON_MEDIA_TYPE, encode_line, iter_lines
+from api.services.catalog import ensure_providers, get_catalog
+from api.services.link_health import get_http_client, probe_many, probe_url
 from core.models import OSInfo, OSCategory, Architecture
 from core.os.base import get_registry
-from core.os.windows import WindowsProvider
-from core.os.linux import LinuxProvider
-from core.os.macos import MacOSProvider
-from core.os.bsd import BSDProvider
 
 router = APIRouter(prefix="/api/admin/iso", tags=["Admin ISO Management"])
 
-# Initialize providers on startup
-_providers_initialized = False
-
 
 def _init_providers():
-    """Initialize OS providers."""
-    global _providers_initialized
-    if not _providers_initialized:
-        registry = get_registry()
-        registry.register(WindowsProvider())
-        registry.register(LinuxProvider())
-        registry.register(MacOSProvider())
-        registry.register(BSDProvider())
-        _providers_initialized = True
-
-
-@router.on_event("startup")
-async def startup():
-    """Initialize providers on startup."""
-    _init_providers()
+    """Initialize OS providers (on first use)."""
+    ensure_providers()
 
 
 class ISOCreate(BaseModel):
@@ -108,8 +104,6 @@ def generate_iso_id(iso_data: ISOCreate) -> str:
 async def fetch_isos_from_category(category: OSCategory, db: Session) -> List[dict]:
     """Fetch all ISOs from a specific category using the provider registry."""
     _init_providers()
-    registry = get_registry()
-    providers = registry.get_by_category(category)
 
     all_isos = []
 
@@ -122,41 +116,42 @@ async def fetch_isos_from_category(category: OSCategory, db: Session) -> List[di
     # Create a lookup dict for overrides
     override_map = {override.iso_id: override for override in overrides}
 
-    for provider in providers:
-        try:
-            os_list = await provider.fetch_available()
-            for os_info in os_list:
-                iso_id = f"{os_info.category.value}_{os_info.name.lower()}_{os_info.version.lower()}_{os_info.architecture.value}"
-
-                # Check if there's a database override
-                if iso_id in override_map:
-                    override = override_map[iso_id]
-                    all_isos.append(override.to_dict())
-                else:
-                    # Use built-in data
-                    all_isos.append({
-                        "id": iso_id,
-                        "name": os_info.name,
-                        "version": os_info.version,
-                        "category": os_info.category.value,
-                        "architecture": os_info.architecture.value,
-                        "language": os_info.language,
-                        "url": os_info.url,
-                        "size": os_info.size or 0,
-                        "description": os_info.description,
-                        "icon": os_info.icon,
-                        "checksum": os_info.checksum,
-                        "checksum_type": os_info.checksum_type,
-                        "created_at": None,
-                        "updated_at": None,
-                        "created_by": None,
-                        "updated_by": None,
-                        "is_custom": False,
-                        "is_enabled": True,
-                        "can_edit": True
-                    })
-        except Exception:
-            pass
+    try:
+        entries = await get_catalog(category)
+    except Exception:
+        entries = []
+
+    for entry in entries:
+        iso_id = entry.iso_id
+        os_info = entry.os_info
+
+        # Check if there's a database override
+        if iso_id in override_map:
+            override = override_map[iso_id]
+            all_isos.append(override.to_dict())
+        else:
+            # Use built-in data
+            all_isos.append({
+                "id": iso_id,
+                "name": os_info.name,
+                "version": os_info.version,
+                "category": os_info.category.value,
+                "architecture": os_info.architecture.value,
+                "language": os_info.language,
+                "url": os_info.url,
+                "size": os_info.size or 0,
+                "description": os_info.description,
+                "icon": os_info.icon,
+                "checksum": os_info.checksum,
+                "checksum_type": os_info.checksum_type,
+                "created_at": None,
+                "updated_at": None,
+                "created_by": None,
+                "updated_by": None,
+                "is_custom": False,
+                "is_enabled": True,
+                "can_edit": True
+            })
 
     return all_isos
 
@@ -297,51 +292,35 @@ async def update_iso(
         return existing.to_dict()
     else:
         # This is a built-in ISO that doesn't exist in database yet
-        # Create a database override for it
-        # First, we need to fetch the original built-in ISO data to use as base
-        for cat in [OSCategory.WINDOWS, OSCategory.LINUX, OSCategory.MACOS, OSCategory.BSD]:
-            try:
-                cat_isos = await fetch_isos_from_category(cat, db)
-                for built_in_iso in cat_isos:
-                    if built_in_iso["id"] == iso_id and not built_in_iso.get("is_custom"):
-                        # Found the built-in ISO, create override
-                        new_override = ISOOverride(
-                            iso_id=iso_id,
-                            name=built_in_iso["name"],
-                            version=built_in_iso["version"],
-                            category=built_in_iso["category"],
-                            architecture=built_in_iso["architecture"],
-                            language=built_in_iso["language"],
-                            url=built_in_iso["url"],
-                            size=built_in_iso.get("size", 0),
-                            description=built_in_iso.get("description"),
-                            icon=built_in_iso.get("icon"),
-                            checksum=built_in_iso.get("checksum"),
-                            checksum_type=built_in_iso.get("checksum_type"),
-                            created_by=current_admin.username,
-                            is_enabled=True
-                        )
-
-                        # Apply updates
-                        if iso_data.name is not None:
-                            new_override.name = iso_data.name
-                        if iso_data.version is not None:
-                            new_override.version = iso_data.version
-                        if iso_data.url is not None:
-                            new_override.url = iso_data.url
-                        if iso_data.size is not None:
-                            new_override.size = iso_data.size
-                        if iso_data.description is not None:
-                            new_override.description = iso_data.description
-                        if iso_data.icon is not None:
-                            new_override.icon = iso_data.icon
-
-                        db.add(new_override)
-                        db.commit()
-                        db.refresh(new_override)
-                        return new_override.to_dict()
-            except Exception:
-                pass
+        # Create a database override for it, using the built-in data as base
+        _init_providers()
+        built_in_iso = (await find_builtin_isos([iso_id])).get(iso_id)
+        if built_in_iso:
+            new_override = ISOOverride(
+                iso_id=iso_id,
+                **built_in_iso,
+                created_by=current_admin.username,
+                is_enabled=True
+            )
+
+            # Apply updates
+            if iso_data.name is not None:
+                new_override.name = iso_data.name
+            if iso_data.version is not None:
+                new_override.version = iso_data.version
+            if iso_data.url is not None:
+                new_override.url = iso_data.url
+            if iso_data.size is not None:
+                new_override.size = iso_data.size
+            if iso_data.description is not None:
+                new_override.description = iso_data.description
+            if iso_data.icon is not None:
+                new_override.icon = iso_data.icon
+
+            db.add(new_override)
+            db.commit()
+            db.refresh(new_override)
+            return new_override.to_dict()
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -430,6 +409,23 @@ class URLValidationResponse(BaseModel):
     requires_bypass: bool = False
 
 
+def _validation_response(url: str, result: Dict[str, Any]) -> URLValidationResponse:
+    """Build a validation response from a link probe result."""
+    content_type = result["content_type"]
+    return URLValidationResponse(
+        url=url,
+        is_valid=result["is_alive"],
+        status_code=result["status_code"],
+        content_length=result["content_length"],
+        content_type=content_type,
+        supports_resume=result["supports_resume"],
+        error_message=result["error_message"],
+        redirect_url=result["final_url"],
+        # Check if response contains Cloudflare or protection page
+        requires_bypass=bool(content_type and "text/html" in content_type),
+    )
+
+
 @router.post("/validate-url", response_model=URLValidationResponse)
 async def validate_iso_url(
     request: URLValidationRequest,
@@ -439,83 +435,86 @@ async def validate_iso_url(
     Validate if a URL is accessible and get file information.
     Useful for testing URLs before adding them to the database.
     Detects if URL requires Cloudflare/bypass.
+    Uses a ranged GET for the first byte on the shared HTTP client.
     """
-    try:
-        async with httpx.AsyncClient(timeout=request.timeout, follow_redirects=True) as client:
-            # First try HEAD request to check without downloading
-            try:
-                response = await client.head(request.url)
-                status_code = response.status_code
-                content_length = response.headers.get("content-length")
-                content_type = response.headers.get("content-type")
-                supports_resume = response.headers.get("accept-ranges") == "bytes"
-                redirect_url = str(response.url) if str(response.url) != request.url else None
-
-                # Check if response contains Cloudflare or protection page
-                requires_bypass = False
-                if content_type and "text/html" in content_type:
-                    requires_bypass = True
-
-                if content_length:
-                    try:
-                        content_length = int(content_length)
-                    except ValueError:
-                        content_length = None
-
-                return URLValidationResponse(
-                    url=request.url,
-                    is_valid=status_code < 400 and not requires_bypass,
-                    status_code=status_code,
-                    content_length=content_length,
-                    content_type=content_type,
-                    supports_resume=supports_resume,
-                    redirect_url=redirect_url,
-                    requires_bypass=requires_bypass,
-                    error_message="URL returns HTML (may require Cloudflare bypass)" if requires_bypass else None
-                )
-            except Exception as e:
-                # If HEAD fails, try GET (some servers don't support HEAD)
-                try:
-                    response = await client.get(request.url, headers={"Range": "bytes=0-1023"})
-                    status_code = response.status_code
-                    content_length = response.headers.get("content-length")
-                    content_type = response.headers.get("content-type")
-                    supports_resume = response.headers.get("accept-ranges") == "bytes"
-                    redirect_url = str(response.url) if str(response.url) != request.url else None
-
-                    requires_bypass = False
-                    if content_type and "text/html" in content_type:
-                        requires_bypass = True
-
-                    if content_length:
-                        try:
-                            content_length = int(content_length)
-                        except ValueError:
-                            content_length = None
-
-                    return URLValidationResponse(
-                        url=request.url,
-                        is_valid=status_code < 400 and not requires_bypass,
-                        status_code=status_code,
-                        content_length=content_length,
-                        content_type=content_type,
-                        supports_resume=supports_resume,
-                        redirect_url=redirect_url,
-                        requires_bypass=requires_bypass,
-                        error_message="URL returns HTML (may require Cloudflare bypass)" if requires_bypass else None
-                    )
-                except Exception as e2:
-                    return URLValidationResponse(
-                        url=request.url,
-                        is_valid=False,
-                        error_message=str(e2)
-                    )
-    except Exception as e:
-        return URLValidationResponse(
-            url=request.url,
-            is_valid=False,
-            error_message=str(e)
-        )
+    result = await probe_url(get_http_client(), request.url, timeout=request.timeout)
+    return _validation_response(request.url, result)
+
+
+# Limits for batch URL validation
+MAX_BATCH_URLS = 500
+MAX_BATCH_CONCURRENCY = 50
+
+
+class BatchURLValidationRequest(BaseModel):
+    urls: List[str]
+    timeout: int = 10  # seconds per URL
+    concurrency: int = 10
+    per_host: int = 2
+
+    @field_validator('urls')
+    @classmethod
+    def validate_urls(cls, v):
+        if len(v) > MAX_BATCH_URLS:
+            raise ValueError(f'At most {MAX_BATCH_URLS} URLs can be validated at once')
+        return v
+
+
+async def _stream_validation(request: BatchURLValidationRequest, sse: bool):
+    """Validate URLs concurrently and yield each result as it completes."""
+    # Identical URLs are checked once
+    urls = list(dict.fromkeys(url.strip() for url in request.urls if url.strip()))
+    # Final URL after redirects -> first input URL that reached it
+    targets: Dict[str, str] = {}
+    valid_count = 0
+
+    results = probe_many(
+        get_http_client(),
+        ((url, url) for url in urls),
+        concurrency=max(1, min(request.concurrency, MAX_BATCH_CONCURRENCY)),
+        per_host=max(1, request.per_host),
+        timeout=request.timeout,
+    )
+    async for url, _, result in results:
+        item = _validation_response(url, result).model_dump()
+        item["latency_ms"] = result["latency_ms"]
+
+        # Mirrors that redirect to the same file are reported as duplicates
+        target = result["final_url"] or url
+        item["duplicate_of"] = targets.get(target) if result["is_alive"] else None
+        if result["is_alive"]:
+            targets.setdefault(target, url)
+            valid_count += 1
+
+        if sse:
+            yield f"event: result\ndata: {json.dumps(item)}\n\n".encode("utf-8")
+        else:
+            yield encode_line(item)
+
+    if sse:
+        summary = {"total": len(urls), "valid": valid_count, "invalid": len(urls) - valid_count}
+        yield f"event: done\ndata: {json.dumps(summary)}\n\n".encode("utf-8")
+
+
+@router.post("/validate-urls")
+async def validate_iso_urls(
+    request: BatchURLValidationRequest,
+    http_request: Request,
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    Validate many URLs at once, streaming each result as soon as it is ready.
+    Results are NDJSON lines, or Server-Sent Events ("result" events and a
+    final "done" event) when the client accepts text/event-stream.
+    Duplicate URLs are checked once; requests to each host are limited to
+    per_host at a time.
+    """
+    sse = "text/event-stream" in http_request.headers.get("accept", "")
+    return StreamingResponse(
+        _stream_validation(request, sse),
+        media_type="text/event-stream" if sse else NDJSON_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache"},
+    )
 
 
 # ============================================================================
@@ -545,90 +544,42 @@ async def bulk_update_isos(
     """
     Update multiple ISOs at once (admin only).
     Creates database overrides for all specified ISOs.
+    Runs as one transaction with set-based statements.
     """
-    results = []
-
-    for iso_id in request.iso_ids:
-        existing = db.query(ISOOverride).filter(ISOOverride.iso_id == iso_id).first()
-
-        if existing:
-            # Update existing override
-            if request.updates.name is not None:
-                existing.name = request.updates.name
-            if request.updates.version is not None:
-                existing.version = request.updates.version
-            if request.updates.category is not None:
-                existing.category = request.updates.category
-            if request.updates.architecture is not None:
-                existing.architecture = request.updates.architecture
-            if request.updates.language is not None:
-                existing.language = request.updates.language
-            if request.updates.url is not None:
-                existing.url = request.updates.url
-            if request.updates.size is not None:
-                existing.size = request.updates.size
-            if request.updates.description is not None:
-                existing.description = request.updates.description
-            if request.updates.icon is not None:
-                existing.icon = request.updates.icon
-            if request.updates.checksum is not None:
-                existing.checksum = request.updates.checksum
-            if request.updates.checksum_type is not None:
-                existing.checksum_type = request.updates.checksum_type
-
-            existing.updated_at = datetime.utcnow()
-            existing.updated_by = current_admin.username
+    iso_ids = list(dict.fromkeys(request.iso_ids))
+    changes = request.updates.model_dump(exclude_none=True)
+
+    existing = load_overrides(db, iso_ids)
+    if existing and changes:
+        db.execute(
+            update(ISOOverride)
+            .where(ISOOverride.iso_id.in_(list(existing)))
+            .values(**changes, updated_at=datetime.utcnow(), updated_by=current_admin.username),
+            execution_options={"synchronize_session": False},
+        )
 
-            db.commit()
-            db.refresh(existing)
-            results.append(existing.to_dict())
-        else:
-            # Find built-in ISO and create override
-            for cat in [OSCategory.WINDOWS, OSCategory.LINUX, OSCategory.MACOS, OSCategory.BSD]:
-                try:
-                    cat_isos = await fetch_isos_from_category(cat, db)
-                    for built_in_iso in cat_isos:
-                        if built_in_iso["id"] == iso_id and not built_in_iso.get("is_custom"):
-                            new_override = ISOOverride(
-                                iso_id=iso_id,
-                                name=built_in_iso["name"],
-                                version=built_in_iso["version"],
-                                category=built_in_iso["category"],
-                                architecture=built_in_iso["architecture"],
-                                language=built_in_iso["language"],
-                                url=built_in_iso["url"],
-                                size=built_in_iso.get("size", 0),
-                                description=built_in_iso.get("description"),
-                                icon=built_in_iso.get("icon"),
-                                checksum=built_in_iso.get("checksum"),
-                                checksum_type=built_in_iso.get("checksum_type"),
-                                created_by=current_admin.username,
-                                is_enabled=True
-                            )
-
-                            # Apply updates
-                            if request.updates.name is not None:
-                                new_override.name = request.updates.name
-                            if request.updates.version is not None:
-                                new_override.version = request.updates.version
-                            if request.updates.url is not None:
-                                new_override.url = request.updates.url
-                            if request.updates.size is not None:
-                                new_override.size = request.updates.size
-                            if request.updates.description is not None:
-                                new_override.description = request.updates.description
-                            if request.updates.icon is not None:
-                                new_override.icon = request.updates.icon
-
-                            db.add(new_override)
-                            db.commit()
-                            db.refresh(new_override)
-                            results.append(new_override.to_dict())
-                            break
-                except Exception:
-                    pass
-
-    return results
+    _init_providers()
+    # Built-in ISOs without an override get one
+    missing = [iso_id for iso_id in iso_ids if iso_id not in existing]
+    builtin = await find_builtin_isos(missing) if missing else {}
+    # Only these fields are applied when first overriding a built-in ISO
+    new_fields = {
+        field: value for field, value in changes.items()
+        if field in ("name", "version", "url", "size", "description", "icon")
+    }
+    upsert_overrides(
+        db,
+        [
+            {"iso_id": iso_id, **override_fields_from(new_fields, base=builtin[iso_id])}
+            for iso_id in missing if iso_id in builtin
+        ],
+        current_admin.username,
+    )
+
+    db.commit()
+
+    overrides = load_overrides(db, iso_ids)
+    return [overrides[iso_id].to_dict() for iso_id in iso_ids if iso_id in overrides]
 
 
 @router.post("/bulk/delete")
@@ -641,16 +592,15 @@ async def bulk_delete_isos(
     Delete multiple custom ISOs at once (admin only).
     Only removes custom overrides, not built-in ISOs.
     """
-    deleted_count = 0
-    deleted_names = []
-
-    for iso_id in request.iso_ids:
-        override = db.query(ISOOverride).filter(ISOOverride.iso_id == iso_id).first()
-        if override:
-            deleted_names.append(override.name)
-            db.delete(override)
-            deleted_count += 1
+    existing = load_overrides(db, list(dict.fromkeys(request.iso_ids)))
+    deleted_names = [override.name for override in existing.values()]
+    deleted_count = len(deleted_names)
 
+    if existing:
+        db.execute(
+            delete(ISOOverride).where(ISOOverride.iso_id.in_(list(existing))),
+            execution_options={"synchronize_session": False},
+        )
     db.commit()
 
     return {
@@ -669,15 +619,17 @@ async def bulk_toggle_isos(
     """
     Enable or disable multiple ISOs at once (admin only).
     """
-    updated_count = 0
-
-    for iso_id in request.iso_ids:
-        override = db.query(ISOOverride).filter(ISOOverride.iso_id == iso_id).first()
-        if override:
-            override.is_enabled = request.is_enabled
-            override.updated_at = datetime.utcnow()
-            override.updated_by = current_admin.username
-            updated_count += 1
+    result = db.execute(
+        update(ISOOverride)
+        .where(ISOOverride.iso_id.in_(list(dict.fromkeys(request.iso_ids))))
+        .values(
+            is_enabled=request.is_enabled,
+            updated_at=datetime.utcnow(),
+            updated_by=current_admin.username,
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    updated_count = result.rowcount
 
     db.commit()
 
@@ -750,71 +702,27 @@ async def import_isos(
     - "replace": Replace all existing ISOs with imported ones
     - "skip": Skip existing ISOs, only create new ones
     """
-    created_count = 0
-    updated_count = 0
-    skipped_count = 0
     errors = []
 
-    if request.mode == "replace":
-        # Delete all existing overrides first
-        db.query(ISOOverride).delete()
-        db.commit()
-
+    # Later entries with the same ID win, as if applied one by one
+    rows: Dict[str, Dict[str, Any]] = {}
     for iso_data in request.isos:
         try:
             iso_id = generate_iso_id(iso_data)
-            existing = db.query(ISOOverride).filter(ISOOverride.iso_id == iso_id).first()
-
-            if existing:
-                if request.mode == "skip":
-                    skipped_count += 1
-                    continue
-
-                # Update existing
-                existing.name = iso_data.name
-                existing.version = iso_data.version
-                existing.category = iso_data.category
-                existing.architecture = iso_data.architecture
-                existing.language = iso_data.language
-                existing.url = iso_data.url
-                existing.size = iso_data.size
-                existing.description = iso_data.description
-                existing.icon = iso_data.icon
-                existing.checksum = iso_data.checksum
-                existing.checksum_type = iso_data.checksum_type
-                existing.updated_at = datetime.utcnow()
-                existing.updated_by = current_admin.username
-                existing.is_enabled = True
-
-                updated_count += 1
-            else:
-                # Create new
-                new_override = ISOOverride(
-                    iso_id=iso_id,
-                    name=iso_data.name,
-                    version=iso_data.version,
-                    category=iso_data.category,
-                    architecture=iso_data.architecture,
-                    language=iso_data.language,
-                    url=iso_data.url,
-                    size=iso_data.size,
-                    description=iso_data.description,
-                    icon=iso_data.icon,
-                    checksum=iso_data.checksum,
-                    checksum_type=iso_data.checksum_type,
-                    created_by=current_admin.username,
-                    is_enabled=True
-                )
-
-                db.add(new_override)
-                created_count += 1
-
+            rows[iso_id] = {"iso_id": iso_id, **override_fields_from(iso_data.model_dump())}
         except Exception as e:
             errors.append({
                 "iso": iso_data.name if hasattr(iso_data, 'name') else 'unknown',
                 "error": str(e)
             })
 
+    if request.mode == "replace":
+        # Delete all existing overrides first
+        db.execute(delete(ISOOverride))
+
+    created_count, updated_count, skipped_count = import_overrides(
+        db, list(rows.values()), current_admin.username, request.mode
+    )
     db.commit()
 
     return {
@@ -826,6 +734,134 @@ async def import_isos(
     }
 
 
+# Errors reported back from a streaming import (the rest are only counted)
+MAX_IMPORT_ERRORS = 100
+
+
+async def _stream_export(category: Optional[str], include_builtin: bool):
+    """Yield the export as NDJSON lines, reading the database in batches."""
+    async with AsyncSessionLocal() as db:
+        if include_builtin:
+            registry = get_registry()
+            for cat in [OSCategory.WINDOWS, OSCategory.LINUX, OSCategory.MACOS, OSCategory.BSD]:
+                if category and cat.value != category.lower():
+                    continue
+                for provider in registry.get_by_category(cat):
+                    try:
+                        os_list = await provider.fetch_available()
+                    except Exception:
+                        continue
+                    builtin = {builtin_iso_id(os_info): os_info for os_info in os_list}
+                    # Overridden ISOs are exported from the database below
+                    overridden = set((await db.scalars(
+                        select(ISOOverride.iso_id).where(ISOOverride.iso_id.in_(list(builtin)))
+                    )).all())
+                    for iso_id, os_info in builtin.items():
+                        if iso_id not in overridden:
+                            line = builtin_iso_fields(os_info)
+                            if os_info.mirrors:
+                                line["mirrors"] = list(os_info.mirrors)
+                            yield encode_line(line)
+
+        query = select(ISOOverride).where(ISOOverride.is_enabled == True).order_by(ISOOverride.id)
+        if category:
+            query = query.where(func.lower(ISOOverride.category) == category.lower())
+
+        overrides = await db.stream_scalars(query.execution_options(yield_per=BATCH_SIZE))
+        async for override in overrides:
+            yield encode_line({field: getattr(override, field) for field in OVERRIDE_FIELDS})
+
+
+@router.get("/export/ndjson")
+async def export_isos_ndjson(
+    current_admin: User = Depends(get_current_admin_user),
+    category: Optional[str] = None,
+    include_builtin: bool = False
+):
+    """
+    Stream ISOs as NDJSON, one ISO per line (admin only).
+    Lines have the same fields as /export entries and can be sent back to
+    /import/ndjson. Built-in ISOs that list mirrors also carry a "mirrors"
+    array; overrides have no mirror column, so import ignores it. Rows are
+    streamed as they are read, so memory use does not grow with the
+    catalog size.
+    """
+    _init_providers()
+    filename = f"isos-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.ndjson"
+    return StreamingResponse(
+        _stream_export(category, include_builtin),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import/ndjson", response_model=Dict[str, Any])
+async def import_isos_ndjson(
+    request: Request,
+    mode: str = "update",
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Import ISOs from an NDJSON request body, one ISO per line (admin only).
+    The body is read incrementally; lines are validated and upserted in
+    batches within a single transaction. Invalid lines are reported and
+    skipped. Modes are the same as for /import.
+    """
+    if mode not in ("update", "replace", "skip"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid mode. Valid options: update, replace, skip"
+        )
+
+    created_count = updated_count = skipped_count = error_count = 0
+    errors = []
+    batch: List[Dict[str, Any]] = []
+
+    async def flush():
+        nonlocal created_count, updated_count, skipped_count
+        created, updated, skipped = await db.run_sync(
+            import_overrides, batch, current_admin.username, mode
+        )
+        created_count += created
+        updated_count += updated
+        skipped_count += skipped
+        batch.clear()
+
+    if mode == "replace":
+        # Delete all existing overrides first (rolled back if the import fails)
+        await db.execute(delete(ISOOverride))
+
+    try:
+        async for line_number, line in iter_lines(request.stream()):
+            try:
+                iso_data = ISOCreate.model_validate_json(line)
+                batch.append({"iso_id": generate_iso_id(iso_data), **override_fields_from(iso_data.model_dump())})
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < MAX_IMPORT_ERRORS:
+                    errors.append({"line": line_number, "error": str(e)})
+                continue
+
+            if len(batch) >= BATCH_SIZE:
+                await flush()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if batch:
+        await flush()
+    await db.commit()
+
+    return {
+        "message": f"Import completed: {created_count} created, {updated_count} updated, {skipped_count} skipped",
+        "created": created_count,
+        "updated": updated_count,
+        "skipped": skipped_count,
+        "error_count": error_count,
+        "errors": errors
+    }
+
+
 # ============================================================================
 # Quick Actions
 # ============================================================================
@@ -871,34 +907,23 @@ async def quick_update_url(
         return existing.to_dict()
     else:
         # Find built-in ISO and create override
-        for cat in [OSCategory.WINDOWS, OSCategory.LINUX, OSCategory.MACOS, OSCategory.BSD]:
-            try:
-                cat_isos = await fetch_isos_from_category(cat, db)
-                for built_in_iso in cat_isos:
-                    if built_in_iso["id"] == request.iso_id and not built_in_iso.get("is_custom"):
-                        new_override = ISOOverride(
-                            iso_id=request.iso_id,
-                            name=built_in_iso["name"],
-                            version=built_in_iso["version"],
-                            category=built_in_iso["category"],
-                            architecture=built_in_iso["architecture"],
-                            language=built_in_iso["language"],
-                            url=request.new_url,
-                            size=validation.content_length if validation and validation.content_length else built_in_iso.get("size", 0),
-                            description=built_in_iso.get("description"),
-                            icon=built_in_iso.get("icon"),
-                            checksum=built_in_iso.get("checksum"),
-                            checksum_type=built_in_iso.get("checksum_type"),
-                            created_by=current_admin.username,
-                            is_enabled=True
-                        )
-
-                        db.add(new_override)
-                        db.commit()
-                        db.refresh(new_override)
-                        return new_override.to_dict()
-            except Exception:
-                pass
+        _init_providers()
+        built_in_iso = (await find_builtin_isos([request.iso_id])).get(request.iso_id)
+        if built_in_iso:
+            new_override = ISOOverride(
+                iso_id=request.iso_id,
+                **built_in_iso,
+                created_by=current_admin.username,
+                is_enabled=True
+            )
+            new_override.url = request.new_url
+            if validation and validation.content_length:
+                new_override.size = validation.content_length
+
+            db.add(new_override)
+            db.commit()
+            db.refresh(new_override)
+            return new_override.to_dict()
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,94 @@
+"""
+Link health routes for admin panel.
+Shows the results of the background link crawler and starts crawls.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from api.database.session import get_async_db
+from api.database.models import User, LinkCheck
+from api.routes.auth import get_current_admin_user
+from api.services.link_health import link_crawler, latest_checks_query
+
+router = APIRouter(prefix="/api/admin/links", tags=["Admin Link Health"])
+
+
+@router.get("/status")
+async def get_link_crawler_status(
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    Get the link crawler configuration and the summary of its last run (admin only).
+    """
+    return link_crawler.status()
+
+
+@router.post("/check", status_code=status.HTTP_202_ACCEPTED)
+async def start_link_check(
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    Start checking every catalog link in the background (admin only).
+    Returns immediately; poll /status for the result.
+    """
+    if not await link_crawler.trigger():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A link check is already running"
+        )
+    return {"message": "Link check started"}
+
+
+@router.get("")
+async def list_link_health(
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+    dead_only: bool = False,
+    category: Optional[str] = None,
+):
+    """
+    Get the latest check of every catalog URL and mirror (admin only).
+    Dead links (failed LINK_DEAD_AFTER checks in a row) come first.
+    """
+    query = latest_checks_query()
+    if dead_only:
+        query = query.where(LinkCheck.consecutive_failures >= link_crawler.dead_after)
+    if category:
+        query = query.where(LinkCheck.iso_id.startswith(f"{category.lower()}_"))
+
+    checks = (await db.scalars(query)).all()
+    results = [
+        {**check.to_dict(), "is_dead": check.consecutive_failures >= link_crawler.dead_after}
+        for check in checks
+    ]
+    results.sort(key=lambda check: (not check["is_dead"], check["is_alive"], check["iso_id"]))
+    return results
+
+
+@router.get("/{iso_id}/history")
+async def get_link_history(
+    iso_id: str,
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    Get the check history of one ISO's URLs and mirrors, newest first (admin only).
+    """
+    checks = (await db.scalars(
+        select(LinkCheck)
+        .where(LinkCheck.iso_id == iso_id)
+        .order_by(LinkCheck.checked_at.desc())
+        .limit(limit)
+    )).all()
+
+    if not checks:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No link checks recorded for this ISO"
+        )
+
+    return [check.to_dict() for check in checks]
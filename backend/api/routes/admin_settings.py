@@ -13,6 +13,7 @@ from api.database.session import get_db
 from api.database.models import User, DownloadRecord
 from api.routes.auth import get_current_admin_user
 from api.database.models import Settings as SettingsModel
+from api.services.stats import get_download_stats
 
 router = APIRouter(prefix="/api/admin", tags=["Admin Management"])
 
@@ -215,13 +216,7 @@ async def get_admin_dashboard(
     total_admins = db.query(User).filter(User.is_admin == True).count()
 
     # Download stats
-    total_downloads = db.query(DownloadRecord).count()
-    active_downloads = db.query(DownloadRecord).filter(
-        DownloadRecord.state == "downloading"
-    ).count()
-    completed_downloads = db.query(DownloadRecord).filter(
-        DownloadRecord.state == "completed"
-    ).count()
+    download_stats = get_download_stats(db)
 
     # Recent activity
     recent_activity = list(reversed(activity_logs[-20:]))
@@ -236,9 +231,9 @@ async def get_admin_dashboard(
             "regular": total_users - total_admins
         },
         "downloads": {
-            "total": total_downloads,
-            "active": active_downloads,
-            "completed": completed_downloads
+            "total": download_stats["total"],
+            "active": download_stats["active"],
+            "completed": download_stats["completed"]
         },
         "recent_activity": recent_activity,
         "settings": settings_obj,
@@ -2,16 +2,21 @@
 Analytics routes for admin dashboard.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from sqlalchemy import desc
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
 from api.database.session import get_db
 from api.database.models import DownloadRecord, DownloadState, User
 from api.routes.auth import get_current_admin_user
+from api.services.stats import get_download_stats
+from api.services.daily_stats import get_time_series, get_breakdown, get_top_os
+
+# Longest range served by the time series endpoint
+MAX_TIME_SERIES_DAYS = 3660
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
@@ -63,41 +68,17 @@ async def get_detailed_analytics(
     Get detailed analytics for admin dashboard.
     """
     # Basic stats
-    total = db.query(DownloadRecord).count()
-    active = db.query(DownloadRecord).filter(DownloadRecord.state == DownloadState.DOWNLOADING.value).count()
-    completed = db.query(DownloadRecord).filter(DownloadRecord.state == DownloadState.COMPLETED.value).count()
-    failed = db.query(DownloadRecord).filter(DownloadRecord.state == DownloadState.FAILED.value).count()
-
-    # Total bytes
-    total_bytes = db.query(func.sum(DownloadRecord.total_bytes)).filter(
-        DownloadRecord.state == DownloadState.COMPLETED.value
-    ).scalar() or 0
-
-    # Category breakdown
-    category_stats = db.query(
-        DownloadRecord.os_category,
-        func.count(DownloadRecord.id).label('count'),
-        func.sum(DownloadRecord.total_bytes).label('total_bytes')
-    ).filter(
-        DownloadRecord.state == DownloadState.COMPLETED.value
-    ).group_by(DownloadRecord.os_category).all()
+    stats = get_download_stats(db)
 
+    # Category and architecture breakdowns (from the daily rollup)
     category_breakdown = [
-        CategoryStats(category=cat, count=count, total_bytes=bytes_val or 0)
-        for cat, count, bytes_val in category_stats
+        CategoryStats(category=row["key"], count=row["count"], total_bytes=row["total_bytes"])
+        for row in get_breakdown(db, "category")
     ]
 
-    # Architecture breakdown
-    arch_stats = db.query(
-        DownloadRecord.os_architecture,
-        func.count(DownloadRecord.id).label('count')
-    ).filter(
-        DownloadRecord.state == DownloadState.COMPLETED.value
-    ).group_by(DownloadRecord.os_architecture).all()
-
     architecture_breakdown = [
-        ArchitectureStats(architecture=arch, count=count)
-        for arch, count in arch_stats
+        ArchitectureStats(architecture=row["key"], count=row["count"])
+        for row in get_breakdown(db, "architecture")
     ]
 
     # Recent downloads
@@ -118,49 +99,21 @@ async def get_detailed_analytics(
     ]
 
     # Time series data for last 7 days
-    time_series = []
-    for i in range(7):
-        date = datetime.utcnow() - timedelta(days=i)
-        date_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        date_end = date.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        daily_downloads = db.query(DownloadRecord).filter(
-            DownloadRecord.created_at >= date_start,
-            DownloadRecord.created_at <= date_end,
-            DownloadRecord.state == DownloadState.COMPLETED.value
-        ).all()
-
-        time_series.append(TimeSeriesData(
-            date=date_start.strftime("%Y-%m-%d"),
-            count=len(daily_downloads),
-            total_bytes=sum(r.total_bytes or 0 for r in daily_downloads)
-        ))
-
-    time_series.reverse()
+    today = datetime.utcnow().date()
+    time_series = [
+        TimeSeriesData(**point)
+        for point in get_time_series(db, today - timedelta(days=6), today)
+    ]
 
     # Top downloaded OS
-    top_os = db.query(
-        DownloadRecord.os_name,
-        DownloadRecord.os_version,
-        func.count(DownloadRecord.id).label('count')
-    ).filter(
-        DownloadRecord.state == DownloadState.COMPLETED.value
-    ).group_by(
-        DownloadRecord.os_name,
-        DownloadRecord.os_version
-    ).order_by(desc('count')).limit(5).all()
-
-    top_downloaded_os = [
-        {"name": name, "version": version, "count": count}
-        for name, version, count in top_os
-    ]
+    top_downloaded_os = get_top_os(db, limit=5)
 
     return DetailedAnalytics(
-        total_downloads=total,
-        active_downloads=active,
-        completed_downloads=completed,
-        failed_downloads=failed,
-        total_bytes=total_bytes,
+        total_downloads=stats["total"],
+        active_downloads=stats["active"],
+        completed_downloads=stats["completed"],
+        failed_downloads=stats["failed"],
+        total_bytes=stats["total_bytes"],
         category_breakdown=category_breakdown,
         architecture_breakdown=architecture_breakdown,
         recent_downloads=recent_downloads_data,
@@ -169,6 +122,48 @@ async def get_detailed_analytics(
     )
 
 
+@router.get("/timeseries", response_model=List[TimeSeriesData])
+async def get_download_time_series(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get completed downloads over an arbitrary date range.
+    Defaults to the last 30 days, one point per day.
+    """
+    end_date = end_date or datetime.utcnow().date()
+    start_date = start_date or end_date - timedelta(days=29)
+
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if (end_date - start_date).days > MAX_TIME_SERIES_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_TIME_SERIES_DAYS} days")
+
+    return [
+        TimeSeriesData(**point)
+        for point in get_time_series(db, start_date, end_date, granularity)
+    ]
+
+
+@router.get("/breakdown")
+async def get_download_breakdown(
+    dimension: str = Query("category", pattern="^(category|architecture|os)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=500),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get completed downloads grouped by category, architecture or OS,
+    optionally restricted to a date range.
+    """
+    return get_breakdown(db, dimension, start=start_date, end=end_date, limit=limit)
+
+
 @router.get("/system-health", response_model=SystemHealth)
 async def get_system_health(
     current_admin: User = Depends(get_current_admin_user),
@@ -218,16 +213,7 @@ async def get_popular_categories(
     """
     Get most popular OS categories.
     """
-    categories = db.query(
-        DownloadRecord.os_category,
-        func.count(DownloadRecord.id).label('count')
-    ).filter(
-        DownloadRecord.state == DownloadState.COMPLETED.value
-    ).group_by(
-        DownloadRecord.os_category
-    ).order_by(desc('count')).limit(limit).all()
-
     return [
-        {"category": cat, "count": count}
-        for cat, count in categories
+        {"category": row["key"], "count": row["count"]}
+        for row in get_breakdown(db, "category", limit=limit)
     ]
@@ -5,22 +5,24 @@ Authentication routes for admin login/logout.
 import os
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional
 from datetime import datetime
 import re
 
-from api.database.session import get_db
+from api.database.session import get_db, get_async_db
 from api.database.models import User
 from api.auth.auth_utils import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     decode_access_token,
     create_refresh_token
 )
-from api.auth.rate_limiter import check_login_rate_limit
+from api.auth.password_hasher import verify_password_async, get_password_hash_async
+from api.auth.rate_limiter import check_login_rate_limit, get_client_ip
+from api.auth.user_cache import user_cache
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
@@ -112,28 +114,15 @@ class ChangePasswordRequest(BaseModel):
         return v
 
 
-def get_client_ip(request: Request) -> str:
-    """Get client IP address from request, handling proxy headers."""
-    # Check for forwarded IP (behind proxy/load balancer)
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-
-    # Check for real IP header
-    real_ip = request.headers.get("X-Real-IP")
-    if real_ip:
-        return real_ip
-
-    # Fall back to direct connection IP
-    if request.client:
-        return request.client.host
-
-    return "unknown"
+def create_user_tokens(user: User) -> tuple[str, str]:
+    """Create an access and a refresh token bound to the user's token version."""
+    claims = {"sub": user.username, "ver": user.token_version or 0}
+    return create_access_token(data=claims), create_refresh_token(data=claims)
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get the current authenticated user from JWT token."""
     credentials_exception = HTTPException(
@@ -147,9 +136,22 @@ async def get_current_user(
     username: str = payload.get("sub")
     if username is None:
         raise credentials_exception
-    user = db.query(User).filter(User.username == username).first()
+    # Tokens issued before token versions existed count as version 0
+    token_version = payload.get("ver", 0)
+
+    user = user_cache.get(username, token_version)
     if user is None:
-        raise credentials_exception
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalars().first()
+        if user is None:
+            raise credentials_exception
+        if (user.token_version or 0) != token_version:
+            # Token was revoked (password or role changed)
+            raise credentials_exception
+        # Cached users are shared between requests, so detach from this session
+        db.expunge(user)
+        user_cache.set(user)
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -174,7 +176,7 @@ async def get_current_admin_user(
 async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Authenticate user and return JWT tokens.
@@ -186,7 +188,7 @@ async def login(
     client_ip = get_client_ip(request)
 
     # Check rate limit based on IP
-    allowed, retry_after = check_login_rate_limit(client_ip)
+    allowed, retry_after = await check_login_rate_limit(client_ip)
     if not allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -194,10 +196,14 @@ async def login(
             headers={"Retry-After": str(retry_after)},
         )
 
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    result = await db.execute(select(User).where(User.username == form_data.username))
+    user = result.scalars().first()
+    # End the read transaction so no connection is held while bcrypt runs
+    await db.commit()
+
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         # Rate limit on failed login (use username as key as well)
-        check_login_rate_limit(f"{client_ip}:{form_data.username}")
+        await check_login_rate_limit(f"{client_ip}:{form_data.username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -211,11 +217,10 @@ async def login(
 
     # Update last login
     user.last_login = datetime.utcnow()
-    db.commit()
+    await db.commit()
 
     # Create tokens with 24 hour expiration
-    access_token = create_access_token(data={"sub": user.username})
-    refresh_token = create_refresh_token(data={"sub": user.username})
+    access_token, refresh_token = create_user_tokens(user)
 
     return LoginResponse(
         access_token=access_token,
@@ -228,7 +233,7 @@ async def login(
 @router.post("/register", response_model=UserResponse)
 async def register(
     user_data: RegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Register a new user account.
@@ -237,30 +242,34 @@ async def register(
     Password must meet strength requirements.
     """
     # Check if username exists
-    if db.query(User).filter(User.username == user_data.username).first():
+    if (await db.execute(select(User.id).where(User.username == user_data.username))).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
 
     # Check if email exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    if (await db.execute(select(User.id).where(User.email == user_data.email))).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
+    # Hash outside the read transaction so no connection is held while bcrypt runs
+    await db.commit()
+    hashed_password = await get_password_hash_async(user_data.password)
+
     # Create new user with strong password hashing
     new_user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
         is_admin=False,  # Default to regular user
         is_active=True
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return UserResponse(**new_user.to_dict())
 
@@ -288,10 +297,14 @@ async def refresh_token(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
         )
+    if (user.token_version or 0) != payload.get("ver", 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked"
+        )
 
     # Create new tokens
-    access_token = create_access_token(data={"sub": user.username})
-    refresh_token = create_refresh_token(data={"sub": user.username})
+    access_token, refresh_token = create_user_tokens(user)
 
     return LoginResponse(
         access_token=access_token,
@@ -315,24 +328,39 @@ async def get_me(
 async def change_password(
     password_data: ChangePasswordRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Change current user's password.
     New password must meet strength requirements.
     Marks password as changed after successful update.
+    Tokens issued before the change are revoked; new tokens are returned.
     """
-    if not verify_password(password_data.old_password, current_user.hashed_password):
+    # Release the connection used by the user lookup while bcrypt runs
+    await db.commit()
+
+    if not await verify_password_async(password_data.old_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect password"
         )
+    hashed_password = await get_password_hash_async(password_data.new_password)
 
-    current_user.hashed_password = get_password_hash(password_data.new_password)
-    current_user.password_changed = True
-    db.commit()
+    # current_user may come from the user cache, so update a fresh copy
+    user = await db.get(User, current_user.id)
+    user.hashed_password = hashed_password
+    user.password_changed = True
+    user.token_version = (user.token_version or 0) + 1
+    await db.commit()
+    user_cache.invalidate(user.username)
 
-    return {"message": "Password changed successfully"}
+    access_token, refresh_token = create_user_tokens(user)
+    return {
+        "message": "Password changed successfully",
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
 
 
 @router.post("/logout")
@@ -375,6 +403,8 @@ async def reset_admin_password(
             detail="Invalid reset key"
         )
 
+    hashed_password = await get_password_hash_async("AdminPass123")
+
     # Find or create admin user
     admin_user = db.query(User).filter(User.username == "admin").first()
     if not admin_user:
@@ -382,18 +412,20 @@ async def reset_admin_password(
         admin_user = User(
             username="admin",
             email="admin@example.com",
-            hashed_password=get_password_hash("AdminPass123"),
+            hashed_password=hashed_password,
             is_admin=True,
             is_active=True
         )
         db.add(admin_user)
     else:
-        # Update password
-        admin_user.hashed_password = get_password_hash("AdminPass123")
+        # Update password and revoke existing tokens
+        admin_user.hashed_password = hashed_password
         admin_user.is_admin = True
         admin_user.is_active = True
+        admin_user.token_version = (admin_user.token_version or 0) + 1
 
     db.commit()
+    user_cache.invalidate("admin")
 
     return {
         "message": "Admin password reset successfully!",
@@ -433,7 +465,10 @@ async def toggle_admin_status(
         )
 
     user.is_admin = not user.is_admin
+    # Revoke tokens so the new role applies immediately
+    user.token_version = (user.token_version or 0) + 1
     db.commit()
+    user_cache.invalidate(user.username)
 
     return {
         "message": f"User {user.username} admin status toggled to {user.is_admin}",
@@ -466,5 +501,6 @@ async def delete_user(
     username = user.username
     db.delete(user)
     db.commit()
+    user_cache.invalidate(username)
 
     return {"message": f"User {username} deleted successfully"}
@@ -2,19 +2,22 @@
 API routes for download management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from api.database.session import get_db
+from api.database.session import get_async_db
 from api.database.models import DownloadRecord, DownloadState
 from api.models.schemas import (
     StartDownloadRequest,
     DownloadStatusResponse,
     StatsResponse,
 )
-from api.services.download import download_service
+from api.services.download import download_service, MAX_PAGE_SIZE
+from api.services.stats import get_download_stats_async, invalidate_download_stats
+from api.services.daily_stats import remove_completed_downloads
+from api.services.link_health import link_crawler
 from api.routes import os as os_routes
 from api.models.schemas import OSCategory, Architecture
 from core.models import OSInfo, OSCategory as CoreOSCategory
@@ -25,7 +28,7 @@ router = APIRouter(prefix="/api/downloads", tags=["Downloads"])
 @router.post("/start", response_model=DownloadStatusResponse)
 async def start_download(
     request: StartDownloadRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> DownloadStatusResponse:
     """
     Start a new download.
@@ -49,16 +52,15 @@ async def start_download(
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid category: {category_str}")
 
-    # Get all OS for category and find matching one
-    all_os = await os_routes.get_os_by_category(category)
-    os_response = None
-    for os_item in all_os:
-        if os_item.id == request.os_id:
-            os_response = os_item
-            break
-
-    if not os_response:
+    # Find the OS in the category listing
+    entry = await os_routes.find_os_entry(category, request.os_id, db)
+    if not entry:
         raise HTTPException(status_code=404, detail="OS not found")
+    os_response = entry.response
+
+    # Main URL and mirrors, dead ones last (the manager tries them in order)
+    mirrors = entry.os_info.mirrors if entry.os_info is not None else ()
+    urls = link_crawler.apply_url_policy(entry.iso_id, [os_response.url, *mirrors])
 
     # Convert to OSInfo model
     from core.models import Architecture as CoreArch
@@ -72,10 +74,11 @@ async def start_download(
     os_info = OSInfo(
         name=os_response.name,
         version=os_response.version,
-        category=CoreOSCategory(os_response.category.value),
+        category=CoreOSCategory(os_response.category),
         architecture=arch_map.get(os_response.architecture, CoreArch.X64),
         language=os_response.language,
-        url=os_response.url,
+        url=urls[0],
+        mirrors=urls[1:],
         checksum=os_response.checksum,
         checksum_type=os_response.checksum_type,
         size=os_response.size,
@@ -88,7 +91,10 @@ async def start_download(
 
 
 @router.get("/direct/{os_id}")
-async def direct_download(os_id: str) -> RedirectResponse:
+async def direct_download(
+    os_id: str,
+    db: AsyncSession = Depends(get_async_db),
+) -> RedirectResponse:
     """
     Direct download - redirects to the ISO URL so browser downloads it externally.
 
@@ -112,49 +118,57 @@ async def direct_download(os_id: str) -> RedirectResponse:
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid category: {category_str}")
 
-    # Get all OS for category and find matching one
-    all_os = await os_routes.get_os_by_category(category)
-    os_response = None
-    for os_item in all_os:
-        if os_item.id == os_id:
-            os_response = os_item
-            break
-
-    if not os_response:
+    # Find the OS in the category listing
+    entry = await os_routes.find_os_entry(category, os_id, db)
+    if not entry:
         raise HTTPException(status_code=404, detail="OS not found")
 
-    # Redirect to the ISO URL directly
+    # Redirect to the first live URL (main URL, then mirrors)
     # Browser will download from the source (like os.click)
-    return RedirectResponse(url=os_response.url, status_code=302)
+    mirrors = entry.os_info.mirrors if entry.os_info is not None else ()
+    urls = link_crawler.apply_url_policy(entry.iso_id, [entry.response.url, *mirrors])
+    return RedirectResponse(url=urls[0], status_code=302)
 
 
 @router.get("", response_model=List[DownloadStatusResponse])
 async def get_downloads(
+    response: Response,
     state: DownloadState | None = None,
-    db: Session = Depends(get_db),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
 ) -> List[DownloadStatusResponse]:
     """
-    Get all downloads.
+    Get downloads, newest first.
+
+    Without `limit` or `cursor` all downloads are returned. With either,
+    one page is returned; when more downloads exist, the X-Next-Cursor
+    response header holds the cursor to pass as `cursor` for the next page.
 
     Args:
         state: Filter by state (optional)
+        limit: Page size (optional; DEFAULT_PAGE_SIZE when only a cursor is given)
+        cursor: Cursor from the previous page (optional)
         db: Database session
 
     Returns:
         List of downloads
     """
-    query = db.query(DownloadRecord)
-
-    if state:
-        query = query.filter(DownloadRecord.state == state)
+    try:
+        records, next_cursor = await download_service.get_all_downloads(
+            db, state=state, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    records = query.order_by(DownloadRecord.created_at.desc()).all()
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [_record_to_response(record) for record in records]
 
 
 @router.get("/stats", response_model=StatsResponse)
-async def get_stats(db: Session = Depends(get_db)) -> StatsResponse:
+async def get_stats(db: AsyncSession = Depends(get_async_db)) -> StatsResponse:
     """
     Get download statistics.
 
@@ -164,49 +178,22 @@ async def get_stats(db: Session = Depends(get_db)) -> StatsResponse:
     Returns:
         Download statistics
     """
-    total = db.query(DownloadRecord).count()
-
-    active = (
-        db.query(DownloadRecord)
-        .filter(DownloadRecord.state == DownloadState.DOWNLOADING.value)
-        .count()
-    )
-
-    completed = (
-        db.query(DownloadRecord)
-        .filter(DownloadRecord.state == DownloadState.COMPLETED.value)
-        .count()
-    )
-
-    failed = (
-        db.query(DownloadRecord)
-        .filter(DownloadRecord.state == DownloadState.FAILED.value)
-        .count()
-    )
-
-    # Calculate total bytes downloaded
-    completed_records = (
-        db.query(DownloadRecord)
-        .filter(DownloadRecord.state == DownloadState.COMPLETED.value)
-        .all()
-    )
-
-    total_bytes = sum(r.total_bytes for r in completed_records if r.total_bytes)
+    stats = await get_download_stats_async(db)
 
     return StatsResponse(
-        total_downloads=total,
-        active_downloads=active,
-        completed_downloads=completed,
-        failed_downloads=failed,
-        total_bytes_downloaded=total_bytes,
-        total_bytes_formatted=_format_bytes(total_bytes),
+        total_downloads=stats["total"],
+        active_downloads=stats["active"],
+        completed_downloads=stats["completed"],
+        failed_downloads=stats["failed"],
+        total_bytes_downloaded=stats["total_bytes"],
+        total_bytes_formatted=_format_bytes(stats["total_bytes"]),
     )
 
 
 @router.get("/{download_id}", response_model=DownloadStatusResponse)
 async def get_download(
     download_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> DownloadStatusResponse:
     """
     Get a specific download.
@@ -218,11 +205,7 @@ async def get_download(
     Returns:
         Download status
     """
-    record = (
-        db.query(DownloadRecord)
-        .filter(DownloadRecord.id == download_id)
-        .first()
-    )
+    record = await download_service.get_download(download_id, db)
 
     if not record:
         raise HTTPException(status_code=404, detail="Download not found")
@@ -269,7 +252,7 @@ async def resume_download(download_id: int) -> dict:
 
 
 @router.delete("/completed")
-async def clear_completed(db: Session = Depends(get_db)) -> dict:
+async def clear_completed(db: AsyncSession = Depends(get_async_db)) -> dict:
     """
     Clear completed downloads.
 
@@ -301,7 +284,7 @@ async def cancel_download(download_id: int) -> dict:
 
 
 @router.delete("/{download_id}")
-async def delete_download(download_id: int, db: Session = Depends(get_db)) -> dict:
+async def delete_download(download_id: int, db: AsyncSession = Depends(get_async_db)) -> dict:
     """
     Delete a download from the database (dismiss button).
 
@@ -316,10 +299,13 @@ async def delete_download(download_id: int, db: Session = Depends(get_db)) -> di
     await download_service.cancel_download(download_id)
 
     # Then delete from database
-    record = db.query(DownloadRecord).filter(DownloadRecord.id == download_id).first()
+    record = await db.get(DownloadRecord, download_id)
     if record:
-        db.delete(record)
-        db.commit()
+        if record.state == DownloadState.COMPLETED.value:
+            await db.run_sync(lambda session: remove_completed_downloads(session, [record]))
+        await db.delete(record)
+        await db.commit()
+        invalidate_download_stats()
 
     return {"success": True, "message": "Download deleted"}
 
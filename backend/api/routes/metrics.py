@@ -0,0 +1,111 @@
+"""
+Prometheus metrics endpoint.
+
+GET /metrics returns every metric in the Prometheus text format. The
+metrics reveal traffic per route, bytes per mirror host, database pool
+state and download counts, so the endpoint is closed by default:
+- METRICS_TOKEN set: scrapers must send it as a bearer token
+- METRICS_PUBLIC=true (and no token): open to anyone, e.g. when only a
+  private network can reach the API
+- neither: every request gets 403
+"""
+
+from collections import defaultdict
+from typing import Optional
+import hmac
+import os
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import Response
+
+from core.models import DownloadState
+from api.database.session import engine, async_engine
+from api.services.download import download_service
+from api.services.metrics import CONTENT_TYPE, CallbackGauge, mirror_host, registry
+from api.services.websocket import ws_manager
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() == "true"
+
+router = APIRouter(tags=["Metrics"])
+
+
+def _downloads_by_state():
+    counts = {("active",): 0, ("queued",): 0}
+    for task in list(download_service.active_tasks.values()):
+        if task.state == DownloadState.DOWNLOADING:
+            counts[("active",)] += 1
+        elif task.state == DownloadState.PENDING:
+            counts[("queued",)] += 1
+    return counts
+
+
+def _download_speed_by_host():
+    speeds = defaultdict(float)
+    for task in list(download_service.active_tasks.values()):
+        if task.state == DownloadState.DOWNLOADING and task.progress:
+            speeds[(mirror_host(task.os_info.url),)] += task.progress.speed
+    return dict(speeds)
+
+
+def _pools():
+    return {"sync": engine.pool, "async": async_engine.sync_engine.pool}
+
+
+def _pool_stat(attribute: str):
+    def collect():
+        return {
+            (name,): getattr(pool, attribute)()
+            for name, pool in _pools().items()
+            if hasattr(pool, attribute)
+        }
+    return collect
+
+
+registry.register(CallbackGauge(
+    "downloads", "Server-side downloads by state", _downloads_by_state, ["state"],
+))
+registry.register(CallbackGauge(
+    "download_speed_bytes_per_second",
+    "Combined speed of running server-side downloads, by mirror host",
+    _download_speed_by_host,
+    ["host"],
+))
+registry.register(CallbackGauge(
+    "websocket_connections", "Connected WebSocket clients", ws_manager.get_connection_count,
+))
+registry.register(CallbackGauge(
+    "websocket_pending_sends",
+    "WebSocket messages being written to clients",
+    lambda: ws_manager.pending_sends,
+))
+registry.register(CallbackGauge(
+    "db_pool_checked_out", "Database connections in use", _pool_stat("checkedout"), ["pool"],
+))
+registry.register(CallbackGauge(
+    "db_pool_size", "Configured database pool size", _pool_stat("size"), ["pool"],
+))
+registry.register(CallbackGauge(
+    "db_pool_overflow", "Database connections opened beyond the pool size", _pool_stat("overflow"), ["pool"],
+))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """
+    Prometheus scrape endpoint.
+    """
+    if METRICS_TOKEN:
+        expected = f"Bearer {METRICS_TOKEN}"
+        if not authorization or not hmac.compare_digest(authorization, expected):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid metrics token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    elif not METRICS_PUBLIC:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Metrics are disabled; set METRICS_TOKEN or METRICS_PUBLIC=true",
+        )
+    return Response(registry.render(), media_type=CONTENT_TYPE)
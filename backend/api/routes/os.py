@@ -5,7 +5,8 @@ API routes for OS listings and browsing.
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Union, Optional
 import asyncio
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.models.schemas import (
     OSInfoResponse,
@@ -13,37 +14,19 @@ from api.models.schemas import (
     LinuxSubcategoryResponse,
     Architecture,
 )
-from api.database.session import get_db
+from api.database.session import get_async_db
 from api.database.models import ISOOverride
+from api.services.catalog import CatalogEntry, catalog_response, ensure_providers, filter_entries, get_catalog
+from api.services.link_health import link_crawler
 from core.os.base import get_registry
-from core.os.windows import WindowsProvider
-from core.os.linux import LinuxProvider
-from core.os.macos import MacOSProvider
-from core.os.bsd import BSDProvider
-from core.models import OSCategory
+from core.models import OSCategory, OSInfo
 
 router = APIRouter(prefix="/api/os", tags=["OS"])
 
-# Initialize providers on startup
-_providers_initialized = False
-
 
 def _init_providers():
-    """Initialize OS providers."""
-    global _providers_initialized
-    if not _providers_initialized:
-        registry = get_registry()
-        registry.register(WindowsProvider())
-        registry.register(LinuxProvider())
-        registry.register(MacOSProvider())
-        registry.register(BSDProvider())
-        _providers_initialized = True
-
-
-@router.on_event("startup")
-async def startup():
-    """Initialize providers on startup."""
-    _init_providers()
+    """Initialize OS providers (on first use)."""
+    ensure_providers()
 
 
 @router.get("/categories", response_model=List[OSCategoryResponse])
@@ -231,332 +214,286 @@ async def get_windows_subcategories() -> List[LinuxSubcategoryResponse]:
     return [LinuxSubcategoryResponse(**sc) for sc in sorted_subcategories]
 
 
-@router.get("/{category}", response_model=List[OSInfoResponse])
-async def get_os_by_category(
-    category: str,
+def _parse_category(category: str) -> OSCategory:
+    """Convert a category path parameter to OSCategory (400 if unknown)."""
+    try:
+        return OSCategory(category.lower())
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid category: {category}. Valid options: windows, linux, macos, bsd"
+        )
+
+
+def _override_os_info(override: ISOOverride, category: OSCategory, source: str) -> OSInfo:
+    """ISO definition for a database override or custom ISO."""
+    return OSInfo(
+        name=override.name,
+        version=override.version,
+        category=category,
+        architecture=Architecture(override.architecture.lower()),
+        language=override.language,
+        url=override.url,
+        size=override.size or 0,
+        description=override.description,
+        icon=override.icon,
+        checksum=override.checksum,
+        checksum_type=override.checksum_type,
+        source=source,
+    )
+
+
+def _override_response(override: ISOOverride) -> OSInfoResponse:
+    """Response for a database override, as returned by search and details."""
+    return OSInfoResponse(
+        id=override.iso_id,
+        name=override.name,
+        version=override.version,
+        category=override.category,
+        architecture=Architecture(override.architecture.lower()),
+        language=override.language,
+        url=override.url,
+        size=override.size or 0,
+        size_formatted=f"{override.size / (1024**3):.1f} GB" if override.size else "Unknown",
+        source="Database Override",
+        icon=override.icon,
+        checksum=override.checksum,
+        checksum_type=override.checksum_type,
+        description=override.description,
+        release_date=None,
+        subcategory=None,
+    )
+
+
+@router.get("/search", response_model=List[OSInfoResponse])
+async def search_os(
+    query: str,
+    category: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> List[OSInfoResponse]:
+    """
+    Search for OS by name or version.
+    Includes database overrides and custom ISOs.
+
+    Args:
+        query: Search query
+        category: Filter by category (optional)
+
+    Returns:
+        List of matching OS
+    """
+    _init_providers()
+
+    results = {}
+    query = query.lower()
+
+    # Parse category if provided
+    if category:
+        try:
+            categories_to_search = [OSCategory(category.lower())]
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid category: {category}"
+            )
+    else:
+        categories_to_search = list(OSCategory)
+
+    # Get all database overrides
+    result = await db.execute(select(ISOOverride).where(
+        ISOOverride.is_enabled == True
+    ))
+    all_overrides = result.scalars().all()
+
+    # Build override map
+    override_map = {override.iso_id: override for override in all_overrides}
+
+    for cat in categories_to_search:
+        try:
+            entries = await get_catalog(cat)
+        except Exception:
+            continue
+        for entry in entries:
+            if entry.iso_id in results:
+                continue
+            # Check if there's a database override
+            override = override_map.get(entry.iso_id)
+            if override is not None:
+                if query in override.name.lower() or query in override.version.lower():
+                    results[entry.iso_id] = CatalogEntry(_override_response(override))
+            # Search in name and version
+            elif query in entry.os_info.name.lower() or query in entry.os_info.version.lower():
+                results[entry.iso_id] = entry
+
+    # Also search in database overrides that might not be in built-in list
+    for override in all_overrides:
+        if override.iso_id not in results and (
+            query in override.name.lower()
+            or query in override.version.lower()
+        ):
+            results[override.iso_id] = CatalogEntry(_override_response(override))
+
+    return catalog_response(link_crawler.apply_policy(list(results.values()), key=lambda entry: entry.iso_id))
+
+
+async def list_os(
+    category: OSCategory,
+    db: AsyncSession,
     architecture: Architecture | None = None,
     language: str | None = None,
     subcategory: str | None = None,
-    db: Session = Depends(get_db),
-) -> List[OSInfoResponse]:
+) -> List[CatalogEntry]:
     """
-    Get available OS for a specific category.
-    Database overrides take precedence over built-in ISOs.
+    Get the catalog entries of a category with database overrides applied.
 
     Args:
-        category: OS category (windows, linux, macos, bsd)
+        category: OS category
+        db: Database session
         architecture: Filter by architecture (optional)
         language: Filter by language (optional)
         subcategory: Filter by subcategory for Linux (optional)
 
     Returns:
-        List of available OS
+        Catalog entries, with the dead-link policy applied
     """
     _init_providers()
 
-    # Convert string to OSCategory enum
     try:
-        category_enum = OSCategory(category.lower())
-    except ValueError:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid category: {category}. Valid options: windows, linux, macos, bsd"
-        )
-
-    registry = get_registry()
-    providers = registry.get_by_category(category_enum)
+        builtin = filter_entries(await get_catalog(category), architecture, language)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching OS: {str(e)}")
 
     # Get database overrides for this category
-    overrides = db.query(ISOOverride).filter(
-        ISOOverride.category == category_enum.value,
+    result = await db.execute(select(ISOOverride).where(
+        ISOOverride.category == category.value,
         ISOOverride.is_enabled == True
-    ).all()
+    ))
+    overrides = result.scalars().all()
 
     # Create a lookup dict for overrides
     override_map = {override.iso_id: override for override in overrides}
 
-    all_os = []
-    for provider in providers:
-        try:
-            os_list = await provider.fetch_available(
-                architecture=architecture,
-                language=language,
-            )
-            all_os.extend(os_list)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error fetching OS: {str(e)}")
-
     # Apply database overrides to built-in ISOs and add custom ISOs
-    merged_os = {}
-    for os_info in all_os:
-        iso_id = f"{os_info.category.value}_{os_info.name.lower()}_{os_info.version.lower()}_{os_info.architecture.value}"
-
-        # Check if there's a database override
-        if iso_id in override_map:
-            override = override_map[iso_id]
-            # Create OSInfo from database override
-            from core.models import OSInfo, Architecture as ArchEnum
-            merged_os[iso_id] = OSInfo(
-                name=override.name,
-                version=override.version,
-                category=category_enum,
-                architecture=ArchEnum(override.architecture.lower()),
-                language=override.language,
-                url=override.url,
-                size=override.size or 0,
-                description=override.description,
-                icon=override.icon,
-                checksum=override.checksum,
-                checksum_type=override.checksum_type,
-                source="Database Override",
+    merged = {}
+    for entry in builtin:
+        override = override_map.get(entry.iso_id)
+        if override is not None:
+            merged[entry.iso_id] = CatalogEntry.from_os_info(
+                _override_os_info(override, category, "Database Override")
             )
         else:
-            merged_os[iso_id] = os_info
+            merged[entry.iso_id] = entry
 
     # Also add any custom ISOs that aren't in built-in list
     for override in overrides:
-        iso_id = override.iso_id
-        if iso_id not in merged_os:
-            from core.models import OSInfo, Architecture as ArchEnum
-            merged_os[iso_id] = OSInfo(
-                name=override.name,
-                version=override.version,
-                category=category_enum,
-                architecture=ArchEnum(override.architecture.lower()),
-                language=override.language,
-                url=override.url,
-                size=override.size or 0,
-                description=override.description,
-                icon=override.icon,
-                checksum=override.checksum,
-                checksum_type=override.checksum_type,
-                source="Custom",
-            )
+        if override.iso_id not in merged:
+            merged[override.iso_id] = CatalogEntry.from_os_info(_override_os_info(override, category, "Custom"))
 
     # Filter by subcategory if specified
     if subcategory:
-        all_os = [os for os in merged_os.values() if (getattr(os, 'subcategory', None) or os.name) == subcategory]
+        entries = [
+            entry for entry in merged.values()
+            if (entry.os_info.subcategory or entry.os_info.name) == subcategory
+        ]
     else:
-        all_os = list(merged_os.values())
+        entries = list(merged.values())
 
-    # Convert to response models
-    response = []
-    for os_info in all_os:
-        try:
-            response.append(
-                OSInfoResponse(
-                    id=f"{os_info.category.value}_{os_info.name.lower()}_{os_info.version.lower()}_{os_info.architecture.value}",
-                    name=os_info.name,
-                    version=os_info.version,
-                    category=category_enum.value,
-                    architecture=os_info.architecture,
-                    language=os_info.language,
-                    size=os_info.size,
-                    size_formatted=getattr(os_info, 'size_formatted', None) or f"{os_info.size / (1024**3):.1f} GB" if os_info.size else "Unknown",
-                    source=getattr(os_info, 'source', None),
-                    icon=os_info.icon,
-                    url=os_info.url,
-                    checksum=os_info.checksum,
-                    checksum_type=os_info.checksum_type,
-                    description=os_info.description,
-                    release_date=getattr(os_info, 'release_date', None),
-                    subcategory=getattr(os_info, 'subcategory', None),
-                )
-            )
-        except Exception as e:
-            print(f"DEBUG: Error converting OSInfo: {e}")
-            raise
+    # Hide or move down ISOs whose links the crawler found dead
+    return link_crawler.apply_policy(entries, key=lambda entry: entry.iso_id)
 
-    return response
 
-
-@router.get("/{category}/{os_id}", response_model=OSInfoResponse)
-async def get_os_details(category: str, os_id: str, db: Session = Depends(get_db)) -> OSInfoResponse:
+async def find_os_entry(category: OSCategory, os_id: str, db: AsyncSession) -> Optional[CatalogEntry]:
     """
-    Get details for a specific OS.
-    Database overrides take precedence over built-in ISOs.
+    Find a listed OS by ID, with database overrides applied.
 
     Args:
         category: OS category
         os_id: OS ID
+        db: Database session
 
     Returns:
-        OS details
+        The catalog entry (with its mirrors), or None if the category doesn't list it
     """
-    _init_providers()
+    for entry in await list_os(category, db):
+        if entry.iso_id == os_id:
+            return entry
+    return None
 
-    # First check database for this ISO ID
-    override = db.query(ISOOverride).filter(
-        ISOOverride.iso_id == os_id,
-        ISOOverride.is_enabled == True
-    ).first()
-
-    if override:
-        # Return database override
-        from core.models import Architecture as ArchEnum
-        return OSInfoResponse(
-            id=override.iso_id,
-            name=override.name,
-            version=override.version,
-            category=override.category,
-            architecture=ArchEnum(override.architecture.lower()),
-            language=override.language,
-            url=override.url,
-            size=override.size or 0,
-            size_formatted=f"{override.size / (1024**3):.1f} GB" if override.size else "Unknown",
-            source="Database Override",
-            icon=override.icon,
-            checksum=override.checksum,
-            checksum_type=override.checksum_type,
-            description=override.description,
-            release_date=None,
-            subcategory=None,
-        )
 
-    # Get all OS for category
-    all_os = await get_os_by_category(category, db=db)
+async def find_os(category: OSCategory, os_id: str, db: AsyncSession) -> Optional[OSInfoResponse]:
+    """
+    Find a listed OS by ID, with database overrides applied.
 
-    # Find matching OS
-    for os_response in all_os:
-        if os_response.id == os_id:
-            return os_response
+    Args:
+        category: OS category
+        os_id: OS ID
+        db: Database session
 
-    raise HTTPException(status_code=404, detail="OS not found")
+    Returns:
+        The OS, or None if the category doesn't list it
+    """
+    entry = await find_os_entry(category, os_id, db)
+    return entry.response if entry is not None else None
 
 
-@router.get("/search", response_model=List[OSInfoResponse])
-async def search_os(
-    query: str,
-    category: str | None = None,
-    db: Session = Depends(get_db),
+@router.get("/{category}", response_model=List[OSInfoResponse])
+async def get_os_by_category(
+    category: str,
+    architecture: Architecture | None = None,
+    language: str | None = None,
+    subcategory: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
 ) -> List[OSInfoResponse]:
     """
-    Search for OS by name or version.
-    Includes database overrides and custom ISOs.
+    Get available OS for a specific category.
+    Database overrides take precedence over built-in ISOs.
 
     Args:
-        query: Search query
-        category: Filter by category (optional)
+        category: OS category (windows, linux, macos, bsd)
+        architecture: Filter by architecture (optional)
+        language: Filter by language (optional)
+        subcategory: Filter by subcategory for Linux (optional)
 
     Returns:
-        List of matching OS
+        List of available OS
     """
-    _init_providers()
+    entries = await list_os(
+        _parse_category(category),
+        db,
+        architecture=architecture,
+        language=language,
+        subcategory=subcategory,
+    )
+    return catalog_response(entries)
 
-    registry = get_registry()
 
-    results = {}
+@router.get("/{category}/{os_id}", response_model=OSInfoResponse)
+async def get_os_details(category: str, os_id: str, db: AsyncSession = Depends(get_async_db)) -> OSInfoResponse:
+    """
+    Get details for a specific OS.
+    Database overrides take precedence over built-in ISOs.
 
-    # Parse category if provided
-    if category:
-        try:
-            categories_to_search = [OSCategory(category.lower())]
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid category: {category}"
-            )
-    else:
-        categories_to_search = list(OSCategory)
+    Args:
+        category: OS category
+        os_id: OS ID
 
-    # Get all database overrides
-    all_overrides = db.query(ISOOverride).filter(
-        ISOOverride.is_enabled == True
-    ).all()
+    Returns:
+        OS details
+    """
+    _init_providers()
 
-    # Build override map
-    override_map = {}
-    for override in all_overrides:
-        override_map[override.iso_id] = override
+    # First check database for this ISO ID
+    result = await db.execute(select(ISOOverride).where(
+        ISOOverride.iso_id == os_id,
+        ISOOverride.is_enabled == True
+    ))
+    override = result.scalars().first()
 
-    for cat in categories_to_search:
-        providers = registry.get_by_category(cat)
-        for provider in providers:
-            try:
-                os_list = await provider.fetch_available()
-                for os_info in os_list:
-                    iso_id = f"{os_info.category.value}_{os_info.name.lower()}_{os_info.version.lower()}_{os_info.architecture.value}"
-
-                    # Check if there's a database override
-                    if iso_id in override_map:
-                        override = override_map[iso_id]
-                        if (
-                            query.lower() in override.name.lower()
-                            or query.lower() in override.version.lower()
-                        ):
-                            if iso_id not in results:
-                                from core.models import Architecture as ArchEnum
-                                results[iso_id] = OSInfoResponse(
-                                    id=override.iso_id,
-                                    name=override.name,
-                                    version=override.version,
-                                    category=override.category,
-                                    architecture=ArchEnum(override.architecture.lower()),
-                                    language=override.language,
-                                    url=override.url,
-                                    size=override.size or 0,
-                                    size_formatted=f"{override.size / (1024**3):.1f} GB" if override.size else "Unknown",
-                                    source="Database Override",
-                                    icon=override.icon,
-                                    checksum=override.checksum,
-                                    checksum_type=override.checksum_type,
-                                    description=override.description,
-                                    release_date=None,
-                                    subcategory=None,
-                                )
-                    else:
-                        # Search in name and version
-                        if (
-                            query.lower() in os_info.name.lower()
-                            or query.lower() in os_info.version.lower()
-                        ):
-                            if iso_id not in results:
-                                results[iso_id] = OSInfoResponse(
-                                    id=iso_id,
-                                    name=os_info.name,
-                                    version=os_info.version,
-                                    category=cat.value,
-                                    architecture=os_info.architecture,
-                                    language=os_info.language,
-                                    size=os_info.size,
-                                    size_formatted=os_info.size_formatted,
-                                    source=os_info.source,
-                                    icon=os_info.icon,
-                                    url=os_info.url,
-                                    checksum=os_info.checksum,
-                                    checksum_type=os_info.checksum_type,
-                                    description=os_info.description,
-                                    release_date=os_info.release_date,
-                                    subcategory=os_info.subcategory,
-                                )
-            except Exception:
-                pass
+    if override:
+        # Return database override
+        return _override_response(override)
 
-    # Also search in database overrides that might not be in built-in list
-    for override in all_overrides:
-        if (
-            query.lower() in override.name.lower()
-            or query.lower() in override.version.lower()
-        ):
-            if override.iso_id not in results:
-                from core.models import Architecture as ArchEnum
-                results[override.iso_id] = OSInfoResponse(
-                    id=override.iso_id,
-                    name=override.name,
-                    version=override.version,
-                    category=override.category,
-                    architecture=ArchEnum(override.architecture.lower()),
-                    language=override.language,
-                    url=override.url,
-                    size=override.size or 0,
-                    size_formatted=f"{override.size / (1024**3):.1f} GB" if override.size else "Unknown",
-                    source="Database Override",
-                    icon=override.icon,
-                    checksum=override.checksum,
-                    checksum_type=override.checksum_type,
-                    description=override.description,
-                    release_date=None,
-                    subcategory=None,
-                )
-
-    return list(results.values())
+    os_response = await find_os(_parse_category(category), os_id, db)
+    if os_response is None:
+        raise HTTPException(status_code=404, detail="OS not found")
+    return os_response
@@ -4,30 +4,23 @@ This makes all downloads appear to come from our domain.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-import httpx
-import asyncio
-from urllib.parse import urljoin
+from pathlib import Path
 
-from api.database.session import get_db
+from api.database.session import get_async_db
 from api.database.models import DownloadRecord
+from api.services.metrics import CACHE_REQUESTS
+from api.services.proxy_streaming import proxy_upstream, FileRangeResponse
 from core.models import DownloadState
 
 router = APIRouter(prefix="/download", tags=["Proxy Downloads"])
 
 
-# Chunk size for streaming downloads
-CHUNK_SIZE = 1024 * 1024  # 1MB chunks
-# Timeout for download requests
-DOWNLOAD_TIMEOUT = 300  # 5 minutes
-
-
 @router.get("/id/{os_id}")
 async def proxy_download_by_id(
     os_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
@@ -59,15 +52,8 @@ async def proxy_download_by_id(
             detail=f"Invalid category: {category_str}"
         )
 
-    # Get all OS for category and find matching one by ID
-    # Pass db session explicitly since we're calling the function directly
-    all_os = await os_routes.get_os_by_category(category, db=db)
-    matching_os = None
-    for os_item in all_os:
-        if os_item.id == os_id:
-            matching_os = os_item
-            break
-
+    # Find the OS in the category listing
+    matching_os = await os_routes.find_os(category, os_id, db)
     if not matching_os:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,86 +67,22 @@ async def proxy_download_by_id(
     # Get custom headers from OS info if available
     headers = getattr(matching_os, "headers", {})
 
-    # Check for Range request (for resume support)
-    range_header = request.headers.get("range") if request else None
-
-    # Determine if this is a range request for resume
-    is_range_request = range_header is not None
-
-    async def generate():
-        """Stream the download in chunks with range support."""
-        async with httpx.AsyncClient(timeout=DOWNLOAD_TIMEOUT) as client:
-            try:
-                # Forward Range header if present for resume support
-                req_headers = headers.copy()
-                if range_header:
-                    req_headers["Range"] = range_header
-
-                async with client.stream(
-                    "GET",
-                    matching_os.url,
-                    headers=req_headers,
-                    follow_redirects=True
-                ) as response:
-                    response.raise_for_status()
-
-                    # Return response status code info for proper Range handling
-                    if is_range_request and response.status_code == 206:
-                        # Source returned 206 Partial Content - stream the partial content
-                        async for chunk in response.aiter_bytes(chunk_size=CHUNK_SIZE):
-                            yield chunk
-                    else:
-                        # Full content request
-                        async for chunk in response.aiter_bytes(chunk_size=CHUNK_SIZE):
-                            yield chunk
-
-            except httpx.HTTPError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Failed to fetch from source: {str(e)}"
-                )
-
-    # Quick HEAD request to get Content-Length (non-blocking with short timeout)
-    content_length = None
-    try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            head_response = await client.head(matching_os.url, headers=headers, follow_redirects=True)
-            content_length = head_response.headers.get("content-length")
-    except Exception:
-        pass  # Don't block download if HEAD fails
-
-    # Build response headers with resume support
-    response_headers = {
-        "Content-Disposition": f'attachment; filename="{filename}"',
-        "Cache-Control": "public, max-age=31536000",
-        "Accept-Ranges": "bytes",  # Enable resume support
-        "X-Original-URL": matching_os.url,
-    }
-
-    # Add Content-Length if we got it (shows file size in download managers)
-    if content_length:
-        response_headers["Content-Length"] = content_length
-
-    # For Range requests, return 206 status code for IDM to recognize resume
-    if range_header:
-        return StreamingResponse(
-            generate(),
-            status_code=206,
-            media_type="application/octet-stream",
-            headers=response_headers
-        )
-
-    return StreamingResponse(
-        generate(),
-        media_type="application/octet-stream",
-        headers=response_headers
+    return await proxy_upstream(
+        matching_os.url,
+        filename,
+        range_header=request.headers.get("range") if request else None,
+        request_headers=headers,
+        response_headers={
+            "Cache-Control": "public, max-age=31536000",
+            "X-Original-URL": matching_os.url,
+        },
     )
 
 
 @router.get("/{download_id}")
 async def proxy_download(
     download_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
@@ -171,7 +93,7 @@ async def proxy_download(
     Supports resume/partial downloads via Range requests.
     """
     # Get the download record
-    record = db.query(DownloadRecord).filter(DownloadRecord.id == download_id).first()
+    record = await db.get(DownloadRecord, download_id)
 
     if not record:
         raise HTTPException(
@@ -194,64 +116,27 @@ async def proxy_download(
     # Get custom headers if available (for some sources that need specific User-Agent)
     headers = {}
 
-    # Check for Range request (for resume support)
     range_header = request.headers.get("range") if request else None
 
-    async def generate():
-        """Stream the download in chunks with range support."""
-        async with httpx.AsyncClient(timeout=DOWNLOAD_TIMEOUT) as client:
-            try:
-                # Forward Range header if present for resume support
-                req_headers = headers.copy()
-                if range_header:
-                    req_headers["Range"] = range_header
-
-                async with client.stream("GET", original_url, headers=req_headers, follow_redirects=True) as response:
-                    response.raise_for_status()
-
-                    # Stream content in chunks
-                    async for chunk in response.aiter_bytes(chunk_size=CHUNK_SIZE):
-                        yield chunk
-
-            except httpx.HTTPError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Failed to fetch from source: {str(e)}"
-                )
-
-    # Quick HEAD request to get Content-Length (non-blocking with short timeout)
-    content_length = None
-    try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            head_response = await client.head(original_url, headers=headers, follow_redirects=True)
-            content_length = head_response.headers.get("content-length")
-    except Exception:
-        pass  # Don't block download if HEAD fails
-
-    # Build response headers with resume support
-    response_headers = {
-        "Content-Disposition": f'attachment; filename="{filename}"',
-        "Cache-Control": "no-cache",
-        "Accept-Ranges": "bytes",  # Enable resume support
-    }
-
-    # Add Content-Length if we got it (shows file size in download managers)
-    if content_length:
-        response_headers["Content-Length"] = content_length
-
-    # For Range requests, return 206 status code for IDM to recognize resume
-    if range_header:
-        return StreamingResponse(
-            generate(),
-            status_code=206,
-            media_type="application/octet-stream",
-            headers=response_headers
+    # A download the server already finished is sent from disk
+    if record.state == DownloadState.COMPLETED.value and record.output_path and Path(record.output_path).is_file():
+        CACHE_REQUESTS.inc(cache="proxy_file", result="hit")
+        return FileRangeResponse(
+            Path(record.output_path),
+            range_header=range_header,
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "Cache-Control": "no-cache",
+            },
         )
-
-    return StreamingResponse(
-        generate(),
-        media_type="application/octet-stream",
-        headers=response_headers
+    CACHE_REQUESTS.inc(cache="proxy_file", result="miss")
+
+    return await proxy_upstream(
+        original_url,
+        filename,
+        range_header=range_header,
+        request_headers=headers,
+        response_headers={"Cache-Control": "no-cache"},
     )
 
 
@@ -261,7 +146,7 @@ async def direct_download(
     os_name: str,
     version: Optional[str] = None,
     architecture: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
@@ -271,6 +156,7 @@ async def direct_download(
     This will find the matching OS entry and proxy the download.
     Supports resume/partial downloads via Range requests.
     """
+    from api.services.catalog import ensure_providers
     from core.os.base import get_registry
     from core.models import OSCategory, Architecture
 
@@ -284,6 +170,7 @@ async def direct_download(
         )
 
     # Get OS from registry
+    ensure_providers()
     registry = get_registry()
     providers = registry.get_by_category(category)
 
@@ -316,77 +203,22 @@ async def direct_download(
     # Get custom headers from OS info if available
     headers = getattr(matching_os, "headers", {})
 
-    # Check for Range request (for resume support)
-    range_header = request.headers.get("range") if request else None
-
-    async def generate():
-        """Stream the download in chunks with range support."""
-        async with httpx.AsyncClient(timeout=DOWNLOAD_TIMEOUT) as client:
-            try:
-                # Forward Range header if present for resume support
-                req_headers = headers.copy()
-                if range_header:
-                    req_headers["Range"] = range_header
-
-                async with client.stream(
-                    "GET",
-                    matching_os.url,
-                    headers=req_headers,
-                    follow_redirects=True
-                ) as response:
-                    response.raise_for_status()
-
-                    # Stream content in chunks
-                    async for chunk in response.aiter_bytes(chunk_size=CHUNK_SIZE):
-                        yield chunk
-
-            except httpx.HTTPError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Failed to fetch from source: {str(e)}"
-                )
-
-    # Quick HEAD request to get Content-Length (non-blocking with short timeout)
-    content_length = None
-    try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            head_response = await client.head(matching_os.url, headers=headers, follow_redirects=True)
-            content_length = head_response.headers.get("content-length")
-    except Exception:
-        pass  # Don't block download if HEAD fails
-
-    # Build response headers with resume support
-    response_headers = {
-        "Content-Disposition": f'attachment; filename="{filename}"',
-        "Cache-Control": "public, max-age=31536000",
-        "Accept-Ranges": "bytes",  # Enable resume support
-        "X-Original-URL": matching_os.url,
-    }
-
-    # Add Content-Length if we got it (shows file size in download managers)
-    if content_length:
-        response_headers["Content-Length"] = content_length
-
-    # For Range requests, return 206 status code for IDM to recognize resume
-    if range_header:
-        return StreamingResponse(
-            generate(),
-            status_code=206,
-            media_type="application/octet-stream",
-            headers=response_headers
-        )
-
-    return StreamingResponse(
-        generate(),
-        media_type="application/octet-stream",
-        headers=response_headers
+    return await proxy_upstream(
+        matching_os.url,
+        filename,
+        range_header=request.headers.get("range") if request else None,
+        request_headers=headers,
+        response_headers={
+            "Cache-Control": "public, max-age=31536000",
+            "X-Original-URL": matching_os.url,
+        },
     )
 
 
 @router.get("/url/{encoded_url}")
 async def proxy_download_by_url(
     encoded_url: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
@@ -413,68 +245,12 @@ async def proxy_download_by_url(
     parsed = urlparse(original_url)
     filename = parsed.path.split("/")[-1] or "download.iso"
 
-    # Check for Range request (for resume support)
-    range_header = request.headers.get("range") if request else None
-
-    async def generate():
-        """Stream the download in chunks with range support."""
-        async with httpx.AsyncClient(timeout=DOWNLOAD_TIMEOUT) as client:
-            try:
-                # Forward Range header if present for resume support
-                req_headers = {}
-                if range_header:
-                    req_headers["Range"] = range_header
-
-                async with client.stream(
-                    "GET",
-                    original_url,
-                    headers=req_headers,
-                    follow_redirects=True
-                ) as response:
-                    response.raise_for_status()
-
-                    # Stream content in chunks
-                    async for chunk in response.aiter_bytes(chunk_size=CHUNK_SIZE):
-                        yield chunk
-
-            except httpx.HTTPError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Failed to fetch from source: {str(e)}"
-                )
-
-    # Quick HEAD request to get Content-Length (non-blocking with short timeout)
-    content_length = None
-    try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            head_response = await client.head(original_url, follow_redirects=True)
-            content_length = head_response.headers.get("content-length")
-    except Exception:
-        pass  # Don't block download if HEAD fails
-
-    # Build response headers with resume support
-    response_headers = {
-        "Content-Disposition": f'attachment; filename="{filename}"',
-        "Cache-Control": "no-cache",
-        "Accept-Ranges": "bytes",  # Enable resume support
-        "X-Original-URL": original_url,
-    }
-
-    # Add Content-Length if we got it (shows file size in download managers)
-    if content_length:
-        response_headers["Content-Length"] = content_length
-
-    # For Range requests, return 206 status code for IDM to recognize resume
-    if range_header:
-        return StreamingResponse(
-            generate(),
-            status_code=206,
-            media_type="application/octet-stream",
-            headers=response_headers
-        )
-
-    return StreamingResponse(
-        generate(),
-        media_type="application/octet-stream",
-        headers=response_headers
+    return await proxy_upstream(
+        original_url,
+        filename,
+        range_header=request.headers.get("range") if request else None,
+        response_headers={
+            "Cache-Control": "no-cache",
+            "X-Original-URL": original_url,
+        },
     )
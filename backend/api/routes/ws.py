@@ -6,6 +6,7 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from typing import Optional
 
 from api.services.websocket import ws_manager
+from api.services.ws_protocol import encode_json
 
 router = APIRouter(prefix="/api/ws", tags=["WebSocket"])
 
@@ -37,6 +38,10 @@ async def downloads_websocket(
             ...
         }
     }
+
+    Clients offering the "iso-toolkit.progress.v1" subprotocol receive
+    progress updates as compact binary frames instead
+    (see api.services.ws_protocol); other messages remain JSON.
     """
     # Accept connection
     client_id = await ws_manager.connect(websocket)
@@ -52,11 +57,11 @@ async def downloads_websocket(
             ws_manager.subscribe_to_all(client_id)
 
         # Send initial connection message
-        await websocket.send_json({
+        await websocket.send_text(encode_json({
             "type": "connected",
             "client_id": client_id,
             "message": "WebSocket connection established",
-        })
+        }))
 
         # Keep connection alive and handle incoming messages
         while True:
@@ -72,7 +77,7 @@ async def downloads_websocket(
                 if download_id is not None:
                     ws_manager.unsubscribe_from_download(client_id, download_id)
             elif data.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+                await websocket.send_text(encode_json({"type": "pong"}))
 
     except WebSocketDisconnect:
         ws_manager.disconnect(client_id)
@@ -0,0 +1,173 @@
+"""
+Precomputed catalog entries for the OS listing routes.
+
+Provider catalogs only change when the code does, yet every listing used
+to rebuild each ISO's ID and size string and validate a fresh
+OSInfoResponse per item, per request. Each category is now turned into
+CatalogEntry objects once per catalog version: the response model is
+built with model_construct (the data comes from typed OSInfo objects) and
+encoded to JSON bytes up front, so a listing is one bytes join.
+
+Database overrides and custom ISOs are still read per request and merged
+on top; they are few, so building their entries on the fly is cheap.
+Call invalidate_catalog() when the providers change.
+
+The built-in providers are imported and registered on first use
+(ensure_providers), not at startup.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from fastapi.responses import Response
+
+from api.models.schemas import OSInfoResponse
+from api.services.metrics import CACHE_REQUESTS
+from core.models import OSCategory, OSInfo
+from core.os.base import get_registry
+
+# Bumped by invalidate_catalog(); a build that raced an invalidation is not stored
+_catalog_version = 0
+_catalog: Dict[OSCategory, List["CatalogEntry"]] = {}
+
+_providers_registered = False
+
+
+def ensure_providers() -> None:
+    """Register the built-in OS providers, once."""
+    global _providers_registered
+    if _providers_registered:
+        return
+
+    from core.os.windows import WindowsProvider
+    from core.os.linux import LinuxProvider
+    from core.os.macos import MacOSProvider
+    from core.os.bsd import BSDProvider
+
+    registry = get_registry()
+    registry.register(WindowsProvider())
+    registry.register(LinuxProvider())
+    registry.register(MacOSProvider())
+    registry.register(BSDProvider())
+    _providers_registered = True
+    invalidate_catalog()
+
+
+class CatalogEntry:
+    """A catalog item with its response model and encoded JSON."""
+
+    __slots__ = ("iso_id", "os_info", "response", "json")
+
+    def __init__(self, response: OSInfoResponse, os_info: Optional[OSInfo] = None):
+        self.iso_id = response.id
+        self.os_info = os_info
+        self.response = response
+        self.json = response.model_dump_json().encode()
+
+    @classmethod
+    def from_os_info(cls, os_info: OSInfo) -> "CatalogEntry":
+        """
+        Build the entry for an ISO definition without validating it again.
+
+        Args:
+            os_info: ISO definition (built-in, or built from an override)
+
+        Returns:
+            Catalog entry
+        """
+        response = OSInfoResponse.model_construct(
+            id=os_info.iso_id,
+            name=os_info.name,
+            version=os_info.version,
+            category=os_info.category.value,
+            architecture=os_info.architecture,
+            language=os_info.language,
+            size=os_info.size,
+            size_formatted=os_info.size_formatted if os_info.size else "Unknown",
+            source=os_info.source,
+            icon=os_info.icon,
+            url=os_info.url,
+            checksum=os_info.checksum,
+            checksum_type=os_info.checksum_type,
+            description=os_info.description,
+            release_date=os_info.release_date,
+            subcategory=os_info.subcategory,
+        )
+        return cls(response, os_info)
+
+
+async def get_catalog(category: OSCategory) -> List[CatalogEntry]:
+    """
+    Get the built-in entries of a category, building them on first use.
+
+    An ISO defined twice keeps its first position and its last definition.
+
+    Args:
+        category: OS category
+
+    Returns:
+        Entries in provider order (shared; don't modify)
+    """
+    ensure_providers()
+
+    entries = _catalog.get(category)
+    if entries is not None:
+        CACHE_REQUESTS.inc(cache="catalog", result="hit")
+        return entries
+    CACHE_REQUESTS.inc(cache="catalog", result="miss")
+
+    version = _catalog_version
+    by_id: Dict[str, CatalogEntry] = {}
+    for provider in get_registry().get_by_category(category):
+        for os_info in await provider.fetch_available():
+            by_id[os_info.iso_id] = CatalogEntry.from_os_info(os_info)
+    entries = list(by_id.values())
+
+    if version == _catalog_version:
+        _catalog[category] = entries
+    return entries
+
+
+def invalidate_catalog() -> None:
+    """Drop the built entries so the next request rebuilds them."""
+    global _catalog_version
+    _catalog_version += 1
+    _catalog.clear()
+
+
+def filter_entries(
+    entries: Iterable[CatalogEntry],
+    architecture=None,
+    language: Optional[str] = None,
+) -> List[CatalogEntry]:
+    """
+    Apply the providers' architecture and language filters to built-in entries.
+
+    Args:
+        entries: Catalog entries
+        architecture: Architecture to keep (optional)
+        language: Language to keep (optional)
+
+    Returns:
+        Matching entries
+    """
+    return [
+        entry for entry in entries
+        if (architecture is None or entry.os_info.architecture == architecture)
+        and (language is None or entry.os_info.language == language)
+    ]
+
+
+def catalog_response(entries: Iterable[CatalogEntry]) -> Response:
+    """
+    JSON array response from pre-encoded entries.
+
+    Args:
+        entries: Catalog entries
+
+    Returns:
+        Response with the entries' JSON joined into an array
+    """
+    return Response(
+        b"[" + b",".join(entry.json for entry in entries) + b"]",
+        media_type="application/json",
+    )
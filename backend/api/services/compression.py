@@ -0,0 +1,109 @@
+"""
+Content-encoding helpers shared by static asset serving and response
+compression.
+
+Brotli is used when the optional `brotli` package is installed; gzip is
+always available.
+"""
+
+from typing import Iterable, Optional
+import gzip
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+# Encodings in order of preference
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Media types worth compressing (already-compressed images, archives and
+# ISOs are skipped)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Compression levels; static assets are compressed once, so they get more effort
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 9
+
+
+def is_compressible(media_type: Optional[str]) -> bool:
+    """Check whether a media type benefits from compression."""
+    if not media_type:
+        return False
+    media_type = media_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def parse_accept_encoding(header: Optional[str]) -> dict:
+    """
+    Parse an Accept-Encoding header.
+
+    Args:
+        header: Header value (may be None)
+
+    Returns:
+        Map of encoding to quality value
+    """
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header: Optional[str], available: Iterable[str] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """
+    Pick the preferred encoding the client accepts.
+
+    Args:
+        header: Accept-Encoding header value
+        available: Encodings on offer, most preferred first
+
+    Returns:
+        "br", "gzip" or None for identity
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, static: bool = False) -> bytes:
+    """
+    Compress a body.
+
+    Args:
+        body: Uncompressed bytes
+        encoding: "br" or "gzip"
+        static: Use the slowest, smallest settings (for bodies compressed once)
+
+    Returns:
+        Compressed bytes
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=STATIC_BROTLI_QUALITY if static else BROTLI_QUALITY)
+    # mtime=0 keeps output identical for identical input
+    return gzip.compress(body, compresslevel=STATIC_GZIP_LEVEL if static else GZIP_LEVEL, mtime=0)
@@ -0,0 +1,317 @@
+"""
+Daily rollup of completed downloads for analytics.
+
+Each completed download increments one row of download_daily_stats
+(day x category x architecture x OS), and deleting or cancelling
+(dismissing) a completed download decrements it again, so the rollup
+always matches the completed rows of the downloads table.
+Time series, breakdowns and top-OS queries read the rollup, so their cost
+depends on the number of days and distinct OS versions, not on the number
+of downloads.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import func, desc
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from api.database.models import DownloadRecord, DownloadDailyStats
+from core.models import DownloadState
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("day", "week", "month")
+
+# Columns that can be used for breakdowns
+BREAKDOWN_COLUMNS = {
+    "category": DownloadDailyStats.os_category,
+    "architecture": DownloadDailyStats.os_architecture,
+    "os": DownloadDailyStats.os_name,
+}
+
+
+def _download_day(record: DownloadRecord) -> date:
+    """Day a download is counted under (its creation date, as before the rollup)."""
+    return (record.created_at or datetime.utcnow()).date()
+
+
+def _bucket(record: DownloadRecord) -> Dict[str, Any]:
+    """Daily bucket columns of a download."""
+    return {
+        "day": _download_day(record),
+        "os_category": record.os_category,
+        "os_architecture": record.os_architecture,
+        "os_name": record.os_name,
+        "os_version": record.os_version,
+    }
+
+
+def record_completed_download(db: Session, record: DownloadRecord) -> None:
+    """
+    Add a completed download to its daily bucket.
+    The caller commits the session.
+
+    Args:
+        db: Database session
+        record: The completed download record
+    """
+    bucket = _bucket(record)
+    total_bytes = record.total_bytes or 0
+
+    # Retry once if another worker creates the bucket concurrently
+    for _ in range(2):
+        row = db.query(DownloadDailyStats).filter_by(**bucket).first()
+        if row:
+            # Increment in SQL so concurrent completions are not lost
+            row.download_count = DownloadDailyStats.download_count + 1
+            row.total_bytes = DownloadDailyStats.total_bytes + total_bytes
+            return
+
+        try:
+            with db.begin_nested():
+                db.add(DownloadDailyStats(**bucket, download_count=1, total_bytes=total_bytes))
+            return
+        except IntegrityError:
+            continue
+
+    logger.warning(f"Could not record daily stats for download {record.id}")
+
+
+def remove_completed_downloads(db: Session, records: Iterable[DownloadRecord]) -> None:
+    """
+    Subtract completed downloads that are being deleted or cancelled from
+    their daily buckets. Call it in the transaction that changes them; the
+    caller commits.
+
+    Args:
+        db: Database session
+        records: The completed download records (or rows with the same columns)
+    """
+    totals: Dict[Tuple, List[int]] = defaultdict(lambda: [0, 0])
+    for record in records:
+        total = totals[tuple(_bucket(record).items())]
+        total[0] += 1
+        total[1] += record.total_bytes or 0
+
+    for bucket, (count, total_bytes) in totals.items():
+        db.query(DownloadDailyStats).filter_by(**dict(bucket)).update(
+            {
+                DownloadDailyStats.download_count: DownloadDailyStats.download_count - count,
+                DownloadDailyStats.total_bytes: DownloadDailyStats.total_bytes - total_bytes,
+            },
+            synchronize_session=False,
+        )
+
+    if totals:
+        db.query(DownloadDailyStats).filter(
+            DownloadDailyStats.download_count <= 0
+        ).delete(synchronize_session=False)
+
+
+def rebuild_daily_stats(db: Session) -> int:
+    """
+    Rebuild the rollup from the downloads table (backfill).
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of daily buckets written
+    """
+    day = func.date(DownloadRecord.created_at)
+    rows = db.query(
+        day,
+        DownloadRecord.os_category,
+        DownloadRecord.os_architecture,
+        DownloadRecord.os_name,
+        DownloadRecord.os_version,
+        func.count(DownloadRecord.id),
+        func.coalesce(func.sum(DownloadRecord.total_bytes), 0),
+    ).filter(
+        DownloadRecord.state == DownloadState.COMPLETED.value
+    ).group_by(
+        day,
+        DownloadRecord.os_category,
+        DownloadRecord.os_architecture,
+        DownloadRecord.os_name,
+        DownloadRecord.os_version,
+    ).all()
+
+    db.query(DownloadDailyStats).delete()
+    db.bulk_save_objects([
+        DownloadDailyStats(
+            # SQLite returns date() as a string, PostgreSQL as a date
+            day=date.fromisoformat(bucket_day) if isinstance(bucket_day, str) else bucket_day,
+            os_category=category,
+            os_architecture=architecture,
+            os_name=name,
+            os_version=version,
+            download_count=count,
+            total_bytes=int(total_bytes),
+        )
+        for bucket_day, category, architecture, name, version, count, total_bytes in rows
+    ])
+    db.commit()
+    return len(rows)
+
+
+def backfill_daily_stats_if_empty(db: Session) -> Optional[int]:
+    """
+    Backfill the rollup once for databases created before it existed.
+
+    Returns:
+        Number of buckets written, or None if no backfill was needed
+    """
+    if db.query(DownloadDailyStats.id).first() is not None:
+        return None
+    has_completed = db.query(DownloadRecord.id).filter(
+        DownloadRecord.state == DownloadState.COMPLETED.value
+    ).first()
+    if has_completed is None:
+        return None
+    return rebuild_daily_stats(db)
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """Start date of the bucket containing a day."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day + timedelta(days=7)
+    if granularity == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def _date_filters(start: Optional[date], end: Optional[date]) -> list:
+    filters = []
+    if start:
+        filters.append(DownloadDailyStats.day >= start)
+    if end:
+        filters.append(DownloadDailyStats.day <= end)
+    return filters
+
+
+def get_time_series(
+    db: Session,
+    start: date,
+    end: date,
+    granularity: str = "day",
+) -> List[Dict[str, Any]]:
+    """
+    Completed downloads per bucket between two dates (inclusive).
+    Buckets without downloads are included with zero counts. The first
+    week or month bucket covers the whole period, from its first day.
+
+    Args:
+        db: Database session
+        start: First day (moved back to the start of its bucket)
+        end: Last day
+        granularity: "day", "week" or "month"
+
+    Returns:
+        List of {"date", "count", "total_bytes"} ordered by date
+    """
+    start = bucket_start(start, granularity)
+    rows = db.query(
+        DownloadDailyStats.day,
+        func.sum(DownloadDailyStats.download_count),
+        func.sum(DownloadDailyStats.total_bytes),
+    ).filter(
+        *_date_filters(start, end)
+    ).group_by(DownloadDailyStats.day).all()
+
+    buckets: Dict[date, List[int]] = {}
+    current = start
+    while current <= end:
+        buckets[current] = [0, 0]
+        current = _next_bucket(current, granularity)
+
+    for day, count, total_bytes in rows:
+        bucket = buckets.setdefault(bucket_start(day, granularity), [0, 0])
+        bucket[0] += int(count or 0)
+        bucket[1] += int(total_bytes or 0)
+
+    return [
+        {"date": day.strftime("%Y-%m-%d"), "count": count, "total_bytes": total_bytes}
+        for day, (count, total_bytes) in sorted(buckets.items())
+    ]
+
+
+def get_breakdown(
+    db: Session,
+    dimension: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Completed downloads grouped by category, architecture or OS name.
+
+    Args:
+        db: Database session
+        dimension: Key of BREAKDOWN_COLUMNS
+        start: First day (optional)
+        end: Last day (optional)
+        limit: Maximum number of groups (optional)
+
+    Returns:
+        List of {"key", "count", "total_bytes"}, most downloaded first
+    """
+    column = BREAKDOWN_COLUMNS[dimension]
+    count = func.sum(DownloadDailyStats.download_count).label("count")
+    query = db.query(
+        column,
+        count,
+        func.sum(DownloadDailyStats.total_bytes),
+    ).filter(
+        *_date_filters(start, end)
+    ).group_by(column).order_by(desc(count))
+
+    if limit:
+        query = query.limit(limit)
+
+    return [
+        {"key": key, "count": int(total or 0), "total_bytes": int(total_bytes or 0)}
+        for key, total, total_bytes in query.all()
+    ]
+
+
+def get_top_os(
+    db: Session,
+    limit: int = 5,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Most downloaded OS versions.
+
+    Returns:
+        List of {"name", "version", "count"}
+    """
+    count = func.sum(DownloadDailyStats.download_count).label("count")
+    rows = db.query(
+        DownloadDailyStats.os_name,
+        DownloadDailyStats.os_version,
+        count,
+    ).filter(
+        *_date_filters(start, end)
+    ).group_by(
+        DownloadDailyStats.os_name,
+        DownloadDailyStats.os_version,
+    ).order_by(desc(count)).limit(limit).all()
+
+    return [
+        {"name": name, "version": version, "count": int(total or 0)}
+        for name, version, total in rows
+    ]
@@ -3,16 +3,24 @@ Download service for managing ISO downloads with WebSocket progress updates.
 
 Integrates with the existing DownloadManager but adds async support
 and WebSocket progress broadcasting.
+
+Progress events and control commands go through the event broker so that
+several uvicorn workers can share the load: each download is owned by the
+worker that started it, and commands arriving at another worker are
+forwarded to the owner.
 """
 
 import asyncio
+import base64
 import os
+import uuid
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Any, Tuple
 from datetime import datetime
 import logging
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.models import (
     DownloadTask,
@@ -22,10 +30,57 @@ from core.models import (
 )
 from core.manager import DownloadManager
 from api.database.models import DownloadRecord
+from api.database.session import AsyncSessionLocal
 from api.services.websocket import ws_manager
+from api.services.events import event_broker, WORKER_ID
+from api.services.stats import invalidate_download_stats
+from api.services.daily_stats import record_completed_download, remove_completed_downloads
+from api.services.metrics import DOWNLOAD_BYTES, DOWNLOADS_FINISHED, mirror_host
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for the owning worker to answer a forwarded command
+CONTROL_TIMEOUT = 2.0
+
+# Page size limits for download listings
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(record: DownloadRecord) -> str:
+    """
+    Encode the keyset position of a record as an opaque cursor.
+
+    Args:
+        record: Last record of the current page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{record.created_at.isoformat()}|{record.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        (created_at, id) of the last record on the previous page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, record_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(record_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
 
 class AsyncDownloadService:
     """
@@ -42,11 +97,15 @@ class AsyncDownloadService:
         self.download_manager = DownloadManager(download_dir)
         self.active_tasks: Dict[int, DownloadTask] = {}
         self._task_counter = 0
+        # Forwarded control commands awaiting a reply, by request ID
+        self._pending_controls: Dict[str, asyncio.Future] = {}
+        # Bytes already counted in download_bytes_total, by download ID
+        self._counted_bytes: Dict[int, int] = {}
 
     async def start_download(
         self,
         os_info: OSInfo,
-        db: Session,
+        db: AsyncSession,
         output_path: Optional[str] = None,
     ) -> DownloadRecord:
         """
@@ -73,13 +132,14 @@ class AsyncDownloadService:
             os_language=os_info.language,
             url=os_info.url,
             output_path=output_path,
-            state=DownloadState.PENDING,
+            state=DownloadState.PENDING.value,
             checksum=os_info.checksum,
             checksum_type=os_info.checksum_type,
         )
         db.add(record)
-        db.commit()
-        db.refresh(record)
+        await db.commit()
+        await db.refresh(record)
+        invalidate_download_stats()
 
         # Create download task
         task = DownloadTask(
@@ -88,26 +148,27 @@ class AsyncDownloadService:
             state=DownloadState.PENDING,
         )
 
+        # Callbacks fire on the download worker thread, so hand them to the loop
+        loop = asyncio.get_running_loop()
+
         # Set up progress callback for WebSocket
         def on_progress(progress: DownloadProgress):
-            asyncio.create_task(self._broadcast_progress(record.id, progress))
+            asyncio.run_coroutine_threadsafe(self._broadcast_progress(record.id, progress), loop)
 
         # Set up completion callback (async version stored separately)
         async def on_complete_async(success: bool, error: Optional[str] = None):
-            await self._on_download_complete(record.id, db, success, error)
+            await self._on_download_complete(record.id, success, error)
 
         # Synchronous wrapper for the manager's _download_worker
         def on_complete(success: bool, error: Optional[str] = None):
             # Schedule the async callback to run in the event loop
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                asyncio.create_task(on_complete_async(success, error))
+            if not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(on_complete_async(success, error), loop)
 
         # Store task and callbacks
         self.active_tasks[record.id] = task
         task.on_progress = on_progress
         task.on_complete = on_complete
-        task._on_complete_async = on_complete_async
 
         # Start download in background
         asyncio.create_task(self._run_download(record.id))
@@ -144,8 +205,18 @@ class AsyncDownloadService:
             download_id: The download ID
             progress: The progress data
         """
+        # DownloadProgress carries no state; the task holds the current one
+        task = self.active_tasks.get(download_id)
+        state = task.state if task else DownloadState.DOWNLOADING
+
+        if task is not None:
+            counted = self._counted_bytes.get(download_id, 0)
+            if progress.downloaded > counted:
+                DOWNLOAD_BYTES.inc(progress.downloaded - counted, host=mirror_host(task.os_info.url))
+            self._counted_bytes[download_id] = progress.downloaded
+
         progress_data = {
-            "state": progress.state.value,
+            "state": state.value,
             "progress": progress.percentage,
             "downloaded_bytes": progress.downloaded,
             "total_bytes": progress.total,
@@ -157,19 +228,18 @@ class AsyncDownloadService:
             "eta_formatted": progress.eta_formatted,
         }
 
-        await ws_manager.broadcast_download_progress(download_id, progress_data)
+        await self._publish_progress(download_id, progress_data)
 
         # Also update database periodically (every 10% or on state change)
-        if int(progress.percentage) % 10 == 0 or progress.state in (
+        if int(progress.percentage) % 10 == 0 or state in (
             DownloadState.COMPLETED,
             DownloadState.FAILED,
         ):
-            await self._update_db_progress(download_id, progress)
+            await self._update_db_progress(download_id, progress, state)
 
     async def _on_download_complete(
         self,
         download_id: int,
-        db: Session,
         success: bool,
         error: Optional[str] = None,
     ) -> None:
@@ -178,31 +248,35 @@ class AsyncDownloadService:
 
         Args:
             download_id: The download ID
-            db: Database session
             success: Whether download succeeded
             error: Error message if failed
         """
-        record = db.query(DownloadRecord).filter(DownloadRecord.id == download_id).first()
-        if not record:
-            return
-
-        if success:
-            record.state = DownloadState.COMPLETED
-            record.completed_at = datetime.utcnow()
-            record.progress = 100.0
-            record.checksum_verified = 1
-        else:
-            record.state = DownloadState.FAILED
-            record.error_message = error
-            record.checksum_verified = -1
+        async with AsyncSessionLocal() as db:
+            record = await db.get(DownloadRecord, download_id)
+            if not record:
+                return
+
+            if success:
+                record.state = DownloadState.COMPLETED.value
+                record.completed_at = datetime.utcnow()
+                record.progress = 100.0
+                record.checksum_verified = 1
+                await db.run_sync(lambda session: record_completed_download(session, record))
+            else:
+                record.state = DownloadState.FAILED.value
+                record.error_message = error
+                record.checksum_verified = -1
 
-        db.commit()
+            await db.commit()
+        invalidate_download_stats()
+        DOWNLOADS_FINISHED.inc(result="completed" if success else "failed")
+        self._counted_bytes.pop(download_id, None)
 
         # Broadcast final update
-        await ws_manager.broadcast_download_progress(
+        await self._publish_progress(
             download_id,
             {
-                "state": record.state.value,
+                "state": (DownloadState.COMPLETED if success else DownloadState.FAILED).value,
                 "progress": record.progress,
                 "error_message": record.error_message,
                 "checksum_verified": record.checksum_verified,
@@ -213,6 +287,96 @@ class AsyncDownloadService:
         if download_id in self.active_tasks:
             del self.active_tasks[download_id]
 
+    async def _publish_progress(self, download_id: int, progress_data: Dict[str, Any]) -> None:
+        """
+        Publish a progress update to WebSocket clients on every worker.
+
+        Args:
+            download_id: The download ID
+            progress_data: The progress data
+        """
+        await event_broker.publish({
+            "type": "download_progress",
+            "download_id": download_id,
+            "data": progress_data,
+            "origin": WORKER_ID,
+        })
+
+    async def handle_event(self, message: Dict[str, Any]) -> None:
+        """
+        Handle a message received from the event broker.
+
+        Args:
+            message: The event message
+        """
+        message_type = message.get("type")
+
+        if message_type == "download_progress":
+            await ws_manager.broadcast_download_progress(message["download_id"], message["data"])
+
+        elif message_type == "download_control":
+            # Only the worker owning the download acts on the command
+            if message.get("origin") == WORKER_ID or message["download_id"] not in self.active_tasks:
+                return
+            result = await self._apply_control(message["action"], message["download_id"])
+            await event_broker.publish({
+                "type": "download_control_reply",
+                "request_id": message["request_id"],
+                "target": message["origin"],
+                "result": result,
+            })
+
+        elif message_type == "download_control_reply":
+            if message.get("target") != WORKER_ID:
+                return
+            future = self._pending_controls.pop(message["request_id"], None)
+            if future and not future.done():
+                future.set_result(bool(message.get("result")))
+
+    async def _apply_control(self, action: str, download_id: int) -> bool:
+        """Run a control command against a locally owned download."""
+        if action == "pause":
+            return await self.pause_download(download_id)
+        if action == "resume":
+            return await self.resume_download(download_id)
+        if action == "cancel":
+            return await self.cancel_download(download_id)
+        return False
+
+    async def _forward_control(self, action: str, download_id: int) -> bool:
+        """
+        Forward a control command to the worker that owns the download.
+
+        Args:
+            action: "pause", "resume" or "cancel"
+            download_id: The download ID
+
+        Returns:
+            The owner's result, or False if no worker answered in time
+        """
+        if not event_broker.distributed:
+            return False
+
+        request_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending_controls[request_id] = future
+
+        await event_broker.publish({
+            "type": "download_control",
+            "action": action,
+            "download_id": download_id,
+            "request_id": request_id,
+            "origin": WORKER_ID,
+        })
+
+        try:
+            return await asyncio.wait_for(future, timeout=CONTROL_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"No worker answered {action} for download {download_id}")
+            return False
+        finally:
+            self._pending_controls.pop(request_id, None)
+
     async def _update_db_state(self, download_id: int, state: DownloadState) -> None:
         """
         Update download state in database.
@@ -221,42 +385,42 @@ class AsyncDownloadService:
             download_id: The download ID
             state: The new state
         """
-        from api.database.session import SessionLocal
-
-        db = SessionLocal()
-        try:
-            record = db.query(DownloadRecord).filter(DownloadRecord.id == download_id).first()
+        async with AsyncSessionLocal() as db:
+            record = await db.get(DownloadRecord, download_id)
             if record:
-                record.state = state
+                record.state = state.value
                 if state == DownloadState.DOWNLOADING and not record.started_at:
                     record.started_at = datetime.utcnow()
-                db.commit()
-        finally:
-            db.close()
+                await db.commit()
+                invalidate_download_stats()
 
-    async def _update_db_progress(self, download_id: int, progress: DownloadProgress) -> None:
+    async def _update_db_progress(
+        self,
+        download_id: int,
+        progress: DownloadProgress,
+        state: DownloadState,
+    ) -> None:
         """
         Update download progress in database.
 
         Args:
             download_id: The download ID
             progress: The progress data
+            state: The current download state
         """
-        from api.database.session import SessionLocal
-
-        db = SessionLocal()
-        try:
-            record = db.query(DownloadRecord).filter(DownloadRecord.id == download_id).first()
+        async with AsyncSessionLocal() as db:
+            record = await db.get(DownloadRecord, download_id)
             if record:
-                record.state = progress.state
+                state_changed = record.state != state.value
+                record.state = state.value
                 record.progress = progress.percentage
                 record.downloaded_bytes = progress.downloaded
                 record.total_bytes = progress.total
                 record.speed = progress.speed
                 record.eta = progress.eta
-                db.commit()
-        finally:
-            db.close()
+                await db.commit()
+                if state_changed:
+                    invalidate_download_stats()
 
     async def pause_download(self, download_id: int) -> bool:
         """
@@ -269,14 +433,14 @@ class AsyncDownloadService:
             True if paused successfully
         """
         if download_id not in self.active_tasks:
-            return False
+            return await self._forward_control("pause", download_id)
 
         task = self.active_tasks[download_id]
         result = self.download_manager.pause_download(task)
 
         if result:
             await self._update_db_state(download_id, DownloadState.PAUSED)
-            await ws_manager.broadcast_download_progress(
+            await self._publish_progress(
                 download_id,
                 {"state": DownloadState.PAUSED.value},
             )
@@ -294,7 +458,7 @@ class AsyncDownloadService:
             True if resumed successfully
         """
         if download_id not in self.active_tasks:
-            return False
+            return await self._forward_control("resume", download_id)
 
         task = self.active_tasks[download_id]
         result = self.download_manager.resume_download(task)
@@ -314,8 +478,6 @@ class AsyncDownloadService:
         Returns:
             True if cancelled successfully (always returns True to allow UI to proceed)
         """
-        from api.database.session import SessionLocal
-
         logger.info(f"Cancel request for download {download_id}, active_tasks: {list(self.active_tasks.keys())}")
 
         # If download is active, cancel it normally
@@ -327,51 +489,107 @@ class AsyncDownloadService:
 
             if result:
                 await self._update_db_state(download_id, DownloadState.CANCELLED)
-                await ws_manager.broadcast_download_progress(
+                await self._publish_progress(
                     download_id,
                     {"state": DownloadState.CANCELLED.value},
                 )
+                DOWNLOADS_FINISHED.inc(result="cancelled")
+                self._counted_bytes.pop(download_id, None)
                 if download_id in self.active_tasks:
                     del self.active_tasks[download_id]
                 return True
 
+        # The download may be running on another worker
+        elif await self._forward_control("cancel", download_id):
+            return True
+
         # If download is not active or cancel failed, try to mark it as cancelled in database
         # This handles all edge cases: server restart, race conditions, stuck downloads
-        db = SessionLocal()
-        try:
-            record = db.query(DownloadRecord).filter(DownloadRecord.id == download_id).first()
-            if record:
-                logger.info(f"Download {download_id} found in DB, state: {record.state}")
-                # Always mark as cancelled regardless of current state
-                # This allows users to dismiss stuck or completed downloads
-                old_state = record.state
-                record.state = DownloadState.CANCELLED
-                db.commit()
-                logger.info(f"Download {download_id} marked as cancelled (was: {old_state})")
-                await ws_manager.broadcast_download_progress(
-                    download_id,
-                    {"state": DownloadState.CANCELLED.value},
-                )
-                return True
-            else:
+        async with AsyncSessionLocal() as db:
+            record = await db.get(DownloadRecord, download_id)
+            if not record:
                 logger.warning(f"Download {download_id} not found in database")
                 return False
-        finally:
-            db.close()
 
-    def get_all_downloads(self, db: Session) -> List[DownloadRecord]:
+            logger.info(f"Download {download_id} found in DB, state: {record.state}")
+            # Always mark as cancelled regardless of current state
+            # This allows users to dismiss stuck or completed downloads
+            old_state = record.state
+            if old_state == DownloadState.COMPLETED.value:
+                await db.run_sync(lambda session: remove_completed_downloads(session, [record]))
+            record.state = DownloadState.CANCELLED.value
+            await db.commit()
+
+        invalidate_download_stats()
+        logger.info(f"Download {download_id} marked as cancelled (was: {old_state})")
+        await self._publish_progress(
+            download_id,
+            {"state": DownloadState.CANCELLED.value},
+        )
+        return True
+
+    async def get_all_downloads(
+        self,
+        db: AsyncSession,
+        state: Optional[DownloadState] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[DownloadRecord], Optional[str]]:
         """
-        Get all downloads from database.
+        Get downloads from database, newest first.
+
+        Without limit and cursor every download is returned, as before
+        pagination existed. Otherwise one page is returned, using keyset
+        pagination on (created_at, id) so each page costs an index range
+        scan regardless of how deep it is.
 
         Args:
             db: Database session
+            state: Filter by state (optional)
+            limit: Maximum number of records (capped at MAX_PAGE_SIZE;
+                DEFAULT_PAGE_SIZE when only a cursor is given)
+            cursor: Cursor returned with the previous page (optional)
 
         Returns:
-            List of all download records
+            (records, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        return db.query(DownloadRecord).order_by(DownloadRecord.created_at.desc()).all()
+        query = select(DownloadRecord)
+
+        if state:
+            query = query.where(DownloadRecord.state == state.value)
 
-    def get_download(self, download_id: int, db: Session) -> Optional[DownloadRecord]:
+        order = (DownloadRecord.created_at.desc(), DownloadRecord.id.desc())
+        if limit is None and cursor is None:
+            result = await db.execute(query.order_by(*order))
+            return list(result.scalars().all()), None
+
+        limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+        if cursor:
+            created_at, record_id = decode_cursor(cursor)
+            query = query.where(or_(
+                DownloadRecord.created_at < created_at,
+                and_(DownloadRecord.created_at == created_at, DownloadRecord.id < record_id),
+            ))
+
+        # Fetch one extra row to know whether another page exists
+        result = await db.execute(
+            query.order_by(*order)
+            .limit(limit + 1)
+        )
+        records = list(result.scalars().all())
+
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = encode_cursor(records[-1])
+
+        return records, next_cursor
+
+    async def get_download(self, download_id: int, db: AsyncSession) -> Optional[DownloadRecord]:
         """
         Get a specific download from database.
 
@@ -382,9 +600,9 @@ class AsyncDownloadService:
         Returns:
             Download record or None
         """
-        return db.query(DownloadRecord).filter(DownloadRecord.id == download_id).first()
+        return await db.get(DownloadRecord, download_id)
 
-    async def clear_completed(self, db: Session) -> int:
+    async def clear_completed(self, db: AsyncSession) -> int:
         """
         Clear completed downloads from database.
 
@@ -394,20 +612,27 @@ class AsyncDownloadService:
         Returns:
             Number of downloads cleared
         """
-        completed = (
-            db.query(DownloadRecord)
-            .filter(DownloadRecord.state.in_(
-                [DownloadState.COMPLETED, DownloadState.FAILED, DownloadState.CANCELLED]
+        # Keep the daily rollup in step with the rows being deleted
+        completed = (await db.execute(
+            select(
+                DownloadRecord.created_at,
+                DownloadRecord.os_category,
+                DownloadRecord.os_architecture,
+                DownloadRecord.os_name,
+                DownloadRecord.os_version,
+                DownloadRecord.total_bytes,
+            ).where(DownloadRecord.state == DownloadState.COMPLETED.value)
+        )).all()
+        await db.run_sync(lambda session: remove_completed_downloads(session, completed))
+
+        result = await db.execute(
+            delete(DownloadRecord).where(DownloadRecord.state.in_(
+                [DownloadState.COMPLETED.value, DownloadState.FAILED.value, DownloadState.CANCELLED.value]
             ))
-            .all()
         )
-
-        count = len(completed)
-        for record in completed:
-            db.delete(record)
-
-        db.commit()
-        return count
+        await db.commit()
+        invalidate_download_stats()
+        return result.rowcount
 
 
 # Global download service instance
@@ -0,0 +1,230 @@
+"""
+Pluggable pub/sub backends for download events.
+
+Every uvicorn worker subscribes to the same event stream, so a progress
+update raised by the worker that owns a download reaches WebSocket clients
+connected to any worker. Control commands (pause/resume/cancel) travel over
+the same stream so they can be routed to the owning worker.
+
+Backends:
+- memory: in-process delivery, only valid with a single worker (default)
+- postgres: PostgreSQL LISTEN/NOTIFY, shared by all workers using DATABASE_URL
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import json
+import logging
+import os
+import select
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Unique identity of this worker process, used to route control replies
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# PostgreSQL NOTIFY channel shared by all workers
+EVENT_CHANNEL = "iso_toolkit_events"
+
+
+class EventBroker(ABC):
+    """
+    Base class for download event brokers.
+
+    A broker delivers every published message to the handler of every
+    subscribed worker, including the publisher itself.
+    """
+
+    # True when messages cross process boundaries
+    distributed: bool = False
+
+    def __init__(self):
+        self._handler: Optional[EventHandler] = None
+
+    async def start(self, handler: EventHandler) -> None:
+        """
+        Start receiving events.
+
+        Args:
+            handler: Coroutine called with each received message
+        """
+        self._handler = handler
+
+    async def stop(self) -> None:
+        """Stop receiving events and release resources."""
+        self._handler = None
+
+    @abstractmethod
+    async def publish(self, message: Dict[str, Any]) -> None:
+        """
+        Publish a message to all workers.
+
+        Args:
+            message: JSON-serializable message
+        """
+        pass
+
+    async def _dispatch(self, message: Dict[str, Any]) -> None:
+        """Pass a received message to the handler, logging failures."""
+        if self._handler is None:
+            return
+        try:
+            await self._handler(message)
+        except Exception as e:
+            logger.error(f"Error handling event {message.get('type')}: {e}")
+
+
+class InProcessEventBroker(EventBroker):
+    """
+    Delivers events directly to the local handler.
+    Suitable for a single uvicorn worker.
+    """
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        await self._dispatch(message)
+
+
+class PostgresEventBroker(EventBroker):
+    """
+    Delivers events between workers using PostgreSQL LISTEN/NOTIFY.
+
+    A listener thread holds a dedicated connection and hands notifications
+    to the event loop; publishing uses a second connection from a thread
+    pool so the loop never blocks on the database.
+    """
+
+    distributed = True
+
+    # NOTIFY payloads are limited to 8000 bytes by PostgreSQL
+    MAX_PAYLOAD = 7900
+
+    def __init__(self, database_url: str, channel: str = EVENT_CHANNEL):
+        super().__init__()
+        self.database_url = database_url
+        self.channel = channel
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+
+    def _connect(self):
+        import psycopg2
+
+        conn = psycopg2.connect(self.database_url)
+        conn.set_isolation_level(0)  # autocommit, required for LISTEN/NOTIFY
+        return conn
+
+    async def start(self, handler: EventHandler) -> None:
+        await super().start(handler)
+        self._loop = asyncio.get_running_loop()
+        self._stopping.clear()
+        self._listener = threading.Thread(
+            target=self._listen,
+            name="event-broker-listener",
+            daemon=True,
+        )
+        self._listener.start()
+        logger.info(f"PostgreSQL event broker listening on '{self.channel}' ({WORKER_ID})")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._listener is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._listener.join, 5)
+            self._listener = None
+        with self._publish_lock:
+            if self._publish_conn is not None:
+                self._publish_conn.close()
+                self._publish_conn = None
+        await super().stop()
+
+    def _listen(self) -> None:
+        """Listener thread: receive notifications and forward them to the loop."""
+        while not self._stopping.is_set():
+            try:
+                conn = self._connect()
+            except Exception as e:
+                logger.error(f"Event broker connection failed: {e}")
+                self._stopping.wait(5)
+                continue
+
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+
+                while not self._stopping.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            message = json.loads(notify.payload)
+                        except ValueError:
+                            logger.warning("Dropping malformed event payload")
+                            continue
+                        asyncio.run_coroutine_threadsafe(self._dispatch(message), self._loop)
+            except Exception as e:
+                logger.error(f"Event broker listener error: {e}")
+                self._stopping.wait(1)
+            finally:
+                conn.close()
+
+    def _notify(self, payload: str) -> None:
+        """Send a NOTIFY on the shared publish connection (runs in a thread)."""
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publish_conn is None or self._publish_conn.closed:
+                        self._publish_conn = self._connect()
+                    with self._publish_conn.cursor() as cursor:
+                        cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+                    return
+                except Exception:
+                    self._publish_conn = None
+                    if attempt:
+                        raise
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        payload = json.dumps(message, separators=(",", ":"), default=str)
+        if len(payload) > self.MAX_PAYLOAD:
+            logger.warning(f"Event payload too large ({len(payload)} bytes), dropping")
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._notify, payload)
+        except Exception as e:
+            logger.error(f"Error publishing event: {e}")
+
+
+def create_event_broker() -> EventBroker:
+    """
+    Create the event broker selected by the EVENT_BROKER environment variable.
+
+    Returns:
+        Configured event broker (in-process by default)
+    """
+    backend = os.getenv("EVENT_BROKER", "memory").lower()
+
+    if backend == "postgres":
+        from api.database.session import get_database_url
+
+        database_url = get_database_url()
+        if not database_url.startswith("postgresql"):
+            raise RuntimeError("EVENT_BROKER=postgres requires a PostgreSQL DATABASE_URL")
+        # psycopg2 expects a plain libpq URL without the SQLAlchemy driver suffix
+        scheme, rest = database_url.split("://", 1)
+        return PostgresEventBroker(f"{scheme.split('+')[0]}://{rest}")
+
+    if backend != "memory":
+        logger.warning(f"Unknown EVENT_BROKER '{backend}', using in-process broker")
+    return InProcessEventBroker()
+
+
+# Global event broker instance
+event_broker = create_event_broker()
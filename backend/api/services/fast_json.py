@@ -0,0 +1,51 @@
+"""
+Optional orjson serialization for API responses and WebSocket frames.
+
+With FAST_JSON_ENABLED=true and orjson installed, the app's default
+response class is ORJSONResponse and WebSocket messages are encoded with
+orjson. Otherwise the standard library json module is used. Both produce
+equivalent JSON: values orjson would format itself (datetimes,
+dataclasses) are passed to str() as json's default=str does.
+
+FastAPI still converts route results to JSON-compatible data before the
+response class renders them; orjson only replaces the final encode.
+"""
+
+from typing import Any
+import json
+import os
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+FAST_JSON_ENABLED = os.getenv("FAST_JSON_ENABLED", "false").lower() == "true"
+USE_ORJSON = FAST_JSON_ENABLED and orjson is not None
+
+# Response class for the FastAPI app
+JSON_RESPONSE_CLASS = ORJSONResponse if USE_ORJSON else JSONResponse
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+def dumps(obj: Any) -> str:
+    """
+    Encode compact JSON, using orjson when enabled.
+
+    Args:
+        obj: Value to encode; unsupported types are encoded with str()
+
+    Returns:
+        JSON text
+    """
+    if USE_ORJSON:
+        return orjson.dumps(obj, default=str, option=ORJSON_OPTIONS).decode()
+    return json.dumps(obj, separators=(",", ":"), default=str)
@@ -0,0 +1,297 @@
+"""
+Set-based writes for ISO overrides.
+
+Bulk admin operations and imports touch thousands of rows, so existing
+overrides are loaded with one IN query per batch and written with a
+dialect-aware INSERT ... ON CONFLICT (PostgreSQL and SQLite), all inside
+the caller's transaction. Built-in ISOs are looked up by ID with a single
+pass over the providers of the categories involved.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.database.models import ISOOverride
+from api.services.catalog import ensure_providers
+from core.models import OSCategory, OSInfo
+from core.os.base import get_registry
+
+# Columns copied from an ISO definition into an override
+OVERRIDE_FIELDS = (
+    "name",
+    "version",
+    "category",
+    "architecture",
+    "language",
+    "url",
+    "size",
+    "description",
+    "icon",
+    "checksum",
+    "checksum_type",
+)
+
+# IDs per IN query (one bound parameter each), and the most rows per INSERT
+BATCH_SIZE = 500
+
+# Bound parameters allowed per statement. SQLite builds before 3.32 allow
+# 999; PostgreSQL's protocol allows 65535.
+MAX_PARAMETERS = {"sqlite": 999, "postgresql": 65535}
+
+# Parameters of an upsert besides the row values (its ON CONFLICT clause)
+UPSERT_EXTRA_PARAMETERS = 4
+
+
+def _batches(items: Sequence, size: int = BATCH_SIZE) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def builtin_iso_id(os_info: OSInfo) -> str:
+    """ID of a built-in ISO, as used by the catalog routes and overrides."""
+    return os_info.iso_id
+
+
+def builtin_iso_fields(os_info: OSInfo) -> Dict[str, Any]:
+    """Override fields (OVERRIDE_FIELDS) of a built-in ISO."""
+    return {
+        "name": os_info.name,
+        "version": os_info.version,
+        "category": os_info.category.value,
+        "architecture": os_info.architecture.value,
+        "language": os_info.language,
+        "url": os_info.url,
+        "size": os_info.size or 0,
+        "description": os_info.description,
+        "icon": os_info.icon,
+        "checksum": os_info.checksum,
+        "checksum_type": os_info.checksum_type,
+    }
+
+
+async def find_builtin_isos(iso_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Look up built-in ISOs by ID.
+
+    Only the categories named by the ID prefixes are scanned, each once.
+
+    Args:
+        iso_ids: ISO IDs to look up
+
+    Returns:
+        Map of ISO ID to its built-in fields (OVERRIDE_FIELDS); unknown IDs are omitted
+    """
+    wanted = set(iso_ids)
+    categories = set()
+    for iso_id in wanted:
+        try:
+            categories.add(OSCategory(iso_id.split("_", 1)[0]))
+        except ValueError:
+            continue
+
+    ensure_providers()
+    registry = get_registry()
+    found: Dict[str, Dict[str, Any]] = {}
+
+    for category in categories:
+        for provider in registry.get_by_category(category):
+            try:
+                os_list = await provider.fetch_available()
+            except Exception:
+                continue
+            for os_info in os_list:
+                iso_id = builtin_iso_id(os_info)
+                if iso_id in wanted and iso_id not in found:
+                    found[iso_id] = builtin_iso_fields(os_info)
+            if len(found) == len(wanted):
+                return found
+
+    return found
+
+
+def load_overrides(db: Session, iso_ids: Sequence[str]) -> Dict[str, ISOOverride]:
+    """
+    Load existing overrides for a set of ISO IDs.
+
+    Args:
+        db: Database session
+        iso_ids: ISO IDs
+
+    Returns:
+        Map of ISO ID to override
+    """
+    overrides: Dict[str, ISOOverride] = {}
+    for batch in _batches(list(iso_ids)):
+        for override in db.scalars(select(ISOOverride).where(ISOOverride.iso_id.in_(batch))):
+            overrides[override.iso_id] = override
+    return overrides
+
+
+def existing_iso_ids(db: Session, iso_ids: Sequence[str]) -> Set[str]:
+    """
+    Return which of the given ISO IDs already have an override.
+
+    Args:
+        db: Database session
+        iso_ids: ISO IDs
+
+    Returns:
+        Set of ISO IDs present in the database
+    """
+    found: Set[str] = set()
+    for batch in _batches(list(iso_ids)):
+        found.update(db.scalars(select(ISOOverride.iso_id).where(ISOOverride.iso_id.in_(batch))))
+    return found
+
+
+def import_overrides(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    username: str,
+    mode: str = "update",
+) -> Tuple[int, int, int]:
+    """
+    Import a batch of override rows. The caller commits the session.
+
+    Rows with the same ISO ID are collapsed, the last one winning.
+
+    Args:
+        db: Database session
+        rows: Dicts with "iso_id" and the fields in OVERRIDE_FIELDS
+        username: Admin performing the import
+        mode: "update" (or "replace" after clearing the table) overwrites
+            existing rows, "skip" keeps them
+
+    Returns:
+        (created, updated, skipped) counts
+    """
+    unique = {row["iso_id"]: row for row in rows}
+    existing = existing_iso_ids(db, list(unique))
+
+    upsert_overrides(
+        db,
+        list(unique.values()),
+        username,
+        on_conflict="skip" if mode == "skip" else "update",
+    )
+
+    created = len(unique) - len(existing)
+    if mode == "skip":
+        return created, 0, len(existing)
+    return created, len(existing), 0
+
+
+def _rows_per_insert(dialect: str, columns: int) -> int:
+    """Rows per multi-row INSERT that keep its bound parameters within the limit."""
+    limit = MAX_PARAMETERS.get(dialect, MAX_PARAMETERS["sqlite"]) - UPSERT_EXTRA_PARAMETERS
+    return max(1, min(BATCH_SIZE, limit // columns))
+
+
+def _dialect_insert(db: Session):
+    """Return the dialect's insert() supporting ON CONFLICT, or None."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def upsert_overrides(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    username: str,
+    on_conflict: str = "update",
+    update_fields: Sequence[str] = OVERRIDE_FIELDS,
+) -> None:
+    """
+    Insert overrides, updating or skipping rows whose ISO ID already exists.
+    The caller commits the session.
+
+    Args:
+        db: Database session
+        rows: Dicts with "iso_id" and every field in OVERRIDE_FIELDS
+        username: Admin performing the change
+        on_conflict: "update" to overwrite existing rows, "skip" to keep them
+        update_fields: Fields overwritten on conflict
+    """
+    if not rows:
+        return
+
+    now = datetime.utcnow()
+    values = [
+        {
+            "iso_id": row["iso_id"],
+            **{field: row.get(field) for field in OVERRIDE_FIELDS},
+            "is_enabled": True,
+            "created_at": now,
+            "updated_at": now,
+            "created_by": username,
+        }
+        for row in rows
+    ]
+
+    insert = _dialect_insert(db)
+    if insert is None:
+        _upsert_orm(db, values, username, on_conflict, update_fields, now)
+        return
+
+    rows_per_insert = _rows_per_insert(db.get_bind().dialect.name, len(values[0]))
+    for batch in _batches(values, rows_per_insert):
+        stmt = insert(ISOOverride).values(list(batch))
+        if on_conflict == "skip":
+            stmt = stmt.on_conflict_do_nothing(index_elements=[ISOOverride.iso_id])
+        else:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ISOOverride.iso_id],
+                set_={
+                    **{field: stmt.excluded[field] for field in update_fields},
+                    "is_enabled": True,
+                    "updated_at": now,
+                    "updated_by": username,
+                },
+            )
+        db.execute(stmt)
+
+
+def _upsert_orm(
+    db: Session,
+    values: List[Dict[str, Any]],
+    username: str,
+    on_conflict: str,
+    update_fields: Sequence[str],
+    now: datetime,
+) -> None:
+    """Fallback for databases without ON CONFLICT support."""
+    existing = load_overrides(db, [value["iso_id"] for value in values])
+    for value in values:
+        override = existing.get(value["iso_id"])
+        if override is None:
+            db.add(ISOOverride(**value))
+        elif on_conflict != "skip":
+            for field in update_fields:
+                setattr(override, field, value[field])
+            override.is_enabled = True
+            override.updated_at = now
+            override.updated_by = username
+
+
+def override_fields_from(data: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a full override row from partial data on top of an optional base.
+
+    Args:
+        data: Fields to set (None values are ignored)
+        base: Existing or built-in fields (optional)
+
+    Returns:
+        Dict with every field in OVERRIDE_FIELDS
+    """
+    row = {field: (base or {}).get(field) for field in OVERRIDE_FIELDS}
+    row.update({field: value for field, value in data.items() if field in OVERRIDE_FIELDS and value is not None})
+    return row
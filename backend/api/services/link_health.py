@@ -0,0 +1,494 @@
+"""
+Background link-health crawler for the ISO catalog.
+
+Every catalog URL and mirror (built-in ISOs with overrides applied, plus
+custom ISOs) is checked with a ranged GET for its first byte, which also
+reveals the file size and whether the server supports resume. Checks run
+concurrently on one shared HTTP client, with a global limit and a per-host
+limit so a single mirror is never hammered. Each result is stored in
+link_checks, one row per ISO and URL; all rows of a crawl share its start
+time.
+
+A URL that failed LINK_DEAD_AFTER checks in a row is dead, and an ISO is
+dead once all of its URLs are. Both sets are kept in memory, so the
+catalog can hide or deprioritise dead ISOs, and downloads can skip dead
+mirrors, without touching the database on the request path.
+
+Configuration (environment):
+- LINK_CHECK_ENABLED: run the scheduled crawler ("true"/"false", default false)
+- LINK_CHECK_INTERVAL_HOURS: hours between crawls (default 24)
+- LINK_CHECK_CONCURRENCY: simultaneous checks (default 20)
+- LINK_CHECK_PER_HOST: simultaneous checks per host (default 2)
+- LINK_CHECK_TIMEOUT: seconds per check (default 15)
+- LINK_CHECK_RETENTION_DAYS: days of history kept (default 30)
+- LINK_DEAD_AFTER: consecutive failures before a link counts as dead (default 2)
+- LINK_HEALTH_POLICY: "off", "deprioritize" (default) or "hide" dead ISOs and URLs
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+from urllib.parse import urlparse
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import delete, func, select
+
+from api.database.models import ISOOverride, LinkCheck
+from api.database.session import AsyncSessionLocal
+from api.services.catalog import ensure_providers
+from api.services.iso_overrides import builtin_iso_id
+from core.models import OSCategory
+from core.os.base import get_registry
+
+if TYPE_CHECKING:
+    # Imported on first use; httpx is slow to import and not needed to start
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+POLICIES = ("off", "deprioritize", "hide")
+
+# How often a worker that did not crawl reloads dead links from the database
+REFRESH_INTERVAL = 15 * 60
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+class HostLimiter:
+    """Per-host semaphores, created on first use."""
+
+    def __init__(self, per_host: int):
+        self._semaphores: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_host))
+
+    def __call__(self, url: str) -> asyncio.Semaphore:
+        return self._semaphores[_host(url)]
+
+
+# Shared client for on-demand URL validation (admin requests)
+_http_client: Optional["httpx.AsyncClient"] = None
+
+# Connection limits of the shared client
+HTTP_CLIENT_MAX_CONNECTIONS = 50
+HTTP_CLIENT_MAX_KEEPALIVE = 20
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """
+    Get the shared HTTP client used to validate URLs, creating it on first use.
+
+    Reusing one client keeps connections (and TLS sessions) to mirrors alive
+    between checks instead of opening a new client per request.
+    """
+    import httpx
+
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_CLIENT_MAX_KEEPALIVE,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (on shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def probe_url(
+    client: "httpx.AsyncClient",
+    url: str,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Check a URL with a ranged GET for its first byte.
+
+    Only the response headers are read. The total size is taken from
+    Content-Range when the server honours the range, else Content-Length.
+
+    Args:
+        client: Shared HTTP client (should follow redirects)
+        url: URL to check
+        timeout: Seconds before giving up (default: the client's timeout)
+
+    Returns:
+        Dict with is_alive, status_code, content_length, content_type,
+        supports_resume, latency_ms, final_url and error_message
+    """
+    started = time.perf_counter()
+    try:
+        request_options = {"timeout": timeout} if timeout is not None else {}
+        async with client.stream("GET", url, headers={"Range": "bytes=0-0"}, **request_options) as response:
+            latency_ms = int((time.perf_counter() - started) * 1000)
+            headers = response.headers
+            content_type = headers.get("content-type")
+
+            content_length = None
+            content_range = headers.get("content-range", "")
+            if response.status_code == 206 and "/" in content_range:
+                total = content_range.rsplit("/", 1)[1]
+                content_length = int(total) if total.isdigit() else None
+            elif headers.get("content-length", "").isdigit():
+                content_length = int(headers["content-length"])
+
+            # An HTML page instead of a file usually means a bot-protection page
+            is_html = bool(content_type and "text/html" in content_type)
+            final_url = str(response.url)
+
+            error_message = None
+            if response.status_code >= 400:
+                error_message = f"HTTP {response.status_code}"
+            elif is_html:
+                error_message = "URL returns HTML (may require Cloudflare bypass)"
+
+            return {
+                "is_alive": response.status_code < 400 and not is_html,
+                "status_code": response.status_code,
+                "content_length": content_length,
+                "content_type": content_type[:255] if content_type else None,
+                "supports_resume": response.status_code == 206 or headers.get("accept-ranges") == "bytes",
+                "latency_ms": latency_ms,
+                "final_url": final_url if final_url != url else None,
+                "error_message": error_message,
+            }
+    except Exception as e:
+        return {
+            "is_alive": False,
+            "status_code": None,
+            "content_length": None,
+            "content_type": None,
+            "supports_resume": False,
+            "latency_ms": int((time.perf_counter() - started) * 1000),
+            "final_url": None,
+            "error_message": str(e) or type(e).__name__,
+        }
+
+
+async def probe_many(
+    client: "httpx.AsyncClient",
+    items: Iterable[Tuple[T, str]],
+    concurrency: int,
+    per_host: int,
+    timeout: Optional[float] = None,
+):
+    """
+    Probe many URLs with a global and a per-host concurrency limit.
+
+    Args:
+        client: Shared HTTP client
+        items: (key, url) pairs
+        concurrency: Maximum simultaneous checks
+        per_host: Maximum simultaneous checks against one host
+        timeout: Seconds per check (default: the client's timeout)
+
+    Yields:
+        (key, url, result) tuples in completion order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    host_limit = HostLimiter(per_host)
+
+    async def check(key: T, url: str):
+        async with semaphore, host_limit(url):
+            return key, url, await probe_url(client, url, timeout)
+
+    tasks = [asyncio.create_task(check(key, url)) for key, url in items]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def collect_catalog_links() -> Dict[str, List[str]]:
+    """
+    Collect the URLs of every catalog ISO.
+
+    Returns:
+        Map of ISO ID to its URLs, main URL first, then mirrors (an enabled
+        override with a different URL replaces the built-in URL and mirrors)
+    """
+    ensure_providers()
+    links: Dict[str, List[str]] = {}
+    registry = get_registry()
+    for category in OSCategory:
+        for provider in registry.get_by_category(category):
+            try:
+                for os_info in await provider.fetch_available():
+                    if os_info.url:
+                        links[builtin_iso_id(os_info)] = list(dict.fromkeys([os_info.url, *os_info.mirrors]))
+            except Exception as e:
+                logger.warning(f"Link crawler could not list {provider.metadata.name}: {e}")
+
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(select(ISOOverride.iso_id, ISOOverride.url, ISOOverride.is_enabled))
+        for iso_id, url, is_enabled in rows:
+            if not is_enabled:
+                links.pop(iso_id, None)
+            elif url and url != links.get(iso_id, [None])[0]:
+                links[iso_id] = [url]
+
+    return links
+
+
+def latest_checks_query():
+    """Checks from the most recent crawl of every ISO (one row per URL)."""
+    latest = (
+        select(LinkCheck.iso_id, func.max(LinkCheck.checked_at).label("checked_at"))
+        .group_by(LinkCheck.iso_id)
+        .subquery()
+    )
+    return select(LinkCheck).join(
+        latest,
+        (LinkCheck.iso_id == latest.c.iso_id) & (LinkCheck.checked_at == latest.c.checked_at),
+    )
+
+
+def dead_links(checks: Iterable[Tuple[str, str, int]], dead_after: int) -> Tuple[Set[str], Dict[str, Set[str]]]:
+    """
+    Find dead URLs and dead ISOs in the latest checks.
+
+    Args:
+        checks: (iso_id, url, consecutive_failures) of each URL's latest check
+        dead_after: Consecutive failures before a URL counts as dead
+
+    Returns:
+        (IDs of ISOs whose URLs are all dead, map of ISO ID to its dead URLs)
+    """
+    url_counts: Dict[str, int] = defaultdict(int)
+    dead_urls: Dict[str, Set[str]] = defaultdict(set)
+    for iso_id, url, failures in checks:
+        url_counts[iso_id] += 1
+        if failures >= dead_after:
+            dead_urls[iso_id].add(url)
+    dead_iso_ids = {iso_id for iso_id, urls in dead_urls.items() if len(urls) == url_counts[iso_id]}
+    return dead_iso_ids, dict(dead_urls)
+
+
+class LinkHealthCrawler:
+    """
+    Periodically checks every catalog link and tracks dead ones.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("LINK_CHECK_ENABLED", "false").lower() == "true"
+        self.interval = _env_int("LINK_CHECK_INTERVAL_HOURS", 24) * 3600
+        self.concurrency = max(1, _env_int("LINK_CHECK_CONCURRENCY", 20))
+        self.per_host = max(1, _env_int("LINK_CHECK_PER_HOST", 2))
+        self.timeout = _env_int("LINK_CHECK_TIMEOUT", 15)
+        self.retention_days = _env_int("LINK_CHECK_RETENTION_DAYS", 30)
+        self.dead_after = max(1, _env_int("LINK_DEAD_AFTER", 2))
+        policy = os.getenv("LINK_HEALTH_POLICY", "deprioritize").lower()
+        self.policy = policy if policy in POLICIES else "deprioritize"
+
+        self.dead_iso_ids: Set[str] = set()
+        self.dead_urls: Dict[str, Set[str]] = {}
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._run_task: Optional[asyncio.Task] = None
+        self._scheduler: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._run_task is not None and not self._run_task.done()
+
+    async def start(self) -> None:
+        """Load known dead links and start the scheduler if enabled."""
+        try:
+            await self.refresh_dead_links()
+        except Exception as e:
+            logger.error(f"Could not load link health: {e}")
+        if self.enabled and self.interval > 0:
+            self._scheduler = asyncio.create_task(self._schedule())
+
+    async def stop(self) -> None:
+        """Stop the scheduler and any crawl in progress."""
+        for task in (self._scheduler, self._run_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._scheduler = None
+        self._run_task = None
+
+    async def _schedule(self) -> None:
+        """Crawl when the last crawl (by any worker) is older than the interval."""
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    last_checked = await db.scalar(select(func.max(LinkCheck.checked_at)))
+                due = last_checked is None or datetime.utcnow() - last_checked >= timedelta(seconds=self.interval)
+                if due and not self.running:
+                    await self.trigger()
+                    await self._run_task
+                else:
+                    await self.refresh_dead_links()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Link crawler scheduling error: {e}")
+            await asyncio.sleep(min(self.interval, REFRESH_INTERVAL))
+
+    async def trigger(self) -> bool:
+        """
+        Start a crawl in the background.
+
+        Returns:
+            False if a crawl is already running
+        """
+        if self.running:
+            return False
+        self._run_task = asyncio.create_task(self.run())
+        return True
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Check every catalog link once and store the results.
+
+        Returns:
+            Summary of the run
+        """
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        links = await collect_catalog_links()
+
+        async with AsyncSessionLocal() as db:
+            previous = {
+                (check.iso_id, check.url): check
+                for check in (await db.scalars(latest_checks_query())).all()
+            }
+
+        import httpx
+
+        records: List[LinkCheck] = []
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        items = [(iso_id, url) for iso_id, urls in links.items() for url in urls]
+        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True, limits=limits) as client:
+            async for iso_id, url, result in probe_many(client, items, self.concurrency, self.per_host):
+                last = previous.get((iso_id, url))
+                failures = 0
+                if not result["is_alive"]:
+                    failures = (last.consecutive_failures if last is not None and not last.is_alive else 0) + 1
+                records.append(LinkCheck(
+                    iso_id=iso_id,
+                    url=url,
+                    # The crawl's start time, so its rows form the latest check of each ISO
+                    checked_at=started_at,
+                    consecutive_failures=failures,
+                    **result,
+                ))
+
+        async with AsyncSessionLocal() as db:
+            db.add_all(records)
+            if self.retention_days > 0:
+                cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+                await db.execute(delete(LinkCheck).where(LinkCheck.checked_at < cutoff))
+            await db.commit()
+
+        self.dead_iso_ids, self.dead_urls = dead_links(
+            ((record.iso_id, record.url, record.consecutive_failures) for record in records),
+            self.dead_after,
+        )
+        self.last_run = {
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round(time.perf_counter() - started, 2),
+            "checked": len(records),
+            "alive": sum(1 for record in records if record.is_alive),
+            "dead": len(self.dead_iso_ids),
+            "dead_urls": sum(len(urls) for urls in self.dead_urls.values()),
+        }
+        logger.info(
+            f"Link check finished: {self.last_run['checked']} checked, "
+            f"{self.last_run['dead']} dead in {self.last_run['duration_seconds']}s"
+        )
+        return self.last_run
+
+    async def refresh_dead_links(self) -> None:
+        """Reload the dead ISOs and URLs from the latest stored checks."""
+        latest = latest_checks_query().subquery()
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(
+                select(latest.c.iso_id, latest.c.url, latest.c.consecutive_failures)
+            )
+            self.dead_iso_ids, self.dead_urls = dead_links(rows.all(), self.dead_after)
+
+    def apply_policy(self, items: List[T], key=lambda item: item.id) -> List[T]:
+        """
+        Hide or move dead ISOs to the end of a catalog listing.
+
+        Args:
+            items: Catalog entries
+            key: Function returning an entry's ISO ID
+
+        Returns:
+            Entries with the configured policy applied
+        """
+        dead = self.dead_iso_ids
+        if not dead or self.policy == "off":
+            return items
+        if self.policy == "hide":
+            return [item for item in items if key(item) not in dead]
+        # sorted() is stable, so live entries keep their order
+        return sorted(items, key=lambda item: key(item) in dead)
+
+    def apply_url_policy(self, iso_id: str, urls: List[str]) -> List[str]:
+        """
+        Hide or move an ISO's dead URLs after its live ones.
+
+        With "hide", dead URLs are dropped unless none are alive.
+
+        Args:
+            iso_id: ISO ID
+            urls: Download URLs, main URL first, then mirrors
+
+        Returns:
+            URLs with the configured policy applied
+        """
+        dead = self.dead_urls.get(iso_id)
+        if not dead or self.policy == "off":
+            return urls
+        live = [url for url in urls if url not in dead]
+        if self.policy == "hide" and live:
+            return live
+        return live + [url for url in urls if url in dead]
+
+    def status(self) -> Dict[str, Any]:
+        """Crawler configuration and state for the admin API."""
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "policy": self.policy,
+            "interval_hours": self.interval / 3600,
+            "concurrency": self.concurrency,
+            "per_host": self.per_host,
+            "dead_after": self.dead_after,
+            "dead_count": len(self.dead_iso_ids),
+            "dead_url_count": sum(len(urls) for urls in self.dead_urls.values()),
+            "last_run": self.last_run,
+        }
+
+
+# Global crawler instance
+link_crawler = LinkHealthCrawler()
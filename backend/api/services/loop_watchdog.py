@@ -0,0 +1,248 @@
+"""
+Watchdog for blocking calls on the event loop.
+
+A callback scheduled on the loop records a heartbeat every
+LOOP_WATCHDOG_INTERVAL_MS. A daemon thread checks the heartbeat; when it is
+older than LOOP_WATCHDOG_THRESHOLD_MS the loop is stuck in a callback, and
+the watchdog captures the loop thread's stack while it is still blocked.
+The stall is finished when the next heartbeat arrives, which gives its
+duration.
+
+Each stall is attributed to:
+- the route being served (read from the ASGI scope on the stack)
+- the innermost frame in this project's code (the call site to fix)
+- the innermost frame overall (the blocking call itself, e.g. bcrypt)
+
+The last LOOP_WATCHDOG_HISTORY stalls are kept in a ring buffer and
+summarised as top offenders for GET /api/admin/diagnostics/loop-stalls.
+
+Disabled unless LOOP_WATCHDOG_ENABLED=true. When enabled and the loop is
+healthy, the cost is one timer callback per interval and one thread wake-up.
+"""
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from api.services.metrics import Counter, registry
+
+logger = logging.getLogger(__name__)
+
+LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG_ENABLED", "false").lower() == "true"
+LOOP_WATCHDOG_THRESHOLD_MS = int(os.getenv("LOOP_WATCHDOG_THRESHOLD_MS", "100"))
+LOOP_WATCHDOG_INTERVAL_MS = int(os.getenv("LOOP_WATCHDOG_INTERVAL_MS", "50"))
+LOOP_WATCHDOG_HISTORY = int(os.getenv("LOOP_WATCHDOG_HISTORY", "200"))
+
+# Frames kept per captured stack
+MAX_STACK_DEPTH = 40
+
+# Files under this directory count as project code
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent.parent)
+
+LOOP_STALLS = registry.register(Counter(
+    "event_loop_stalls_total",
+    "Callbacks that blocked the event loop longer than the watchdog threshold",
+))
+
+
+def _is_project_frame(filename: str) -> bool:
+    return filename.startswith(PROJECT_ROOT) and "site-packages" not in filename
+
+
+def _describe(frame_summary: traceback.FrameSummary) -> str:
+    filename = frame_summary.filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    return f"{filename}:{frame_summary.lineno} in {frame_summary.name}"
+
+
+def _find_route(frame) -> str:
+    """Find the route of the ASGI request being handled on a stack."""
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") in ("http", "websocket"):
+            route = scope.get("route")
+            if route is not None:
+                return f"{scope.get('method', 'WS')} {route.path}"
+            return f"{scope.get('method', 'WS')} {scope.get('path', '')}"
+        frame = frame.f_back
+    return "background"
+
+
+class LoopStall:
+    """
+    One blocking callback caught by the watchdog.
+    """
+
+    __slots__ = ("started_at", "duration_ms", "route", "function", "blocking_call", "stack")
+
+    def __init__(self, route: str, function: str, blocking_call: str, stack: List[str], blocked_for: float):
+        self.started_at = datetime.utcnow()
+        self.duration_ms = blocked_for * 1000
+        self.route = route
+        self.function = function
+        self.blocking_call = blocking_call
+        self.stack = stack
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 1),
+            "route": self.route,
+            "function": self.function,
+            "blocking_call": self.blocking_call,
+            "stack": self.stack,
+        }
+
+
+class LoopWatchdog:
+    """
+    Detects callbacks that block the event loop and records their stacks.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: int = LOOP_WATCHDOG_THRESHOLD_MS,
+        interval_ms: int = LOOP_WATCHDOG_INTERVAL_MS,
+        history: int = LOOP_WATCHDOG_HISTORY,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.stalls: Deque[LoopStall] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._current: Optional[LoopStall] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start watching the running event loop."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._beat()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Event-loop watchdog started (threshold {self.threshold * 1000:.0f} ms)")
+
+    def stop(self) -> None:
+        """Stop watching."""
+        if not self.running:
+            return
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._thread.join(timeout=1)
+        self._thread = None
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stall = self._current
+            self._current = None
+            if stall is not None:
+                # The blocked callback has returned; record how long it took
+                stall.duration_ms = max(stall.duration_ms, (now - self._last_beat - self.interval) * 1000)
+            self._last_beat = now
+        self._timer = self._loop.call_later(self.interval, self._beat)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                blocked_for = time.monotonic() - self._last_beat - self.interval
+                if self._current is not None or blocked_for < self.threshold:
+                    continue
+            stall = self._capture(blocked_for)
+            if stall is None:
+                continue
+            with self._lock:
+                self._current = stall
+                self.stalls.append(stall)
+            LOOP_STALLS.inc()
+            logger.warning(
+                f"Event loop blocked for {blocked_for * 1000:.0f} ms in {stall.function} "
+                f"({stall.route}), blocking call: {stall.blocking_call}"
+            )
+
+    def _capture(self, blocked_for: float) -> Optional[LoopStall]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        summaries = traceback.extract_stack(frame, limit=MAX_STACK_DEPTH)
+        if not summaries:
+            return None
+        project = [s for s in summaries if _is_project_frame(s.filename)]
+        function = _describe(project[-1]) if project else _describe(summaries[-1])
+        return LoopStall(
+            route=_find_route(frame),
+            function=function,
+            blocking_call=_describe(summaries[-1]),
+            stack=[_describe(s) for s in summaries],
+            blocked_for=blocked_for,
+        )
+
+    def report(self, limit: int = 20) -> Dict[str, Any]:
+        """
+        Summarise the recorded stalls.
+
+        Args:
+            limit: Number of offenders and recent stalls to return
+
+        Returns:
+            Settings, top offenders by route and function, and the most recent stalls
+        """
+        with self._lock:
+            stalls = list(self.stalls)
+
+        offenders: Dict[tuple, Dict[str, Any]] = {}
+        for stall in stalls:
+            entry = offenders.setdefault((stall.route, stall.function), {
+                "route": stall.route,
+                "function": stall.function,
+                "blocking_call": stall.blocking_call,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+            })
+            entry["count"] += 1
+            entry["total_ms"] += stall.duration_ms
+            entry["max_ms"] = max(entry["max_ms"], stall.duration_ms)
+
+        top = sorted(offenders.values(), key=lambda e: e["total_ms"], reverse=True)[:limit]
+        for entry in top:
+            entry["total_ms"] = round(entry["total_ms"], 1)
+            entry["max_ms"] = round(entry["max_ms"], 1)
+
+        return {
+            "enabled": self.running,
+            "threshold_ms": self.threshold * 1000,
+            "recorded": len(stalls),
+            "top_offenders": top,
+            "recent": [stall.to_dict() for stall in reversed(stalls[-limit:])],
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.stalls.clear()
+
+
+# Global event-loop watchdog
+loop_watchdog = LoopWatchdog()
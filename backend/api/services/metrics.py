@@ -0,0 +1,317 @@
+"""
+Minimal Prometheus-style metrics.
+
+Counters, gauges and histograms with labels, rendered in the Prometheus
+text exposition format by GET /metrics. No client library or external
+service is needed; a Prometheus server (or anything that reads the format)
+can scrape the endpoint.
+
+Values that already live elsewhere (active downloads, WebSocket clients,
+pool usage) are read when the endpoint is scraped through CallbackGauge,
+so the hot paths only pay for the counters and histograms they update.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+import asyncio
+import logging
+import math
+import threading
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "iso_toolkit_"
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """
+    Base class for metrics with a fixed set of label names.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """Yield (sample name, label names, label values, value)."""
+        return []
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for name, labelnames, values, value in self.samples():
+            lines.append(f"{name}{_format_labels(labelnames, values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self.labelnames, key, value
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self.labelnames, key, value
+
+
+class CallbackGauge(Metric):
+    """
+    Gauge read from a callback at scrape time.
+
+    The callback returns a number (no labels) or a dict mapping label value
+    tuples to numbers.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Union[float, Dict[LabelValues, float]]],
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self):
+        try:
+            values = self.callback()
+        except Exception as e:
+            logger.warning(f"Error collecting {self.name}: {e}")
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in values.items():
+            yield self.name, self.labelnames, key, value
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        labelnames = self.labelnames + ("le",)
+        for key, state in items:
+            cumulative = 0
+            for index, bound in enumerate(self.buckets):
+                cumulative += state[index]
+                yield f"{self.name}_bucket", labelnames, key + (_format_value(bound),), cumulative
+            yield f"{self.name}_sum", self.labelnames, key, state[-2]
+            yield f"{self.name}_count", self.labelnames, key, state[-1]
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric, replacing one with the same name."""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+registry = MetricsRegistry()
+
+# Content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Metrics updated by the application
+
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+))
+
+DOWNLOADS_FINISHED = registry.register(Counter(
+    "downloads_finished_total",
+    "Server-side downloads that finished, by result",
+    ["result"],
+))
+
+DOWNLOAD_BYTES = registry.register(Counter(
+    "download_bytes_total",
+    "Bytes downloaded by server-side downloads, by mirror host",
+    ["host"],
+))
+
+PROXY_BYTES = registry.register(Counter(
+    "proxy_bytes_streamed_total",
+    "Bytes streamed to clients through the download proxy, by mirror host",
+    ["host"],
+))
+
+CACHE_REQUESTS = registry.register(Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+))
+
+DB_POOL_CHECKOUT = registry.register(Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a database connection from the pool",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+))
+
+EVENT_LOOP_LAG = registry.register(Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when the event loop should wake a sleeping task and when it does",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+))
+
+
+class EventLoopLagProbe:
+    """
+    Measures event-loop lag by sleeping for a fixed interval and recording
+    how late the wake-up is.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - started - self.interval)
+            EVENT_LOOP_LAG.observe(self.last_lag)
+
+
+# Global event-loop lag probe
+loop_lag_probe = EventLoopLagProbe()
+
+registry.register(CallbackGauge(
+    "event_loop_lag_last_seconds",
+    "Event-loop lag measured by the most recent probe",
+    lambda: loop_lag_probe.last_lag,
+))
+
+
+def mirror_host(url: str) -> str:
+    """Host label for a download URL."""
+    return (urlparse(url).hostname or "unknown").lower()
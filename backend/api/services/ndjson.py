@@ -0,0 +1,55 @@
+"""
+Helpers for newline-delimited JSON (NDJSON) streams.
+
+Used by the streaming catalog export/import so large payloads are handled
+one line at a time instead of as a single document.
+"""
+
+from typing import Any, AsyncIterator, Tuple
+import json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Longest accepted line; protects against unbounded buffering
+MAX_LINE_BYTES = 1024 * 1024
+
+
+def encode_line(item: Any) -> bytes:
+    """Encode one item as an NDJSON line."""
+    return json.dumps(item, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int = MAX_LINE_BYTES,
+) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Split a byte stream into non-empty lines.
+
+    Args:
+        chunks: Incoming byte chunks (e.g. request.stream())
+        max_line_bytes: Maximum length of a single line
+
+    Yields:
+        (line number, line) pairs; line numbers start at 1
+
+    Raises:
+        ValueError: If a line exceeds max_line_bytes
+    """
+    buffer = b""
+    line_number = 0
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if len(line) > max_line_bytes:
+                raise ValueError(f"Line {line_number} exceeds {max_line_bytes} bytes")
+            if line.strip():
+                yield line_number, line
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"Line {line_number + 1} exceeds {max_line_bytes} bytes")
+
+    if buffer.strip():
+        yield line_number + 1, buffer
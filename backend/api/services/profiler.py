@@ -0,0 +1,179 @@
+"""
+On-demand sampling profiler for the running process.
+
+A background thread reads the stack of every thread (the event loop,
+download workers, thread pools) with sys._current_frames() at a fixed
+interval, for a fixed duration. Nothing is installed in the profiled
+threads, so the overhead is one stack walk per thread per sample and
+stops when the session ends.
+
+Results are available as:
+- collapsed stacks ("thread;outer;inner count" lines) for flamegraph.pl,
+  speedscope or inferno
+- speedscope JSON (https://www.speedscope.app), one sampled profile per thread
+
+Only one session runs at a time.
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import sys
+import threading
+import time
+
+# Limits for a profiling session
+MAX_DURATION_SECONDS = 60
+MIN_INTERVAL_MS = 1
+MAX_STACK_DEPTH = 128
+
+# Paths are shown relative to the backend folder when possible
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent.parent)
+
+# (function name, file, first line)
+FrameKey = Tuple[str, str, int]
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling session is already running."""
+
+
+class ProfileResult:
+    """
+    Samples collected by one profiling session.
+    """
+
+    def __init__(self, duration: float, interval: float):
+        self.duration = duration
+        self.interval = interval
+        self.sample_count = 0
+        # (thread name, stack from outermost to innermost) -> samples
+        self.stacks: Counter = Counter()
+
+    def collapsed(self) -> str:
+        """Render in the collapsed stack format, one line per unique stack."""
+        lines = []
+        for (thread_name, stack), count in self.stacks.most_common():
+            frames = [thread_name.replace(";", ":")]
+            frames.extend(f"{name} ({file}:{line})".replace(";", ":") for name, file, line in stack)
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """Render as a speedscope file with one sampled profile per thread."""
+        frame_index: Dict[FrameKey, int] = {}
+        frames: List[Dict[str, Any]] = []
+        per_thread: Dict[str, Tuple[List[List[int]], List[int]]] = {}
+
+        for (thread_name, stack), count in self.stacks.items():
+            indices = []
+            for key in stack:
+                index = frame_index.get(key)
+                if index is None:
+                    index = frame_index[key] = len(frames)
+                    name, file, line = key
+                    frames.append({"name": name, "file": file, "line": line})
+                indices.append(index)
+            samples, weights = per_thread.setdefault(thread_name, ([], []))
+            samples.append(indices)
+            weights.append(count)
+
+        interval_ms = self.interval * 1000
+        profiles = []
+        for thread_name, (samples, weights) in sorted(per_thread.items()):
+            profiles.append({
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights) * interval_ms,
+                "samples": samples,
+                "weights": [count * interval_ms for count in weights],
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "name": f"ISO Toolkit profile ({self.duration:g}s)",
+            "exporter": "iso-toolkit",
+        }
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads for a fixed time, one session at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._code_keys: Dict[Any, FrameKey] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, duration: float, interval: float) -> ProfileResult:
+        """
+        Run a profiling session in the calling thread.
+
+        Args:
+            duration: Seconds to sample for (capped at MAX_DURATION_SECONDS)
+            interval: Seconds between samples
+
+        Returns:
+            The collected samples
+
+        Raises:
+            ProfilerBusy: If another session is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            duration = min(duration, MAX_DURATION_SECONDS)
+            interval = max(interval, MIN_INTERVAL_MS / 1000)
+            result = ProfileResult(duration, interval)
+            own_id = threading.get_ident()
+            deadline = time.monotonic() + duration
+            next_sample = time.monotonic()
+
+            while next_sample < deadline:
+                self._sample(result, own_id)
+                next_sample += interval
+                delay = next_sample - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Fell behind (busy GIL); skip missed samples instead of bursting
+                    next_sample = time.monotonic()
+            return result
+        finally:
+            self._code_keys.clear()
+            self._lock.release()
+
+    def _sample(self, result: ProfileResult, own_id: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(self._frame_key(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            result.stacks[(names.get(thread_id, f"thread-{thread_id}"), tuple(stack))] += 1
+        result.sample_count += 1
+
+    def _frame_key(self, code) -> FrameKey:
+        key = self._code_keys.get(code)
+        if key is None:
+            filename = code.co_filename
+            if filename.startswith(PROJECT_ROOT):
+                filename = os.path.relpath(filename, PROJECT_ROOT)
+            key = self._code_keys[code] = (code.co_name, filename, code.co_firstlineno)
+        return key
+
+
+# Global profiler
+sampling_profiler = SamplingProfiler()
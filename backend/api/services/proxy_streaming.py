@@ -0,0 +1,286 @@
+"""
+Streaming of proxied downloads, from a mirror or from a finished local copy.
+
+Upstream passthrough:
+- one shared httpx client keeps connections (and TLS sessions) to mirrors
+  alive instead of building a client, SSL context and HEAD request per
+  download
+- the response status, Content-Length and Content-Range come from the
+  mirror's actual response, so a 206 is only sent when the mirror honoured
+  the Range header
+- the body is read with aiter_raw and Accept-Encoding: identity, skipping
+  the decoder pass of aiter_bytes, and socket reads are joined into 1 MiB
+  blocks with a single copy. A mirror that compresses anyway is decoded
+  with aiter_bytes, and its (encoded) Content-Length is not forwarded
+
+Local files (downloads the server already finished) are served with
+FileRangeResponse: single byte ranges, and the ASGI zero-copy extensions
+(http.response.zerocopysend for sendfile, http.response.pathsend) when
+the server offers them. Otherwise the file is read in 1 MiB blocks with
+os.pread in a worker thread.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
+import os
+import re
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from api.services.metrics import PROXY_BYTES
+
+if TYPE_CHECKING:
+    # Imported on first use; httpx is slow to import and not needed to start
+    import httpx
+
+# Size of the blocks sent to the client
+UPSTREAM_CHUNK_SIZE = 1024 * 1024
+FILE_CHUNK_SIZE = 1024 * 1024
+# Timeout for download requests
+DOWNLOAD_TIMEOUT = 300  # 5 minutes
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+# Mirror headers forwarded to the client
+FORWARDED_HEADERS = ("content-length", "content-range", "last-modified", "etag")
+
+# Shared client for proxied downloads
+_proxy_client: Optional["httpx.AsyncClient"] = None
+
+# Idle connections kept; downloads are long-lived, so concurrent ones aren't capped
+PROXY_CLIENT_MAX_KEEPALIVE = 20
+
+
+def get_proxy_client() -> "httpx.AsyncClient":
+    """
+    Get the shared HTTP client for proxied downloads, creating it on first use.
+    """
+    import httpx
+
+    global _proxy_client
+    if _proxy_client is None or _proxy_client.is_closed:
+        _proxy_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(DOWNLOAD_TIMEOUT, connect=30),
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=PROXY_CLIENT_MAX_KEEPALIVE),
+        )
+    return _proxy_client
+
+
+async def close_proxy_client() -> None:
+    """Close the shared proxy client (on shutdown)."""
+    global _proxy_client
+    if _proxy_client is not None:
+        await _proxy_client.aclose()
+        _proxy_client = None
+
+
+def _is_encoded(response: "httpx.Response") -> bool:
+    """Whether the mirror compressed the body despite Accept-Encoding: identity."""
+    return response.headers.get("content-encoding", "identity").strip().lower() != "identity"
+
+
+async def _forward_bytes(response: "httpx.Response") -> AsyncIterator[bytes]:
+    """
+    Yield the mirror's (decoded) body in blocks of about UPSTREAM_CHUNK_SIZE,
+    counting it in proxy_bytes_streamed_total.
+    """
+    host = response.url.host.lower()
+    chunks = response.aiter_bytes() if _is_encoded(response) else response.aiter_raw()
+    try:
+        # Socket reads are 64 KiB; joining them saves per-message ASGI overhead
+        pending: List[bytes] = []
+        pending_size = 0
+        async for chunk in chunks:
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= UPSTREAM_CHUNK_SIZE:
+                PROXY_BYTES.inc(pending_size, host=host)
+                yield b"".join(pending)
+                pending, pending_size = [], 0
+        if pending:
+            PROXY_BYTES.inc(pending_size, host=host)
+            yield b"".join(pending)
+    finally:
+        await response.aclose()
+
+
+async def proxy_upstream(
+    url: str,
+    filename: str,
+    range_header: Optional[str] = None,
+    request_headers: Optional[Dict[str, str]] = None,
+    response_headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """
+    Stream a file from a mirror to the client.
+
+    Args:
+        url: Mirror URL
+        filename: Name offered in Content-Disposition
+        range_header: Client Range header to forward (for resume)
+        request_headers: Extra headers the mirror needs
+        response_headers: Extra headers for the client (Cache-Control, ...)
+
+    Returns:
+        200 or 206 streaming response mirroring the upstream status
+
+    Raises:
+        HTTPException: 502 if the mirror can't be reached or returns an error
+    """
+    import httpx
+
+    headers = dict(request_headers or {})
+    # Ranges must address the file itself, not a compressed representation
+    headers["Accept-Encoding"] = "identity"
+    if range_header:
+        headers["Range"] = range_header
+
+    client = get_proxy_client()
+    try:
+        upstream = await client.send(client.build_request("GET", url, headers=headers), stream=True)
+    except httpx.HTTPError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to fetch from source: {str(e)}"
+        )
+
+    if upstream.status_code == 416:
+        await upstream.aclose()
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+        )
+    if upstream.is_error:
+        await upstream.aclose()
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to fetch from source: HTTP {upstream.status_code}"
+        )
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Accept-Ranges": "bytes",  # Enable resume support
+    }
+    # The client gets the decoded body, so an encoded length would be wrong
+    skipped = ("content-length",) if _is_encoded(upstream) else ()
+    for name in FORWARDED_HEADERS:
+        if name in upstream.headers and name not in skipped:
+            headers[name.title()] = upstream.headers[name]
+    headers.update(response_headers or {})
+
+    return StreamingResponse(
+        _forward_bytes(upstream),
+        status_code=206 if upstream.status_code == 206 else 200,
+        media_type="application/octet-stream",
+        headers=headers,
+        # Also closes the mirror response if the client disconnects early
+        background=BackgroundTask(upstream.aclose),
+    )
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range.
+
+    Args:
+        range_header: Request Range header
+        size: File size in bytes
+
+    Returns:
+        Inclusive (start, end), or None to send the whole file (no header,
+        or several ranges, which may be answered with the full file)
+
+    Raises:
+        HTTPException: 416 if the range is invalid or beyond the end of the file
+    """
+    if not range_header or "," in range_header:
+        return None
+
+    match = RANGE_PATTERN.match(range_header.strip())
+    if match and (match.group(1) or match.group(2)):
+        if match.group(1):
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(0, size - int(match.group(2))), size - 1
+        if start <= end and start < size:
+            return start, end
+
+    raise HTTPException(
+        status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        detail="Requested range not satisfiable",
+        headers={"Content-Range": f"bytes */{size}"},
+    )
+
+
+class FileRangeResponse(Response):
+    """
+    Sends a local file, or one byte range of it, without buffering it.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        range_header: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: str = "application/octet-stream",
+    ):
+        self.path = Path(path)
+        size = self.path.stat().st_size
+        byte_range = parse_range(range_header, size)
+        self.full_file = byte_range is None
+        self.offset, end = byte_range or (0, size - 1)
+        self.count = end - self.offset + 1 if size else 0
+
+        headers = dict(headers or {})
+        headers["Accept-Ranges"] = "bytes"
+        headers["Content-Length"] = str(self.count)
+        if not self.full_file:
+            headers["Content-Range"] = f"bytes {self.offset}-{end}/{size}"
+        super().__init__(status_code=200 if self.full_file else 206, headers=headers, media_type=media_type)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopysend" in extensions:
+            # The server copies from the file to the socket itself (sendfile)
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.count,
+                })
+        elif "http.response.pathsend" in extensions and self.full_file:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            await self._send_blocks(send)
+
+        PROXY_BYTES.inc(self.count, host="local")
+
+    async def _send_blocks(self, send: Send) -> None:
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, self.offset, self.count, os.POSIX_FADV_SEQUENTIAL)
+            position, remaining = self.offset, self.count
+            while remaining > 0:
+                block = await run_in_threadpool(os.pread, fd, min(FILE_CHUNK_SIZE, remaining), position)
+                if not block:
+                    raise RuntimeError(f"{self.path} shrank while it was being sent")
+                position += len(block)
+                remaining -= len(block)
+                await send({"type": "http.response.body", "body": block, "more_body": remaining > 0})
+        finally:
+            os.close(fd)
@@ -0,0 +1,165 @@
+"""
+In-memory serving of the built frontend (frontend/dist).
+
+At startup every file in the dist folder is read once into a manifest with
+its media type, ETag and cache policy. Compressible files also get brotli
+and gzip variants, taken from `.br`/`.gz` files next to them when the build
+produced them, or compressed once at load time otherwise. Requests are then
+answered from memory without touching the filesystem:
+
+- Vite's content-hashed files under assets/ are cached for a year (immutable)
+- index.html is revalidated on every load (no-cache) so deploys show up
+- other files (logos) are cached for an hour
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import logging
+import mimetypes
+import re
+
+from starlette.responses import Response
+
+from api.services.compression import SUPPORTED_ENCODINGS, choose_encoding, compress, is_compressible
+
+logger = logging.getLogger(__name__)
+
+FRONTEND_DIST = Path(__file__).parent.parent.parent.parent / "frontend" / "dist"
+
+# Files smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+
+# Vite output names: name-<hash>.ext
+HASHED_NAME = re.compile(r"-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+INDEX_CACHE = "no-cache"
+DEFAULT_CACHE = "public, max-age=3600"
+
+# Extensions of precompressed variants produced by the build
+VARIANT_SUFFIXES = {".br": "br", ".gz": "gzip"}
+
+
+class StaticAsset:
+    """
+    One file of the built frontend with its precomputed response data.
+    """
+
+    __slots__ = ("body", "media_type", "etag", "cache_control", "variants")
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        # Encoding ("br"/"gzip") -> compressed body
+        self.variants: Dict[str, bytes] = {}
+
+    def response(self, accept_encoding: Optional[str], if_none_match: Optional[str]) -> Response:
+        """
+        Build the response for a request.
+
+        Args:
+            accept_encoding: Request Accept-Encoding header
+            if_none_match: Request If-None-Match header
+
+        Returns:
+            200 with the best encoding the client accepts, or 304 if its copy is current
+        """
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if self.variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        if if_none_match and self.etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+
+        body = self.body
+        encoding = choose_encoding(accept_encoding, [e for e in SUPPORTED_ENCODINGS if e in self.variants])
+        if encoding is not None:
+            body = self.variants[encoding]
+            headers["Content-Encoding"] = encoding
+
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+
+class StaticAssets:
+    """
+    Manifest of the built frontend, loaded once.
+    """
+
+    def __init__(self, dist_dir: Path = FRONTEND_DIST):
+        self.dist_dir = dist_dir
+        self._assets: Optional[Dict[str, StaticAsset]] = None
+
+    @property
+    def assets(self) -> Dict[str, StaticAsset]:
+        if self._assets is None:
+            self.load()
+        return self._assets
+
+    def load(self) -> int:
+        """
+        Read the dist folder into memory.
+
+        Returns:
+            Number of files loaded
+        """
+        assets: Dict[str, StaticAsset] = {}
+        if self.dist_dir.is_dir():
+            for path in sorted(self.dist_dir.rglob("*")):
+                if not path.is_file() or path.suffix in VARIANT_SUFFIXES:
+                    continue
+                relative = path.relative_to(self.dist_dir).as_posix()
+                assets[relative] = self._load_file(path, relative)
+
+        self._assets = assets
+        compressed = sum(1 for asset in assets.values() if asset.variants)
+        logger.info(f"Loaded {len(assets)} frontend files ({compressed} precompressed)")
+        return len(assets)
+
+    def _load_file(self, path: Path, relative: str) -> StaticAsset:
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+
+        if relative == "index.html":
+            cache_control = INDEX_CACHE
+        elif relative.startswith("assets/") and HASHED_NAME.search(relative):
+            cache_control = IMMUTABLE_CACHE
+        else:
+            cache_control = DEFAULT_CACHE
+
+        asset = StaticAsset(path.read_bytes(), media_type, cache_control)
+
+        if is_compressible(media_type) and len(asset.body) >= MIN_COMPRESS_SIZE:
+            for suffix, encoding in VARIANT_SUFFIXES.items():
+                if encoding not in SUPPORTED_ENCODINGS:
+                    continue
+                prebuilt = path.with_name(path.name + suffix)
+                body = prebuilt.read_bytes() if prebuilt.is_file() else compress(asset.body, encoding, static=True)
+                if len(body) < len(asset.body):
+                    asset.variants[encoding] = body
+
+        return asset
+
+    def get(self, relative_path: str) -> Optional[StaticAsset]:
+        """
+        Look up a file by its path relative to the dist folder.
+
+        Args:
+            relative_path: e.g. "assets/index-B2yexTUY.js"
+
+        Returns:
+            The asset, or None if the build has no such file
+        """
+        return self.assets.get(relative_path.lstrip("/"))
+
+    @property
+    def index(self) -> Optional[StaticAsset]:
+        """The SPA entry page, if the frontend is built."""
+        return self.assets.get("index.html")
+
+
+# Global static asset manifest
+static_assets = StaticAssets()
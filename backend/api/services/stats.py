@@ -0,0 +1,99 @@
+"""
+Aggregate download statistics with a short-lived cache.
+
+Dashboards poll these numbers frequently, so they are computed with a
+single grouped query and cached for a few seconds. The download service
+invalidates the cache whenever a download changes state.
+"""
+
+from typing import Dict, Optional, Tuple
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from api.database.models import DownloadRecord
+from api.services.metrics import CACHE_REQUESTS
+from core.models import DownloadState
+
+# Seconds a computed result is served before querying again
+STATS_CACHE_TTL = 5.0
+
+_stats_cache: Optional[Tuple[float, Dict[str, int]]] = None
+
+
+# One pass over the table: count and byte sum per state
+_STATS_STATEMENT = select(
+    DownloadRecord.state,
+    func.count(DownloadRecord.id),
+    func.coalesce(func.sum(DownloadRecord.total_bytes), 0),
+).group_by(DownloadRecord.state)
+
+
+def _get_cached() -> Optional[Dict[str, int]]:
+    if _stats_cache is not None and time.monotonic() - _stats_cache[0] < STATS_CACHE_TTL:
+        CACHE_REQUESTS.inc(cache="download_stats", result="hit")
+        return _stats_cache[1]
+    CACHE_REQUESTS.inc(cache="download_stats", result="miss")
+    return None
+
+
+def get_download_stats(db: Session) -> Dict[str, int]:
+    """
+    Get download counts and completed bytes.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Dictionary with total, active, completed, failed and total_bytes
+    """
+    cached = _get_cached()
+    if cached is not None:
+        return cached
+    return _summarize(db.execute(_STATS_STATEMENT).all())
+
+
+async def get_download_stats_async(db: AsyncSession) -> Dict[str, int]:
+    """
+    Get download counts and completed bytes using an async session.
+
+    Args:
+        db: Async database session
+
+    Returns:
+        Dictionary with total, active, completed, failed and total_bytes
+    """
+    cached = _get_cached()
+    if cached is not None:
+        return cached
+    return _summarize((await db.execute(_STATS_STATEMENT)).all())
+
+
+def _summarize(rows) -> Dict[str, int]:
+    """Turn per-state rows into the stats dictionary and cache it."""
+    global _stats_cache
+
+    counts = {state: count for state, count, _ in rows}
+    completed_bytes = sum(
+        int(total_bytes) for state, _, total_bytes in rows
+        if state == DownloadState.COMPLETED.value
+    )
+
+    stats = {
+        "total": sum(counts.values()),
+        "active": counts.get(DownloadState.DOWNLOADING.value, 0),
+        "completed": counts.get(DownloadState.COMPLETED.value, 0),
+        "failed": counts.get(DownloadState.FAILED.value, 0),
+        "total_bytes": completed_bytes,
+    }
+
+    _stats_cache = (time.monotonic(), stats)
+    return stats
+
+
+def invalidate_download_stats() -> None:
+    """Drop the cached statistics so the next request recomputes them."""
+    global _stats_cache
+    _stats_cache = None
@@ -3,10 +3,17 @@ WebSocket connection manager for real-time download progress updates.
 """
 
 from fastapi import WebSocket
-from typing import Dict, Set
+from typing import Dict, Set, Optional
 import json
 import logging
 
+from api.services.ws_protocol import (
+    BINARY_SUBPROTOCOL,
+    JSON_SUBPROTOCOL,
+    encode_json,
+    encode_progress_frame,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,27 +29,46 @@ class DownloadWebSocketManager:
         self.active_connections: Dict[str, WebSocket] = {}
         # Subscriptions: which downloads each client is watching
         self.subscriptions: Dict[str, Set[int]] = {}
+        # Clients that negotiated the binary progress subprotocol
+        self.binary_clients: Set[str] = set()
         # Counter for generating client IDs
         self._client_counter = 0
+        # Sends currently waiting on a client socket (slow clients pile up here)
+        self.pending_sends = 0
 
     async def connect(self, websocket: WebSocket) -> str:
         """
         Accept a new WebSocket connection.
 
+        The binary progress format is used when the client offers
+        BINARY_SUBPROTOCOL; otherwise messages are sent as JSON text.
+
         Args:
             websocket: The WebSocket connection
 
         Returns:
             Client ID for this connection
         """
-        await websocket.accept()
+        subprotocol = self._negotiate_subprotocol(websocket)
+        await websocket.accept(subprotocol=subprotocol)
         self._client_counter += 1
         client_id = f"client_{self._client_counter}"
         self.active_connections[client_id] = websocket
         self.subscriptions[client_id] = set()
-        logger.info(f"WebSocket client connected: {client_id}")
+        if subprotocol == BINARY_SUBPROTOCOL:
+            self.binary_clients.add(client_id)
+        logger.info(f"WebSocket client connected: {client_id} ({subprotocol or 'json'})")
         return client_id
 
+    @staticmethod
+    def _negotiate_subprotocol(websocket: WebSocket) -> Optional[str]:
+        """Pick the subprotocol to confirm from those offered by the client."""
+        offered = websocket.scope.get("subprotocols") or []
+        for subprotocol in (BINARY_SUBPROTOCOL, JSON_SUBPROTOCOL):
+            if subprotocol in offered:
+                return subprotocol
+        return None
+
     def disconnect(self, client_id: str) -> None:
         """
         Disconnect a WebSocket client.
@@ -54,6 +80,7 @@ class DownloadWebSocketManager:
             del self.active_connections[client_id]
         if client_id in self.subscriptions:
             del self.subscriptions[client_id]
+        self.binary_clients.discard(client_id)
         logger.info(f"WebSocket client disconnected: {client_id}")
 
     async def send_personal_message(self, message: dict, client_id: str) -> bool:
@@ -70,15 +97,49 @@ class DownloadWebSocketManager:
         if client_id not in self.active_connections:
             return False
 
+        self.pending_sends += 1
         try:
             websocket = self.active_connections[client_id]
-            await websocket.send_json(message)
+            await websocket.send_text(encode_json(message))
+            return True
+        except Exception as e:
+            logger.error(f"Error sending message to {client_id}: {e}")
+            # Remove dead connection
+            self.disconnect(client_id)
+            return False
+        finally:
+            self.pending_sends -= 1
+
+    async def _send_encoded(self, client_id: str, text: Optional[str] = None, data: Optional[bytes] = None) -> bool:
+        """
+        Send a pre-encoded frame to a specific client.
+
+        Args:
+            client_id: The client ID to send to
+            text: JSON text frame
+            data: Binary frame (takes precedence over text)
+
+        Returns:
+            True if message was sent successfully, False otherwise
+        """
+        websocket = self.active_connections.get(client_id)
+        if websocket is None:
+            return False
+
+        self.pending_sends += 1
+        try:
+            if data is not None:
+                await websocket.send_bytes(data)
+            else:
+                await websocket.send_text(text)
             return True
         except Exception as e:
             logger.error(f"Error sending message to {client_id}: {e}")
             # Remove dead connection
             self.disconnect(client_id)
             return False
+        finally:
+            self.pending_sends -= 1
 
     async def broadcast(self, message: dict) -> None:
         """
@@ -105,10 +166,25 @@ class DownloadWebSocketManager:
             "data": progress
         }
 
+        # Encode once per wire format, not once per client
+        text = None
+        binary = None
+        binary_encoded = False
+
         # Send to all clients subscribed to this download
-        for client_id, subscribed_downloads in self.subscriptions.items():
+        # Use list() since dead connections are removed while sending
+        for client_id, subscribed_downloads in list(self.subscriptions.items()):
             if download_id in subscribed_downloads or len(subscribed_downloads) == 0:
-                await self.send_personal_message(message, client_id)
+                if client_id in self.binary_clients:
+                    if not binary_encoded:
+                        binary = encode_progress_frame(download_id, progress)
+                        binary_encoded = True
+                    if binary is not None:
+                        await self._send_encoded(client_id, data=binary)
+                        continue
+                if text is None:
+                    text = encode_json(message)
+                await self._send_encoded(client_id, text=text)
 
     def subscribe_to_download(self, client_id: str, download_id: int) -> None:
         """
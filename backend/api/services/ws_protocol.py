@@ -0,0 +1,109 @@
+"""
+Wire formats for the download progress WebSocket.
+
+JSON text frames are the default. Clients that watch many downloads can
+request the compact binary format by offering the BINARY_SUBPROTOCOL in
+the Sec-WebSocket-Protocol header:
+
+    new WebSocket(url, ["iso-toolkit.progress.v1"])
+
+Binary progress frames use a fixed big-endian layout (30 bytes):
+
+    offset  size  field
+    0       1     frame type (FRAME_PROGRESS)
+    1       4     download id (uint32)
+    5       1     state code (see STATE_CODES)
+    6       8     downloaded bytes (uint64)
+    14      8     total bytes (uint64)
+    22      8     speed in bytes/sec (uint64)
+
+Messages that carry no byte counters (connection notices, pong, state-only
+changes) are still sent as JSON text frames on a binary connection.
+"""
+
+from typing import Any, Dict, Optional
+import struct
+
+from api.services import fast_json
+from core.models import DownloadState
+
+# Subprotocol names accepted by /api/ws/downloads
+BINARY_SUBPROTOCOL = "iso-toolkit.progress.v1"
+JSON_SUBPROTOCOL = "iso-toolkit.json"
+
+# Frame type identifiers
+FRAME_PROGRESS = 1
+
+PROGRESS_FRAME = struct.Struct("!BIBQQQ")
+
+# Stable one-byte codes for download states (never renumber)
+STATE_CODES: Dict[str, int] = {
+    DownloadState.PENDING.value: 0,
+    DownloadState.DOWNLOADING.value: 1,
+    DownloadState.PAUSED.value: 2,
+    DownloadState.COMPLETED.value: 3,
+    DownloadState.FAILED.value: 4,
+    DownloadState.VERIFYING.value: 5,
+    DownloadState.CANCELLED.value: 6,
+}
+STATE_NAMES: Dict[int, str] = {code: name for name, code in STATE_CODES.items()}
+
+
+def encode_json(message: Dict[str, Any]) -> str:
+    """Encode a message as a JSON text frame (with orjson when enabled)."""
+    return fast_json.dumps(message)
+
+
+def encode_progress_frame(download_id: int, progress: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Encode a progress update as a binary frame.
+
+    Args:
+        download_id: The download ID
+        progress: The progress data (as broadcast to JSON clients)
+
+    Returns:
+        Packed frame, or None if the update has no byte counters
+    """
+    if "downloaded_bytes" not in progress:
+        return None
+
+    state_code = STATE_CODES.get(progress.get("state"))
+    if state_code is None:
+        return None
+
+    return PROGRESS_FRAME.pack(
+        FRAME_PROGRESS,
+        download_id,
+        state_code,
+        max(int(progress.get("downloaded_bytes") or 0), 0),
+        max(int(progress.get("total_bytes") or 0), 0),
+        max(int(progress.get("speed") or 0), 0),
+    )
+
+
+def decode_progress_frame(frame: bytes) -> Dict[str, Any]:
+    """
+    Decode a binary progress frame.
+
+    Args:
+        frame: Packed frame produced by encode_progress_frame
+
+    Returns:
+        Message in the same shape as the JSON download_progress message
+    """
+    frame_type, download_id, state_code, downloaded, total, speed = PROGRESS_FRAME.unpack(frame)
+    if frame_type != FRAME_PROGRESS:
+        raise ValueError(f"Unknown frame type: {frame_type}")
+
+    return {
+        "type": "download_progress",
+        "download_id": download_id,
+        "data": {
+            "state": STATE_NAMES.get(state_code, DownloadState.PENDING.value),
+            "progress": (downloaded / total) * 100 if total else 0.0,
+            "downloaded_bytes": downloaded,
+            "total_bytes": total,
+            "speed": speed,
+        },
+    }
@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the ISO Toolkit backend.
+
+Run from the backend directory, for example:
+    python -m benchmarks.ws_protocol
+"""
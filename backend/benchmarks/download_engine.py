@@ -0,0 +1,275 @@
+"""
+Benchmark the download engine against a local range-capable HTTP server.
+
+Downloads a synthetic file from benchmarks.range_server (no internet
+needed) and times:
+- DownloadManager with the Python engine (requests, single stream)
+- DownloadManager with the Rust engine, when core._core is built
+- a segmented reference download (parallel Range requests written with
+  os.pwrite) to show what splitting the file would gain; DownloadManager
+  itself downloads with a single stream
+- checksum verification of the downloaded file, Python and Rust
+
+Network conditions are simulated by the server (--latency, --bandwidth,
+--error-rate). Results are printed and, with --output, appended as one
+JSON line per run so runs can be compared over time.
+
+Usage:
+    python -m benchmarks.download_engine
+    python -m benchmarks.download_engine --size 4G --segments 8 --output bench-results.jsonl
+    python -m benchmarks.download_engine --bandwidth 20M --latency 0.05 --error-rate 0.1
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.range_server import RangeServer, parse_size
+from core import manager as manager_module
+from core.manager import DownloadManager, HAS_RUST, _download_session
+from core.models import OSInfo, OSCategory, Architecture, DownloadState
+
+CHUNK_SIZE = 65536
+
+
+def make_os_info(url: str, size: int, mirrors: int) -> OSInfo:
+    return OSInfo(
+        name="Benchmark",
+        version="1.0",
+        category=OSCategory.OTHER,
+        architecture=Architecture.X64,
+        language="en-US",
+        url=url,
+        # Retries of the same URL let the engine recover from injected errors
+        mirrors=[url] * mirrors,
+        size=size,
+    )
+
+
+def run_manager(engine: str, url: str, size: int, out_dir: str, mirrors: int) -> dict:
+    """
+    Download through DownloadManager with one engine.
+
+    Args:
+        engine: "python" or "rust"
+        url: File URL
+        size: Expected size in bytes
+        out_dir: Directory for the downloaded file
+        mirrors: Extra attempts after a failure
+
+    Returns:
+        Result record
+    """
+    manager_module.HAS_RUST = engine == "rust"
+    try:
+        manager = DownloadManager(download_dir=out_dir)
+        output_path = os.path.join(out_dir, f"{engine}.iso")
+        task = manager.create_download_task(make_os_info(url, size, mirrors), output_path)
+
+        done = threading.Event()
+        outcome = {}
+
+        def on_complete(success: bool, error: Optional[str]) -> None:
+            outcome.update(success=success, error=error)
+            done.set()
+
+        task.on_complete = on_complete
+        started = time.perf_counter()
+        manager.start_download(task)
+        done.wait()
+        elapsed = time.perf_counter() - started
+
+        downloaded = Path(output_path).stat().st_size if Path(output_path).exists() else 0
+        return result_record(
+            f"manager-{engine}", engine, "single-stream", downloaded, elapsed,
+            ok=outcome.get("success", False) and task.state == DownloadState.COMPLETED and downloaded == size,
+            error=outcome.get("error"),
+            path=output_path,
+        )
+    finally:
+        manager_module.HAS_RUST = HAS_RUST
+
+
+def run_segmented(url: str, size: int, out_dir: str, segments: int) -> dict:
+    """
+    Download with parallel Range requests into a preallocated file.
+
+    Args:
+        url: File URL
+        size: File size in bytes
+        out_dir: Directory for the downloaded file
+        segments: Number of parallel ranges
+
+    Returns:
+        Result record
+    """
+    output_path = os.path.join(out_dir, "segmented.iso")
+    bounds = [(size * i // segments, size * (i + 1) // segments - 1) for i in range(segments)]
+
+    fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.ftruncate(fd, size)
+
+        def fetch(start: int, end: int) -> int:
+            response = _download_session.get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=30)
+            if response.status_code != 206:
+                raise Exception(f"HTTP error: {response.status_code} for range {start}-{end}")
+            offset = start
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                os.pwrite(fd, chunk, offset)
+                offset += len(chunk)
+            return offset - start
+
+        started = time.perf_counter()
+        error = None
+        downloaded = 0
+        try:
+            with ThreadPoolExecutor(max_workers=segments) as pool:
+                downloaded = sum(pool.map(lambda bound: fetch(*bound), bounds))
+        except Exception as e:
+            error = str(e)
+        elapsed = time.perf_counter() - started
+    finally:
+        os.close(fd)
+
+    return result_record(
+        f"segmented-{segments}", "python", f"segmented x{segments} (reference)", downloaded, elapsed,
+        ok=error is None and downloaded == size, error=error, path=output_path,
+    )
+
+
+def run_checksum(engine: str, path: str, expected: str, algorithm: str) -> dict:
+    """Time checksum verification of a downloaded file."""
+    size = Path(path).stat().st_size
+    started = time.perf_counter()
+    if engine == "rust":
+        from core import _core
+        valid = _core.verify_checksum(path, expected, algorithm)
+    else:
+        valid = DownloadManager._verify_checksum_python(path, expected, algorithm)
+    elapsed = time.perf_counter() - started
+    return result_record(f"checksum-{algorithm}-{engine}", engine, "checksum", size, elapsed, ok=valid)
+
+
+def result_record(name: str, engine: str, mode: str, size: int, elapsed: float, ok: bool,
+                  error: Optional[str] = None, path: Optional[str] = None) -> dict:
+    record = {
+        "name": name,
+        "engine": engine,
+        "mode": mode,
+        "bytes": size,
+        "seconds": round(elapsed, 4),
+        "mb_per_second": round(size / elapsed / (1024 * 1024), 2) if elapsed > 0 else None,
+        "ok": ok,
+    }
+    if error:
+        record["error"] = error
+    if path:
+        record["_path"] = path
+    return record
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the download engine against a local server")
+    parser.add_argument("--size", type=parse_size, default=parse_size("512M"), help="File size, e.g. 512M or 4G")
+    parser.add_argument("--latency", type=float, default=0.0, help="Server delay before each response (seconds)")
+    parser.add_argument("--bandwidth", type=parse_size, default=None, help="Bytes/second per connection, e.g. 50M")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests the server fails")
+    parser.add_argument("--error-mode", choices=["drop", "status"], default="drop")
+    parser.add_argument("--retries", type=int, default=3, help="Extra attempts DownloadManager gets (as mirrors)")
+    parser.add_argument("--segments", type=int, default=4, help="Parallel ranges for the segmented run (0 to skip)")
+    parser.add_argument("--checksum", default="sha256", help="Checksum algorithm to time")
+    parser.add_argument("--engines", default="python,rust", help="Engines to run (rust is skipped if not built)")
+    parser.add_argument("--dir", default=None, help="Directory for downloaded files (default: temporary)")
+    parser.add_argument("--output", default=None, help="Append results as a JSON line to this file")
+    args = parser.parse_args()
+
+    engines = [engine.strip() for engine in args.engines.split(",") if engine.strip()]
+    if "rust" in engines and not HAS_RUST:
+        engines.remove("rust")
+        print("Rust extension (core._core) not built; skipping the Rust engine")
+
+    print("=" * 60)
+    print("ISO Toolkit - Download engine benchmark")
+    print("=" * 60)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="iso-toolkit-bench-", dir=args.dir) as out_dir:
+        with RangeServer(
+            size=args.size,
+            latency=args.latency,
+            bandwidth=args.bandwidth,
+            error_rate=args.error_rate,
+            error_mode=args.error_mode,
+        ) as server:
+            print(f"Serving {args.size:,} bytes at {server.url}")
+            print()
+
+            for engine in engines:
+                results.append(run_manager(engine, server.url, args.size, out_dir, args.retries))
+            if args.segments > 0:
+                results.append(run_segmented(server.url, args.size, out_dir, args.segments))
+            errors_injected = server.errors_injected
+
+            downloaded = next((r["_path"] for r in results if r["ok"]), None)
+            if downloaded and args.checksum:
+                expected = server.checksum(args.checksum)
+                for engine in engines:
+                    results.append(run_checksum(engine, downloaded, expected, args.checksum))
+
+    for record in results:
+        record.pop("_path", None)
+        status = "ok" if record["ok"] else f"FAILED {record.get('error') or ''}".strip()
+        print(f"  {record['name']:<24} {record['seconds']:>8.2f}s  {record['mb_per_second'] or 0:>9.1f} MB/s  {status}")
+    print()
+    print(f"Errors injected by the server: {errors_injected}")
+
+    if args.output:
+        run = {
+            "benchmark": "download_engine",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {
+                "size": args.size,
+                "latency": args.latency,
+                "bandwidth": args.bandwidth,
+                "error_rate": args.error_rate,
+                "error_mode": args.error_mode,
+                "segments": args.segments,
+            },
+            "errors_injected": errors_injected,
+            "results": results,
+        }
+        with open(args.output, "a") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
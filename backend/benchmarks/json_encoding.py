@@ -0,0 +1,214 @@
+"""
+Benchmark JSON encoding of API responses and WebSocket frames, stdlib vs orjson.
+
+Measures, on the real payloads of /api/os/linux and /api/admin/iso (the
+admin ISO list):
+- the encode step alone: JSONResponse vs ORJSONResponse rendering the
+  content FastAPI produced
+- a WebSocket download_progress frame: encode_json with json vs orjson
+- whole requests through the ASGI app (in process, no compression) with
+  FAST_JSON_ENABLED off and on; each setting runs in its own process
+  since it is read at import time
+
+/api/os/linux is served from pre-encoded catalog entries, so only the
+admin list is expected to change end to end.
+
+Usage:
+    python -m benchmarks.json_encoding
+    python -m benchmarks.json_encoding --requests 500 --output bench-results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+ENDPOINTS = ["/api/os/linux", "/api/admin/iso"]
+
+# A progress message as broadcast by the download service
+PROGRESS_MESSAGE = {
+    "type": "download_progress",
+    "download_id": 42,
+    "data": {
+        "state": "downloading",
+        "progress": 37.51234,
+        "downloaded_bytes": 2_214_592_512,
+        "total_bytes": 5_903_556_608,
+        "speed": 48_213_337.6,
+        "eta": 76,
+        "os_name": "Ubuntu Desktop",
+        "os_version": "24.04 LTS",
+        "updated_at": datetime(2024, 8, 15, 12, 30, 5),
+    },
+}
+
+
+def prepare_app() -> None:
+    """Point the API at a temporary database (before it is imported)."""
+    bench_dir = tempfile.mkdtemp(prefix="iso-toolkit-json-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(bench_dir, 'bench.db')}"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+
+async def fetch_payloads(requests: int) -> dict:
+    """
+    Request each endpoint through the ASGI app.
+
+    Args:
+        requests: Timed requests per endpoint (0 to only fetch the payloads)
+
+    Returns:
+        Map of endpoint to its parsed payload, body size and ms per request
+    """
+    import httpx
+
+    from api.database.session import init_database
+    from api.main import app
+    from api.routes import os as os_routes
+
+    init_database()
+    os_routes._init_providers()
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login = await client.post("/api/auth/login", data={"username": "admin", "password": "AdminPass123"})
+        login.raise_for_status()
+        headers = {
+            "Authorization": f"Bearer {login.json()['access_token']}",
+            "Accept-Encoding": "identity",
+        }
+
+        for endpoint in ENDPOINTS:
+            response = await client.get(endpoint, headers=headers)
+            response.raise_for_status()
+            started = time.perf_counter()
+            for _ in range(requests):
+                (await client.get(endpoint, headers=headers)).raise_for_status()
+            elapsed = time.perf_counter() - started
+            results[endpoint] = {
+                "payload": response.json(),
+                "bytes": len(response.content),
+                "ms_per_request": round(elapsed / requests * 1000, 3) if requests else None,
+            }
+    return results
+
+
+def time_per_call(func, repeats: int) -> float:
+    """Microseconds per call of func()."""
+    started = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - started) / repeats * 1e6
+
+
+def bench_encode(payloads: dict, repeats: int) -> dict:
+    """Time rendering each payload and a WebSocket frame with each encoder."""
+    from fastapi.responses import JSONResponse, ORJSONResponse
+
+    from api.services import fast_json
+    from api.services.ws_protocol import encode_json
+
+    results = {}
+    for endpoint, payload in payloads.items():
+        content = payload["payload"]
+        results[endpoint] = {"json_us": round(time_per_call(lambda: JSONResponse(content), repeats), 1)}
+        if fast_json.orjson is not None:
+            results[endpoint]["orjson_us"] = round(time_per_call(lambda: ORJSONResponse(content), repeats), 1)
+
+    frame = {}
+    use_orjson = fast_json.USE_ORJSON
+    try:
+        fast_json.USE_ORJSON = False
+        frame["json_us"] = round(time_per_call(lambda: encode_json(PROGRESS_MESSAGE), repeats * 20), 2)
+        if fast_json.orjson is not None:
+            fast_json.USE_ORJSON = True
+            frame["orjson_us"] = round(time_per_call(lambda: encode_json(PROGRESS_MESSAGE), repeats * 20), 2)
+    finally:
+        fast_json.USE_ORJSON = use_orjson
+    results["websocket_frame"] = frame
+    return results
+
+
+def run_requests(fast_json_enabled: bool, requests: int) -> dict:
+    """Time whole requests in a child process with FAST_JSON_ENABLED set."""
+    env = dict(os.environ, FAST_JSON_ENABLED="true" if fast_json_enabled else "false")
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.json_encoding", "--child", "--requests", str(requests)],
+        cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    # The result is the last line; the app may log before it
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding, stdlib vs orjson")
+    parser.add_argument("--repeats", type=int, default=200, help="Encodes per payload")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per endpoint and setting")
+    parser.add_argument("--output", default=None, help="Append results as a JSON line to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    prepare_app()
+
+    if args.child:
+        results = asyncio.run(fetch_payloads(args.requests))
+        print(json.dumps({endpoint: result["ms_per_request"] for endpoint, result in results.items()}))
+        return
+
+    print("=" * 60)
+    print("ISO Toolkit - JSON encoding benchmark")
+    print("=" * 60)
+
+    from api.services import fast_json
+
+    if fast_json.orjson is None:
+        print("orjson is not installed; only the stdlib encoder is measured")
+
+    payloads = asyncio.run(fetch_payloads(0))
+    encode = bench_encode(payloads, args.repeats)
+
+    print(f"{'Encode step':<26} {'bytes':>9} {'json us':>10} {'orjson us':>10}")
+    for endpoint, payload in payloads.items():
+        timing = encode[endpoint]
+        print(f"{endpoint:<26} {payload['bytes']:>9,} {timing['json_us']:>10.1f} {timing.get('orjson_us', 0):>10.1f}")
+    frame = encode["websocket_frame"]
+    print(f"{'WebSocket progress frame':<26} {'':>9} {frame['json_us']:>10.2f} {frame.get('orjson_us', 0):>10.2f}")
+    print()
+
+    requests = {"stdlib": run_requests(False, args.requests)}
+    if fast_json.orjson is not None:
+        requests["orjson"] = run_requests(True, args.requests)
+
+    print(f"{'Whole request (ms)':<26} {'stdlib':>10} {'orjson':>10}")
+    for endpoint in ENDPOINTS:
+        print(f"{endpoint:<26} {requests['stdlib'][endpoint]:>10.3f} {requests.get('orjson', {}).get(endpoint, 0):>10.3f}")
+
+    if args.output:
+        run = {
+            "benchmark": "json_encoding",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {"repeats": args.repeats, "requests": args.requests},
+            "payload_bytes": {endpoint: payload["bytes"] for endpoint, payload in payloads.items()},
+            "encode": encode,
+            "requests": requests,
+        }
+        with open(args.output, "a") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+Load test for the catalog, search, downloads and WebSocket fan-out endpoints.
+
+Runs entirely in process against the ASGI app (no server, no network) with
+a throwaway SQLite database:
+- virtual users browse the catalog in a loop: /api/os/categories,
+  /api/os/{category}, /api/os/search and /api/downloads
+- WebSocket watchers connect to /api/ws/downloads and receive simulated
+  progress events published through the event broker, as the download
+  service does; delivery latency is measured per message
+
+Reports p50/p99 latency and throughput per endpoint, WebSocket delivery
+and latency, and process memory (RSS).
+
+Modes:
+- smoke: short run with fixed thresholds; exits with status 1 when a
+  threshold is missed, for CI
+- soak: long run that prints a progress line (throughput, latency, RSS)
+  every --report-every seconds, to spot leaks and degradation
+
+Usage:
+    python -m benchmarks.load_test --mode smoke
+    python -m benchmarks.load_test --mode soak --duration 1800 --users 200 --watchers 1000
+    python -m benchmarks.load_test --mode smoke --output load-results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Point the API at a temporary database before it is imported
+_bench_dir = tempfile.mkdtemp(prefix="iso-toolkit-load-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_bench_dir, 'load.db')}"
+# Every virtual user shares one client address
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import logging
+
+import httpx
+
+from api.database.models import DownloadRecord
+from api.database.session import SessionLocal, init_database
+from api.main import app
+from api.routes import os as os_routes
+from api.services.download import download_service
+from api.services.events import event_broker
+
+CATEGORIES = ["windows", "linux", "macos", "bsd"]
+SEARCH_TERMS = ["ubuntu", "windows 11", "fedora", "debian", "freebsd", "arch", "mint", "server"]
+
+# Scenario weights for one virtual user step
+SCENARIOS = [
+    ("categories", 2),
+    ("category", 4),
+    ("search", 2),
+    ("downloads", 2),
+]
+
+MODES = {
+    "smoke": {"duration": 10, "users": 20, "watchers": 50, "events_per_second": 20, "report_every": 0},
+    "soak": {"duration": 600, "users": 100, "watchers": 500, "events_per_second": 50, "report_every": 30},
+}
+
+# Smoke thresholds
+SMOKE_MAX_ERROR_RATE = 0.01
+SMOKE_MAX_P99_MS = 2000
+SMOKE_MIN_WS_DELIVERY = 0.99
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Not Linux: peak RSS is the best available
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Stats:
+    """
+    Latencies and errors per endpoint for one reporting window and in total.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.window: List[float] = []
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        self.latencies.setdefault(name, []).append(seconds * 1000)
+        self.window.append(seconds * 1000)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def take_window(self) -> List[float]:
+        window, self.window = self.window, []
+        return window
+
+
+class WebSocketWatcher:
+    """
+    Minimal in-process ASGI WebSocket client subscribed to all downloads.
+    """
+
+    def __init__(self, index: int, latencies: List[float]):
+        self.index = index
+        self.latencies = latencies
+        self.received = 0
+        self.accepted = asyncio.Event()
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        path = "/api/ws/downloads"
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "scheme": "ws",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"subscribe_all=true",
+            "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", 10000 + self.index),
+            "server": ("bench", 80),
+            "subprotocols": [],
+        }
+        self._inbox.put_nowait({"type": "websocket.connect"})
+        self._task = asyncio.create_task(app(scope, self._inbox.get, self._on_send))
+        await self.accepted.wait()
+
+    async def _on_send(self, message: dict) -> None:
+        if message["type"] == "websocket.accept":
+            self.accepted.set()
+        elif message["type"] == "websocket.send" and message.get("text"):
+            payload = json.loads(message["text"])
+            if payload.get("type") == "download_progress":
+                self.received += 1
+                self.latencies.append((time.perf_counter() - payload["data"]["sent_at"]) * 1000)
+
+    async def close(self) -> None:
+        self._inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=5)
+            except (asyncio.TimeoutError, Exception):
+                self._task.cancel()
+
+
+def seed_downloads(count: int) -> None:
+    """Insert download history so /api/downloads returns full pages."""
+    with SessionLocal() as db:
+        for index in range(count):
+            db.add(DownloadRecord(
+                os_name="Benchmark OS",
+                os_version=f"{index}.0",
+                os_category=random.choice(CATEGORIES),
+                os_architecture="x64",
+                os_language="en-US",
+                url=f"https://example.com/iso/{index}.iso",
+                output_path=f"/tmp/{index}.iso",
+                state=random.choice(["completed", "failed", "cancelled"]),
+                progress=100.0,
+            ))
+        db.commit()
+
+
+async def virtual_user(client: httpx.AsyncClient, stats: Stats, deadline: float, rng: random.Random) -> None:
+    names = [name for name, _ in SCENARIOS]
+    weights = [weight for _, weight in SCENARIOS]
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        if name == "categories":
+            request = client.get("/api/os/categories")
+        elif name == "category":
+            request = client.get(f"/api/os/{rng.choice(CATEGORIES)}")
+        elif name == "search":
+            request = client.get("/api/os/search", params={"query": rng.choice(SEARCH_TERMS)})
+        else:
+            request = client.get("/api/downloads", params={"limit": 50})
+        started = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code == 200
+        except Exception:
+            ok = False
+        stats.record(name, time.perf_counter() - started, ok)
+
+
+async def publish_progress(deadline: float, events_per_second: float, published: List[int]) -> None:
+    """Publish simulated progress for a handful of downloads at a fixed rate."""
+    interval = 1 / events_per_second
+    next_event = time.perf_counter()
+    while time.perf_counter() < deadline:
+        download_id = published[0] % 8 + 1
+        await download_service._publish_progress(download_id, {
+            "state": "downloading",
+            "progress": published[0] % 100,
+            "downloaded_bytes": published[0] * 1024 * 1024,
+            "total_bytes": 5 * 1024 ** 3,
+            "speed": 48_000_000.0,
+            "eta": 60,
+            "sent_at": time.perf_counter(),
+        })
+        published[0] += 1
+        next_event += interval
+        await asyncio.sleep(max(0.0, next_event - time.perf_counter()))
+
+
+async def report_progress(stats: Stats, ws_latencies: List[float], started: float, deadline: float, every: float) -> None:
+    while time.perf_counter() + every <= deadline:
+        await asyncio.sleep(every)
+        window = stats.take_window()
+        print(
+            f"  [{time.perf_counter() - started:6.0f}s] {len(window) / every:7.1f} req/s  "
+            f"p50 {percentile(window, 0.5):6.1f} ms  p99 {percentile(window, 0.99):7.1f} ms  "
+            f"ws p99 {percentile(ws_latencies[-10000:], 0.99):6.1f} ms  RSS {rss_mb():.0f} MB",
+            flush=True,
+        )
+
+
+async def run(duration: float, users: int, watchers: int, events_per_second: float, report_every: float) -> dict:
+    """
+    Run the load test.
+
+    Args:
+        duration: Seconds of load
+        users: Concurrent virtual users
+        watchers: Connected WebSocket clients
+        events_per_second: Simulated progress events per second
+        report_every: Seconds between progress lines (0 for none)
+
+    Returns:
+        Summary of the run
+    """
+    await event_broker.start(download_service.handle_event)
+    os_routes._init_providers()
+
+    ws_latencies: List[float] = []
+    clients = [WebSocketWatcher(index, ws_latencies) for index in range(watchers)]
+    await asyncio.gather(*(client.connect() for client in clients))
+
+    # Warm the catalog caches so the run measures steady state
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for category in CATEGORIES:
+            await client.get(f"/api/os/{category}")
+
+        stats = Stats()
+        published = [0]
+        rss_start = rss_mb()
+        started = time.perf_counter()
+        deadline = started + duration
+
+        tasks = [asyncio.create_task(virtual_user(client, stats, deadline, random.Random(index))) for index in range(users)]
+        if watchers and events_per_second:
+            tasks.append(asyncio.create_task(publish_progress(deadline, events_per_second, published)))
+        if report_every:
+            tasks.append(asyncio.create_task(report_progress(stats, ws_latencies, started, deadline, report_every)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    # Let in-flight fan-out finish before counting deliveries
+    await asyncio.sleep(0.5)
+    received = sum(client.received for client in clients)
+    await asyncio.gather(*(client.close() for client in clients))
+    await event_broker.stop()
+
+    endpoints = {}
+    total_requests = total_errors = 0
+    for name, latencies in sorted(stats.latencies.items()):
+        errors = stats.errors.get(name, 0)
+        total_requests += len(latencies)
+        total_errors += errors
+        endpoints[name] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "requests_per_second": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.5), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+        }
+
+    expected = published[0] * watchers
+    return {
+        "duration": round(elapsed, 2),
+        "users": users,
+        "watchers": watchers,
+        "requests": total_requests,
+        "errors": total_errors,
+        "requests_per_second": round(total_requests / elapsed, 1),
+        "endpoints": endpoints,
+        "websocket": {
+            "events": published[0],
+            "expected_deliveries": expected,
+            "deliveries": received,
+            "delivery_ratio": round(received / expected, 4) if expected else 1.0,
+            "p50_ms": round(percentile(ws_latencies, 0.5), 2),
+            "p99_ms": round(percentile(ws_latencies, 0.99), 2),
+        },
+        "memory": {"rss_start_mb": round(rss_start, 1), "rss_end_mb": round(rss_mb(), 1)},
+    }
+
+
+def check_smoke(result: dict) -> List[str]:
+    """Return the smoke thresholds the run missed."""
+    failures = []
+    if result["requests"] and result["errors"] / result["requests"] > SMOKE_MAX_ERROR_RATE:
+        failures.append(f"error rate {result['errors'] / result['requests']:.2%} > {SMOKE_MAX_ERROR_RATE:.0%}")
+    for name, endpoint in result["endpoints"].items():
+        if endpoint["p99_ms"] > SMOKE_MAX_P99_MS:
+            failures.append(f"{name} p99 {endpoint['p99_ms']:.0f} ms > {SMOKE_MAX_P99_MS} ms")
+    if result["websocket"]["delivery_ratio"] < SMOKE_MIN_WS_DELIVERY:
+        failures.append(f"WebSocket delivery {result['websocket']['delivery_ratio']:.1%} < {SMOKE_MIN_WS_DELIVERY:.0%}")
+    return failures
+
+
+def print_result(result: dict) -> None:
+    print()
+    print(f"{'Endpoint':<12} {'Requests':>9} {'Errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, endpoint in result["endpoints"].items():
+        print(
+            f"{name:<12} {endpoint['requests']:>9} {endpoint['errors']:>7} {endpoint['requests_per_second']:>8.1f} "
+            f"{endpoint['p50_ms']:>8.1f} {endpoint['p99_ms']:>8.1f}"
+        )
+    print(f"{'total':<12} {result['requests']:>9} {result['errors']:>7} {result['requests_per_second']:>8.1f}")
+    print()
+    ws = result["websocket"]
+    print(
+        f"WebSocket: {ws['events']} events x {result['watchers']} watchers, "
+        f"{ws['deliveries']}/{ws['expected_deliveries']} delivered ({ws['delivery_ratio']:.1%}), "
+        f"p50 {ws['p50_ms']:.1f} ms, p99 {ws['p99_ms']:.1f} ms"
+    )
+    memory = result["memory"]
+    print(f"Memory: RSS {memory['rss_start_mb']:.0f} MB -> {memory['rss_end_mb']:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load test of the catalog and WebSocket endpoints")
+    parser.add_argument("--mode", choices=sorted(MODES), default="smoke")
+    parser.add_argument("--duration", type=float, help="Seconds of load")
+    parser.add_argument("--users", type=int, help="Concurrent virtual users")
+    parser.add_argument("--watchers", type=int, help="Connected WebSocket clients")
+    parser.add_argument("--events-per-second", type=float, help="Simulated progress events per second")
+    parser.add_argument("--report-every", type=float, help="Seconds between progress lines (0 for none)")
+    parser.add_argument("--downloads", type=int, default=500, help="Download records to seed")
+    parser.add_argument("--output", default=None, help="Append the result as a JSON line to this file")
+    args = parser.parse_args()
+
+    settings = dict(MODES[args.mode])
+    for key in settings:
+        value = getattr(args, key)
+        if value is not None:
+            settings[key] = value
+
+    # Per-connection log lines would dominate the run
+    logging.getLogger().setLevel(logging.WARNING)
+
+    print("=" * 60)
+    print(f"ISO Toolkit - Load test ({args.mode})")
+    print("=" * 60)
+    print(
+        f"{settings['users']} users, {settings['watchers']} WebSocket watchers, "
+        f"{settings['events_per_second']:g} events/s for {settings['duration']:g}s"
+    )
+    print(f"Database in {_bench_dir}")
+
+    init_database()
+    seed_downloads(args.downloads)
+
+    result = asyncio.run(run(**settings))
+    result["mode"] = args.mode
+    print_result(result)
+
+    if args.output:
+        record = {"benchmark": "load_test", "timestamp": datetime.now(timezone.utc).isoformat(), **result}
+        with open(args.output, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"Result appended to {args.output}")
+
+    if args.mode == "smoke":
+        failures = check_smoke(result)
+        print()
+        if failures:
+            print("SMOKE FAILED: " + "; ".join(failures))
+            sys.exit(1)
+        print("Smoke thresholds met")
+
+
+if __name__ == "__main__":
+    main()
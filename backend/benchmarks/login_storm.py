@@ -0,0 +1,141 @@
+"""
+Benchmark event-loop latency during a login storm.
+
+Fires concurrent logins at the API (in process, through its ASGI app) while
+a probe task measures how late the event loop wakes up from short sleeps.
+With inline hashing every bcrypt call blocks the loop; with the password
+hashing pool the lag should stay flat and excess logins get 503s.
+
+Uses a throwaway SQLite database, so it never touches real data:
+    python -m benchmarks.login_storm
+    python -m benchmarks.login_storm --logins 200 --concurrency 100 --queue 16
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import os
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Point the API at a temporary database before it is imported
+_bench_dir = tempfile.mkdtemp(prefix="iso-toolkit-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_bench_dir, 'bench.db')}"
+os.environ.setdefault("DEFAULT_ADMIN_PASSWORD", "AdminPass123")
+
+import httpx
+
+from api.auth import password_hasher as password_hasher_module
+from api.auth.password_hasher import PasswordHasherPool, PASSWORD_HASH_WORKERS
+from api.auth.rate_limiter import rate_limit_backend
+from api.database.session import init_database
+from api.main import app
+
+PROBE_INTERVAL = 0.005
+
+
+async def probe_loop_lag(stop: asyncio.Event, lags: list) -> None:
+    """Record how late each short sleep wakes up, in milliseconds."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((loop.time() - started - PROBE_INTERVAL) * 1000)
+
+
+async def login_storm(pool: PasswordHasherPool, logins: int, concurrency: int) -> dict:
+    """
+    Run one login storm with the given hashing pool.
+
+    Args:
+        pool: Password hashing pool to install
+        logins: Total login attempts
+        concurrency: Logins in flight at once
+
+    Returns:
+        Summary with status counts, loop lag percentiles and throughput
+    """
+    password_hasher_module.password_hasher = pool
+    rate_limit_backend.clear()
+
+    statuses: dict = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    # Count server errors (e.g. SQLite lock timeouts under inline hashing) as responses
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def attempt(index: int) -> None:
+            async with semaphore:
+                response = await client.post(
+                    "/api/auth/login",
+                    data={"username": "admin", "password": "AdminPass123"},
+                    # Unique client addresses keep the login rate limiter out of the way
+                    headers={"X-Forwarded-For": f"10.0.{index // 250}.{index % 250}"},
+                )
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        lags: list = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_loop_lag(stop, lags))
+        started = time.perf_counter()
+        await asyncio.gather(*(attempt(index) for index in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    pool.shutdown()
+    lags.sort()
+    return {
+        "statuses": dict(sorted(statuses.items())),
+        "elapsed": elapsed,
+        "logins_per_second": statuses.get(200, 0) / elapsed,
+        "lag_p50": statistics.median(lags),
+        "lag_p99": lags[min(len(lags) - 1, int(len(lags) * 0.99))],
+        "lag_max": lags[-1],
+    }
+
+
+def print_result(label: str, result: dict) -> None:
+    print(f"{label}")
+    print(f"  Responses:      {result['statuses']}")
+    print(f"  Duration:       {result['elapsed']:.2f}s ({result['logins_per_second']:.1f} logins/s)")
+    print(
+        f"  Event loop lag: p50 {result['lag_p50']:.1f} ms, "
+        f"p99 {result['lag_p99']:.1f} ms, max {result['lag_max']:.1f} ms"
+    )
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure event-loop lag during a login storm")
+    parser.add_argument("--logins", type=int, default=40, help="Login attempts per run")
+    parser.add_argument("--concurrency", type=int, default=20, help="Logins in flight at once")
+    parser.add_argument("--workers", type=int, default=PASSWORD_HASH_WORKERS, help="Hashing threads")
+    parser.add_argument("--queue", type=int, default=64, help="Hashing queue limit")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ISO Toolkit - Login storm benchmark")
+    print("=" * 60)
+    print(f"{args.logins} logins, {args.concurrency} concurrent, database in {_bench_dir}")
+    print()
+
+    init_database()
+
+    inline = asyncio.run(login_storm(PasswordHasherPool(workers=0), args.logins, args.concurrency))
+    print_result("Inline hashing (blocks the event loop)", inline)
+
+    pooled = asyncio.run(login_storm(
+        PasswordHasherPool(workers=args.workers, max_pending=args.queue),
+        args.logins,
+        args.concurrency,
+    ))
+    print_result(f"Hashing pool ({args.workers} workers, queue {args.queue})", pooled)
+
+
+if __name__ == "__main__":
+    main()
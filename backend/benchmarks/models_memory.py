@@ -0,0 +1,172 @@
+"""
+Memory and allocation benchmark for the core data models.
+
+Compares the slotted models in core.models with the plain dataclasses they
+replaced (reproduced below):
+- memory per OSInfo when holding a catalog, measured with tracemalloc
+- memory and time for creating DownloadProgress objects (one per progress tick)
+- time for building the catalog ID (cached iso_id vs. formatting each time)
+
+Usage:
+    python -m benchmarks.models_memory
+    python -m benchmarks.models_memory --catalog 5000 --ticks 1000000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.models import Architecture, DownloadProgress, OSCategory, OSInfo
+
+
+@dataclass
+class LegacyOSInfo:
+    """OSInfo before slots: per-instance __dict__, mirrors list and headers dict."""
+    name: str
+    version: str
+    category: OSCategory
+    architecture: Architecture
+    language: str
+    url: str
+    mirrors: list = field(default_factory=list)
+    checksum: Optional[str] = None
+    checksum_type: Optional[str] = None
+    size: Optional[int] = None
+    release_date: Optional[datetime] = None
+    description: Optional[str] = None
+    icon: Optional[str] = None
+    source: Optional[str] = None
+    subcategory: Optional[str] = None
+    headers: dict = field(default_factory=dict)
+
+
+@dataclass
+class LegacyDownloadProgress:
+    downloaded: int
+    total: int
+    speed: float
+    eta: int
+
+
+def catalog_kwargs(count: int):
+    """Catalog-like entries: few distinct names and languages, unique URLs."""
+    names = ["Ubuntu Desktop", "Fedora Workstation", "Debian", "Linux Mint", "Windows 11"]
+    for index in range(count):
+        # Built at runtime (as parsed from provider data), so not interned by the compiler
+        yield dict(
+            name="".join(names[index % len(names)]),
+            version=f"{24 + index % 3}.{index % 12:02d}",
+            category=OSCategory.LINUX,
+            architecture=Architecture.X64,
+            language="-".join(["en", "US"]),
+            url=f"https://mirror.example.com/iso/{index}/image.iso",
+            checksum=f"{index:064x}",
+            checksum_type="".join(["sha", "256"]),
+            size=4_000_000_000 + index,
+            description="Benchmark entry",
+            source="".join(["Ubu", "ntu"]),
+            subcategory="".join(["Ubu", "ntu"]),
+        )
+
+
+def measure(build) -> tuple:
+    """Return (bytes allocated and still held, seconds) for build()."""
+    gc.collect()
+    started = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    held = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current, elapsed
+
+
+def bench_catalog(count: int) -> None:
+    entries = list(catalog_kwargs(count))
+    legacy, legacy_time = measure(lambda: [LegacyOSInfo(**kwargs) for kwargs in entries])
+    slotted, slotted_time = measure(lambda: [OSInfo(**kwargs) for kwargs in entries])
+    print(f"OSInfo x {count:,} (catalog held in memory)")
+    print(f"  plain dataclass:   {legacy / count:7.0f} bytes/entry  build {legacy_time * 1000:7.1f} ms")
+    print(f"  slotted, frozen:   {slotted / count:7.0f} bytes/entry  build {slotted_time * 1000:7.1f} ms")
+    print(f"  reduction:         {1 - slotted / legacy:7.1%}")
+    print()
+
+
+def bench_progress(ticks: int) -> None:
+    def churn(cls):
+        # Keep the last object alive, as a task does
+        def run():
+            progress = None
+            for tick in range(ticks):
+                progress = cls(downloaded=tick * 65536, total=ticks * 65536, speed=48e6, eta=ticks - tick)
+            return progress
+        return run
+
+    # Timed without tracemalloc, which slows allocation down
+    for label, cls in (("plain dataclass", LegacyDownloadProgress), ("slotted", DownloadProgress)):
+        gc.collect()
+        started = time.perf_counter()
+        churn(cls)()
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        churn(cls)()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = sys.getsizeof(cls(1, 1, 1.0, 1))
+        if hasattr(cls(1, 1, 1.0, 1), "__dict__"):
+            size += sys.getsizeof(cls(1, 1, 1.0, 1).__dict__)
+        print(f"  {label:<17} {size:4d} bytes/object  {ticks / elapsed / 1e6:5.2f} M ticks/s  peak {peak / 1024:6.1f} KiB")
+
+
+def bench_iso_id(count: int, repeats: int) -> None:
+    entries = [OSInfo(**kwargs) for kwargs in catalog_kwargs(count)]
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for os_info in entries:
+            f"{os_info.category.value}_{os_info.name.lower()}_{os_info.version.lower()}_{os_info.architecture.value}"
+    formatted = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for os_info in entries:
+            os_info.iso_id
+    cached = time.perf_counter() - started
+
+    lookups = count * repeats
+    print(f"iso_id x {lookups:,}")
+    print(f"  formatted each time: {formatted / lookups * 1e9:6.0f} ns")
+    print(f"  cached property:     {cached / lookups * 1e9:6.0f} ns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and allocation benchmark for core models")
+    parser.add_argument("--catalog", type=int, default=2000, help="OSInfo entries to hold")
+    parser.add_argument("--ticks", type=int, default=500_000, help="DownloadProgress objects to create")
+    parser.add_argument("--repeats", type=int, default=50, help="Passes over the catalog for iso_id")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ISO Toolkit - Model memory benchmark")
+    print("=" * 60)
+
+    bench_catalog(args.catalog)
+    print(f"DownloadProgress x {args.ticks:,} (one per progress tick)")
+    bench_progress(args.ticks)
+    print()
+    bench_iso_id(args.catalog, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
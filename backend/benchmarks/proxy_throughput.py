@@ -0,0 +1,231 @@
+"""
+Throughput benchmark for the /download/* proxy.
+
+Starts the API under uvicorn in a child process and downloads through it
+from a local upstream (benchmarks.range_server), measuring wall-clock
+throughput and the server process's CPU time. "MB per CPU-second" is the
+throughput one core sustains, which is what limits the proxy in production.
+
+Cases:
+- upstream-baseline: the previous proxy loop (new httpx client and HEAD
+  request per download, aiter_bytes re-chunked to 1 MiB)
+- upstream: /download/{id} for a download not on disk (shared client, raw
+  passthrough)
+- local-baseline: Starlette's FileResponse for the finished file
+- local: /download/{id} for a download the server finished (FileRangeResponse)
+- local-range: the same with a Range request, as a resuming client sends
+
+Usage:
+    python -m benchmarks.proxy_throughput
+    python -m benchmarks.proxy_throughput --size 2G --concurrency 4 --output bench-results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.range_server import BLOCK_SIZE, RangeServer, parse_size, synthetic_block
+
+import httpx
+
+BASELINE_CHUNK_SIZE = 1024 * 1024
+
+
+def serve(port: int) -> None:
+    """Run the API with the baseline routes (child process)."""
+    import uvicorn
+    from fastapi import Depends
+    from fastapi.responses import FileResponse, StreamingResponse
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from api.database.models import DownloadRecord
+    from api.database.session import get_async_db
+    from api.main import app
+
+    @app.get("/bench/cpu")
+    async def cpu_time():
+        return {"cpu": time.process_time()}
+
+    @app.get("/bench/baseline/{download_id}")
+    async def baseline_upstream(download_id: int, db: AsyncSession = Depends(get_async_db)):
+        url = (await db.get(DownloadRecord, download_id)).url
+
+        async def generate():
+            async with httpx.AsyncClient(timeout=300) as client:
+                async with client.stream("GET", url, follow_redirects=True) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(chunk_size=BASELINE_CHUNK_SIZE):
+                        yield chunk
+
+        content_length = None
+        async with httpx.AsyncClient(timeout=5) as client:
+            head_response = await client.head(url, follow_redirects=True)
+            content_length = head_response.headers.get("content-length")
+        headers = {"Content-Length": content_length} if content_length else {}
+        return StreamingResponse(generate(), media_type="application/octet-stream", headers=headers)
+
+    @app.get("/bench/fileresponse/{download_id}")
+    async def baseline_file(download_id: int, db: AsyncSession = Depends(get_async_db)):
+        record = await db.get(DownloadRecord, download_id)
+        return FileResponse(record.output_path, media_type="application/octet-stream")
+
+    # Routes added after the catch-all must be matched first
+    app.router.routes[:0] = [app.router.routes.pop() for _ in range(3)]
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_local_file(path: str, size: int) -> None:
+    """Write the synthetic file, as a finished server-side download."""
+    block = synthetic_block()
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            f.write(block[:min(remaining, BLOCK_SIZE)])
+            remaining -= BLOCK_SIZE
+
+
+def seed_records(upstream_url: str, local_path: str) -> tuple:
+    """Create one download record per proxy path; returns (upstream id, local id)."""
+    from api.database.models import DownloadRecord
+    from api.database.session import SessionLocal, init_database
+    from core.models import DownloadState
+
+    init_database()
+    with SessionLocal() as db:
+        records = []
+        for state, output_path in ((DownloadState.DOWNLOADING, "/nonexistent/upstream.iso"), (DownloadState.COMPLETED, local_path)):
+            record = DownloadRecord(
+                os_name="Benchmark", os_version="1.0", os_category="other", os_architecture="x64",
+                os_language="en-US", url=upstream_url, output_path=output_path, state=state.value,
+            )
+            db.add(record)
+            records.append(record)
+        db.commit()
+        return records[0].id, records[1].id
+
+
+async def run_case(base_url: str, path: str, concurrency: int, headers: dict, expected: int) -> dict:
+    """Download a path `concurrency` times in parallel; returns bytes, seconds and server CPU."""
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        cpu_before = (await client.get("/bench/cpu")).json()["cpu"]
+
+        async def fetch() -> int:
+            received = 0
+            async with client.stream("GET", path, headers=headers) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_raw():
+                    received += len(chunk)
+            if received != expected:
+                raise RuntimeError(f"{path}: received {received} bytes, expected {expected}")
+            return received
+
+        started = time.perf_counter()
+        total = sum(await asyncio.gather(*(fetch() for _ in range(concurrency))))
+        elapsed = time.perf_counter() - started
+        cpu = (await client.get("/bench/cpu")).json()["cpu"] - cpu_before
+
+    mb = total / (1024 * 1024)
+    return {
+        "bytes": total,
+        "seconds": round(elapsed, 3),
+        "server_cpu_seconds": round(cpu, 3),
+        "mb_per_second": round(mb / elapsed, 1),
+        "mb_per_cpu_second": round(mb / cpu, 1) if cpu > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /download/* proxy throughput")
+    parser.add_argument("--size", type=parse_size, default=parse_size("512M"), help="File size, e.g. 512M or 2G")
+    parser.add_argument("--concurrency", type=int, default=2, help="Parallel downloads per case")
+    parser.add_argument("--output", default=None, help="Append results as a JSON line to this file")
+    parser.add_argument("--serve", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        serve(args.serve)
+        return
+
+    print("=" * 60)
+    print("ISO Toolkit - Proxy throughput benchmark")
+    print("=" * 60)
+
+    bench_dir = tempfile.mkdtemp(prefix="iso-toolkit-proxy-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(bench_dir, 'bench.db')}"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    local_path = os.path.join(bench_dir, "local.iso")
+    write_local_file(local_path, args.size)
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    results = {}
+
+    with RangeServer(size=args.size) as upstream:
+        upstream_id, local_id = seed_records(upstream.url, local_path)
+        server = subprocess.Popen([sys.executable, "-m", "benchmarks.proxy_throughput", "--serve", str(port)],
+                                  cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    httpx.get(f"{base_url}/bench/cpu", timeout=1)
+                    break
+                except httpx.HTTPError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise RuntimeError("API server did not start")
+                    time.sleep(0.2)
+
+            half = args.size // 2
+            cases = [
+                ("upstream-baseline", f"/bench/baseline/{upstream_id}", {}, args.size),
+                ("upstream", f"/download/{upstream_id}", {}, args.size),
+                ("local-baseline", f"/bench/fileresponse/{local_id}", {}, args.size),
+                ("local", f"/download/{local_id}", {}, args.size),
+                ("local-range", f"/download/{local_id}", {"Range": f"bytes={half}-"}, args.size - half),
+            ]
+            print(f"{args.size:,} bytes x {args.concurrency} parallel downloads per case")
+            print()
+            print(f"{'Case':<20} {'MB/s':>9} {'CPU s':>8} {'MB/CPU-s':>10}")
+            for name, path, headers, expected in cases:
+                result = asyncio.run(run_case(base_url, path, args.concurrency, headers, expected))
+                results[name] = result
+                print(f"{name:<20} {result['mb_per_second']:>9.1f} {result['server_cpu_seconds']:>8.2f} "
+                      f"{result['mb_per_cpu_second'] or 0:>10.1f}")
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    if args.output:
+        run = {
+            "benchmark": "proxy_throughput",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {"size": args.size, "concurrency": args.concurrency},
+            "results": results,
+        }
+        with open(args.output, "a") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Local HTTP server for benchmarks, serving synthetic ISO-sized files.
+
+Every path serves the same file: a fixed pseudo-random 1 MiB block repeated
+up to the configured size, generated on the fly, so multi-GB files need no
+disk or memory. Range requests (bytes=start-end, bytes=start-) and HEAD
+are supported, as mirrors do.
+
+Network conditions can be simulated per request:
+- latency: delay before the response headers
+- bandwidth: bytes/second limit per connection
+- error_rate: fraction of requests that fail, either with a 503 or by
+  dropping the connection halfway through the body
+
+Used by the download engine and proxy benchmarks, or on its own:
+    python -m benchmarks.range_server --size 4G --port 8765
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+BLOCK_SIZE = 1024 * 1024
+WRITE_SIZE = 256 * 1024
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as 512M or 4G into bytes."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?", value.strip().upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def synthetic_block(seed: int = 0) -> bytes:
+    """The block the synthetic file repeats (incompressible, deterministic)."""
+    return random.Random(seed).randbytes(BLOCK_SIZE)
+
+
+class RangeServer:
+    """
+    Threaded HTTP server for one synthetic file, run in a background thread.
+
+    Use as a context manager:
+        with RangeServer(size=1024 ** 3) as server:
+            url = server.url
+    """
+
+    def __init__(
+        self,
+        size: int,
+        latency: float = 0.0,
+        bandwidth: Optional[int] = None,
+        error_rate: float = 0.0,
+        error_mode: str = "drop",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+    ):
+        self.size = size
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_mode = error_mode
+        self.requests = 0
+        self.errors_injected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        block = synthetic_block(seed)
+        # Two copies, so any window of up to BLOCK_SIZE bytes is one slice
+        self._double_block = memoryview(block + block)
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/synthetic.iso"
+
+    def start(self) -> "RangeServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="range-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "RangeServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def checksum(self, algorithm: str = "sha256") -> str:
+        """Checksum of the whole synthetic file."""
+        hasher = hashlib.new(algorithm)
+        remaining = self.size
+        block = self._double_block[:BLOCK_SIZE]
+        while remaining > 0:
+            hasher.update(block[:min(remaining, BLOCK_SIZE)])
+            remaining -= BLOCK_SIZE
+        return hasher.hexdigest()
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors_injected += 1
+                return True
+        return False
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+            def do_GET(self):
+                self._respond(send_body=True)
+
+            def _respond(self, send_body: bool) -> None:
+                if server.latency:
+                    time.sleep(server.latency)
+
+                fail = server._should_fail()
+                if fail and server.error_mode == "status":
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.send_header("Retry-After", "1")
+                    self.end_headers()
+                    return
+
+                start, end = 0, server.size - 1
+                status = 200
+                range_header = self.headers.get("Range")
+                if range_header:
+                    match = RANGE_PATTERN.match(range_header.strip())
+                    if not match or (not match.group(1) and not match.group(2)):
+                        self.send_error(416)
+                        return
+                    if match.group(1):
+                        start = int(match.group(1))
+                        if match.group(2):
+                            end = min(int(match.group(2)), server.size - 1)
+                    else:
+                        # Suffix range: last N bytes
+                        start = max(0, server.size - int(match.group(2)))
+                    if start >= server.size or start > end:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{server.size}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    status = 206
+
+                length = end - start + 1
+                self.send_response(status)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(length))
+                self.send_header("Accept-Ranges", "bytes")
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{server.size}")
+                self.end_headers()
+
+                if send_body:
+                    # A dropped request fails halfway through its body
+                    limit = length // 2 if fail else length
+                    self._send_body(start, limit)
+                    if fail:
+                        self.close_connection = True
+
+            def _send_body(self, offset: int, length: int) -> None:
+                sent = 0
+                started = time.monotonic()
+                block = server._double_block
+                try:
+                    while sent < length:
+                        n = min(WRITE_SIZE, length - sent)
+                        position = (offset + sent) % BLOCK_SIZE
+                        self.wfile.write(block[position:position + n])
+                        sent += n
+                        if server.bandwidth:
+                            ahead = sent / server.bandwidth - (time.monotonic() - started)
+                            if ahead > 0:
+                                time.sleep(ahead)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic file with range support")
+    parser.add_argument("--size", type=parse_size, default=parse_size("1G"), help="File size, e.g. 512M or 4G")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--bandwidth", type=parse_size, default=None, help="Bytes/second per connection, e.g. 50M")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-mode", choices=["drop", "status"], default="drop")
+    args = parser.parse_args()
+
+    server = RangeServer(
+        size=args.size,
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        error_mode=args.error_mode,
+        port=args.port,
+    )
+    print(f"Serving {args.size} bytes at {server.url} (Ctrl+C to stop)")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
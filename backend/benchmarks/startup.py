@@ -0,0 +1,195 @@
+"""
+Cold-start benchmark: import profile and time to the first successful /health.
+
+- import: wall time of `import api.main` in a fresh interpreter, and the
+  modules that take longest according to `python -X importtime`
+- startup: spawns uvicorn and polls /health every few milliseconds; the
+  time from spawning the process to the first 200 is what an autoscaler's
+  readiness probe waits for. Runs with the default settings and with
+  DB_SKIP_MIGRATIONS=true (the schema is created once beforehand, as a
+  release step would with scripts/migrate.py)
+
+Each run uses a fresh process against a temporary SQLite database.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --top 30 --output bench-results.jsonl
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Add parent directory to path
+sys.path.insert(0, BACKEND_DIR)
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+MODES = {
+    "default": {},
+    "skip-migrations": {"DB_SKIP_MIGRATIONS": "true"},
+}
+
+
+def bench_env(database_url: str, **extra: str) -> Dict[str, str]:
+    env = dict(os.environ, DATABASE_URL=database_url, RATE_LIMIT_ENABLED="false", **extra)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def import_wall_time(env: Dict[str, str]) -> float:
+    """Seconds to import api.main in a fresh interpreter."""
+    code = "import time; started = time.perf_counter(); import api.main; print(time.perf_counter() - started)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def import_profile(env: Dict[str, str]) -> List[Tuple[str, float, float, int]]:
+    """
+    Run `python -X importtime -c "import api.main"`.
+
+    Returns:
+        (module, self ms, cumulative ms, depth) per imported module
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+    return modules
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_health(env: Dict[str, str], timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn to the first 200 from /health."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            if server.poll() is not None:
+                raise RuntimeError(f"API server exited with status {server.returncode}")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError("API server did not become healthy")
+            time.sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "min_ms": round(min(values) * 1000, 1),
+        "median_ms": round(statistics.median(values) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API import time and time to first /health")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per mode")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--output", default=None, help="Append results as a JSON line to this file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ISO Toolkit - Startup benchmark")
+    print("=" * 60)
+
+    bench_dir = tempfile.mkdtemp(prefix="iso-toolkit-startup-")
+    database_url = f"sqlite:///{os.path.join(bench_dir, 'startup.db')}"
+    env = bench_env(database_url)
+
+    # Create the schema and admin user once, as a release step would
+    subprocess.run(
+        [sys.executable, "-m", "scripts.migrate"], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, check=True,
+    )
+
+    from api.services.static_assets import FRONTEND_DIST
+    if FRONTEND_DIST.is_dir() and not any(FRONTEND_DIST.rglob("*.br")) and not any(FRONTEND_DIST.rglob("*.gz")):
+        print("frontend/dist has no precompressed variants, so startup includes compressing it")
+        print("(the Docker build runs python -m scripts.precompress_frontend)")
+        print()
+
+    import_times = [import_wall_time(env) for _ in range(args.runs)]
+    profile = import_profile(env)
+    direct = sorted((m for m in profile if m[3] == 1), key=lambda m: m[2], reverse=True)
+    slowest = sorted(profile, key=lambda m: m[1], reverse=True)
+
+    print(f"import api.main: median {statistics.median(import_times) * 1000:.0f} ms over {args.runs} runs")
+    print("(-X importtime adds overhead; compare entries with each other)")
+    print()
+    print(f"{'Imported by api.main':<44} {'cumulative ms':>14}")
+    for name, _, cumulative, _ in direct[:args.top]:
+        print(f"{name:<44} {cumulative:>14.1f}")
+    print()
+    print(f"{'Slowest modules':<44} {'self ms':>14}")
+    for name, self_ms, _, _ in slowest[:args.top]:
+        print(f"{name:<44} {self_ms:>14.1f}")
+    print()
+
+    startup = {}
+    print(f"{'Time to first /health':<24} {'min ms':>9} {'median ms':>10} {'max ms':>9}")
+    for mode, extra in MODES.items():
+        times = [time_to_health(bench_env(database_url, **extra)) for _ in range(args.runs)]
+        startup[mode] = summarize(times)
+        result = startup[mode]
+        print(f"{mode:<24} {result['min_ms']:>9.1f} {result['median_ms']:>10.1f} {result['max_ms']:>9.1f}")
+
+    if args.output:
+        run = {
+            "benchmark": "startup",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {"runs": args.runs},
+            "import": summarize(import_times),
+            "imports_by_api_main": {name: round(cumulative, 1) for name, _, cumulative, _ in direct[:args.top]},
+            "startup": startup,
+        }
+        with open(args.output, "a") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
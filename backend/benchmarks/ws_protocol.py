@@ -0,0 +1,103 @@
+"""
+Round-trip benchmark for the WebSocket progress wire formats.
+
+Compares encoding and decoding a download progress message as a JSON text
+frame against the fixed-layout binary frame.
+
+Usage:
+    python -m benchmarks.ws_protocol
+    python -m benchmarks.ws_protocol --iterations 500000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.services.ws_protocol import (
+    encode_json,
+    encode_progress_frame,
+    decode_progress_frame,
+)
+
+SAMPLE_PROGRESS = {
+    "state": "downloading",
+    "progress": 42.37,
+    "downloaded_bytes": 2_315_255_808,
+    "total_bytes": 5_464_123_392,
+    "downloaded_formatted": "2.2 GB",
+    "total_formatted": "5.1 GB",
+    "speed": 48_234_112.5,
+    "speed_formatted": "46.0 MB/s",
+    "eta": 65,
+    "eta_formatted": "1m 5s",
+}
+
+
+def bench_json(iterations: int, download_id: int) -> tuple[float, int]:
+    """Encode and decode the sample as JSON; returns (seconds, frame size)."""
+    message = {"type": "download_progress", "download_id": download_id, "data": SAMPLE_PROGRESS}
+    frame = encode_json(message)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        json.loads(encode_json(message))
+    return time.perf_counter() - start, len(frame.encode("utf-8"))
+
+
+def bench_binary(iterations: int, download_id: int) -> tuple[float, int]:
+    """Encode and decode the sample as a binary frame; returns (seconds, frame size)."""
+    frame = encode_progress_frame(download_id, SAMPLE_PROGRESS)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_progress_frame(encode_progress_frame(download_id, SAMPLE_PROGRESS))
+    return time.perf_counter() - start, len(frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket progress wire formats")
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=200_000,
+        help="Round trips per format (default: 200000)"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON"
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for name, bench in (("json", bench_json), ("binary", bench_binary)):
+        elapsed, size = bench(args.iterations, download_id=1234)
+        results[name] = {
+            "frame_bytes": size,
+            "seconds": round(elapsed, 4),
+            "round_trips_per_sec": round(args.iterations / elapsed),
+            "ns_per_round_trip": round(elapsed / args.iterations * 1e9),
+        }
+
+    results["speedup"] = round(results["json"]["seconds"] / results["binary"]["seconds"], 2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 60)
+    print(f"WebSocket progress round trip ({args.iterations} iterations)")
+    print("=" * 60)
+    for name in ("json", "binary"):
+        r = results[name]
+        print(f"{name:>7}: {r['frame_bytes']:4d} bytes/frame  "
+              f"{r['ns_per_round_trip']:6d} ns/round trip  "
+              f"{r['round_trips_per_sec']:>9,d}/s")
+    print(f"Binary is {results['speedup']}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -201,7 +201,7 @@ class DownloadManager:
 
         try:
             # Try main URL first, then mirrors
-            urls_to_try = [task.os_info.url] + task.os_info.mirrors
+            urls_to_try = [task.os_info.url, *task.os_info.mirrors]
 
             for i, url in enumerate(urls_to_try):
                 if task.is_cancelled():
@@ -4,8 +4,10 @@ Data models for the ISO Toolkit application.
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, Callable, Any
+from types import MappingProxyType
+from typing import Optional, Callable, Any, Mapping
 from datetime import datetime
+import sys
 
 
 class OSCategory(str, Enum):
@@ -38,10 +40,20 @@ class DownloadState(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+# Shared default for ISOs that need no custom headers (read-only)
+NO_HEADERS: Mapping[str, str] = MappingProxyType({})
+
+# Fields repeated across many catalog entries, stored once via sys.intern
+_INTERNED_FIELDS = ("name", "version", "language", "checksum_type", "icon", "source", "subcategory")
+
+
+@dataclass(frozen=True, slots=True)
 class OSInfo:
     """
     Information about an available OS ISO.
+
+    Instances are immutable; build a new one (dataclasses.replace) to change
+    a field.
     """
     name: str  # e.g., "Windows 11", "Ubuntu Desktop"
     version: str  # e.g., "23H2", "24.04 LTS"
@@ -49,7 +61,7 @@ class OSInfo:
     architecture: Architecture
     language: str  # e.g., "en-US", "Multi"
     url: str
-    mirrors: list[str] = field(default_factory=list)  # Alternative download URLs
+    mirrors: tuple[str, ...] = ()  # Alternative download URLs
     checksum: Optional[str] = None
     checksum_type: Optional[str] = None  # "sha256", "md5"
     size: Optional[int] = None  # in bytes
@@ -58,7 +70,39 @@ class OSInfo:
     icon: Optional[str] = None  # emoji or icon identifier
     source: Optional[str] = None  # e.g., "Microsoft", "Ubuntu", "Internet Archive"
     subcategory: Optional[str] = None  # e.g., "Ubuntu", "Fedora" for Linux distros
-    headers: dict[str, str] = field(default_factory=dict)  # Custom HTTP headers needed for download
+    headers: Mapping[str, str] = field(default_factory=lambda: NO_HEADERS)  # Custom HTTP headers needed for download
+
+    # Cached iso_id
+    _iso_id: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Providers pass lists, plain dicts and sometimes enum values as strings
+        if not isinstance(self.category, OSCategory):
+            object.__setattr__(self, "category", OSCategory(self.category))
+        if not isinstance(self.architecture, Architecture):
+            object.__setattr__(self, "architecture", Architecture(self.architecture))
+        if not isinstance(self.mirrors, tuple):
+            object.__setattr__(self, "mirrors", tuple(self.mirrors))
+        if not self.headers:
+            object.__setattr__(self, "headers", NO_HEADERS)
+        elif not isinstance(self.headers, MappingProxyType):
+            object.__setattr__(self, "headers", MappingProxyType(dict(self.headers)))
+        for name in _INTERNED_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                object.__setattr__(self, name, sys.intern(value))
+
+    @property
+    def iso_id(self) -> str:
+        """
+        ID of the ISO in the catalog, overrides and proxy URLs:
+        category_name_version_architecture (name and version lowercased).
+        """
+        iso_id = self._iso_id
+        if iso_id is None:
+            iso_id = f"{self.category.value}_{self.name.lower()}_{self.version.lower()}_{self.architecture.value}"
+            object.__setattr__(self, "_iso_id", iso_id)
+        return iso_id
 
     @property
     def display_name(self) -> str:
@@ -87,9 +131,9 @@ class OSInfo:
         return f"{size:.1f} {units[unit_index]}"
 
 
-@dataclass
+@dataclass(slots=True)
 class DownloadProgress:
-    """Progress information for an active download."""
+    """Progress information for an active download (a new one per update)."""
     downloaded: int
     total: int
     speed: float  # bytes per second
@@ -132,7 +176,7 @@ class DownloadProgress:
             return f"{hours}h {mins}m"
 
 
-@dataclass
+@dataclass(slots=True)
 class DownloadTask:
     """A download task with its current state."""
     os_info: OSInfo
@@ -7,9 +7,12 @@ import os
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
+    # More than one worker requires a shared event broker (EVENT_BROKER=postgres)
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
     uvicorn.run(
         "api.main:app",
         host="0.0.0.0",
         port=port,
+        workers=workers,
         log_level="info",
     )
@@ -0,0 +1,42 @@
+"""
+Rebuild the download_daily_stats analytics rollup from the downloads table.
+
+The rollup is filled automatically on first startup and then updated as
+downloads complete. Run this script to rebuild it after restoring a backup
+or editing download records by hand:
+    python -m scripts.backfill_daily_stats
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.database.models import Base
+from api.database.session import engine, SessionLocal
+from api.services.daily_stats import rebuild_daily_stats
+
+
+def main():
+    print("=" * 60)
+    print("ISO Toolkit - Rebuild download_daily_stats")
+    print("=" * 60)
+    print()
+
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        buckets = rebuild_daily_stats(db)
+        print(f"Rollup rebuilt: {buckets} daily bucket(s) written.")
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding rollup: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
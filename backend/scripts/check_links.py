@@ -0,0 +1,39 @@
+"""
+Check every catalog URL and mirror once and store the results in link_checks.
+
+The API runs the same crawl on a schedule when LINK_CHECK_ENABLED=true.
+Run this script to check links on demand, e.g. from cron:
+    python -m scripts.check_links
+"""
+
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.database.models import Base
+from api.database.session import engine
+from api.routes.os import _init_providers
+from api.services.link_health import link_crawler
+
+
+def main():
+    print("=" * 60)
+    print("ISO Toolkit - Link health check")
+    print("=" * 60)
+    print()
+
+    Base.metadata.create_all(bind=engine)
+    _init_providers()
+
+    summary = asyncio.run(link_crawler.run())
+    print(f"Checked {summary['checked']} link(s) in {summary['duration_seconds']}s")
+    print(f"Alive:     {summary['alive']}")
+    print(f"Dead ISOs: {summary['dead']}")
+    print(f"Dead URLs: {summary['dead_urls']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Create and migrate the database schema and the default admin user.
+
+The API does this on every startup unless DB_SKIP_MIGRATIONS=true. With
+the flag set (e.g. on autoscaled instances), run this script once per
+release before the new instances start:
+    python -m scripts.migrate
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.database.session import init_database
+
+
+def main():
+    print("=" * 60)
+    print("ISO Toolkit - Database migration")
+    print("=" * 60)
+    print()
+
+    init_database()
+    print("Database schema is up to date.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Write brotli (.br) and gzip (.gz) variants next to the built frontend files.
+
+The API serves these variants when present instead of compressing the
+files itself at startup. Run after `npm run build`:
+    python -m scripts.precompress_frontend
+"""
+
+import gzip
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.services.compression import brotli
+from api.services.static_assets import FRONTEND_DIST, StaticAssets
+
+
+def main():
+    print("=" * 60)
+    print("ISO Toolkit - Precompress frontend")
+    print("=" * 60)
+    print()
+
+    if not FRONTEND_DIST.is_dir():
+        print(f"Frontend dist folder not found at {FRONTEND_DIST}")
+        sys.exit(1)
+    if brotli is None:
+        print("brotli is not installed, writing gzip variants only")
+
+    # Compress the same files the API would
+    manifest = StaticAssets(FRONTEND_DIST)
+    manifest.load()
+
+    written = 0
+    for relative, asset in manifest.assets.items():
+        if not asset.variants:
+            continue
+        path = FRONTEND_DIST / relative
+        path.with_name(path.name + ".gz").write_bytes(gzip.compress(asset.body, compresslevel=9, mtime=0))
+        written += 1
+        if brotli is not None:
+            path.with_name(path.name + ".br").write_bytes(brotli.compress(asset.body, quality=11))
+            written += 1
+
+    print(f"Wrote {written} compressed file(s) to {FRONTEND_DIST}")
+
+
+if __name__ == "__main__":
+    main()
@@ -52,7 +52,7 @@ export default function ChangePasswordPage() {
     setIsLoading(true);
 
     try {
-      await axios.post(
+      const response = await axios.post(
         `${API_BASE}/auth/change-password`,
         {
           old_password: oldPassword,
@@ -63,6 +63,12 @@ export default function ChangePasswordPage() {
         }
       );
 
+      // Changing the password revokes old tokens, so store the new ones
+      const { access_token, refresh_token } = response.data;
+      localStorage.setItem('access_token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
+      axios.defaults.headers.common['Authorization'] = `Bearer ${access_token}`;
+
       // Refresh user data to get updated password_changed status
       await checkAuth();
 